@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+""" memory of default vs compact dtype_policy (and grades are close)
+
+run from repo root: PYTHONPATH=. python bench/bench_dtype_policy.py
+"""
+
+import pathlib
+import tempfile
+import time
+
+from make_scope import make_scope
+
+from gradescope_mean.dtype_policy import assert_grade_close
+from gradescope_mean.gradebook import Gradebook
+
+kwargs = dict(cat_weight_dict={'hw': 1, 'quiz': 1},
+              cat_drop_dict={'hw': 2},
+              cat_late_dict={'hw': {'penalty_per_day': .1, 'excuse_day': 3}})
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as folder:
+        f_scope = pathlib.Path(folder) / 'scope.csv'
+        make_scope(f_scope, n_student=2000, n_ass=100)
+
+        df_grade_dict = dict()
+        for policy in ('default', 'compact'):
+            t = time.perf_counter()
+            gradebook = Gradebook(f_scope, dtype_policy=policy)
+            t_load = time.perf_counter() - t
+            s_bytes = gradebook.memory_usage()
+
+            t = time.perf_counter()
+            df_grade_dict[policy] = gradebook.average(**kwargs)
+            t_avg = time.perf_counter() - t
+
+            print(f'{policy:>8}: {s_bytes.sum() / 2 ** 20:.2f} MB '
+                  f'(load {t_load:.2f}s, average {t_avg:.2f}s)')
+            for attr, n_bytes in s_bytes.items():
+                print(f'    {attr:>16}: {n_bytes / 2 ** 20:.2f} MB')
+
+        assert_grade_close(df_grade_dict['compact'], df_grade_dict['default'])
+        print('compact grades within tolerance of default')
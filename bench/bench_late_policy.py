@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+""" time of each late policy vs the default (category) late penalty
+
+times one category's late penalty and mean (dropping its lowest assignment)
+
+run from repo root: PYTHONPATH=. python bench/bench_late_policy.py
+"""
+
+import pathlib
+import tempfile
+import timeit
+
+from make_scope import make_scope
+
+from gradescope_mean.gradebook import Gradebook
+
+late_dict = {
+    'default': {},
+    'per_assignment': {'per_assignment': True},
+    'linear': {'policy': 'linear'},
+    'decay': {'policy': 'decay'},
+    'linear, cap & cutoff': {'policy': 'linear', 'max_penalty': .5,
+                             'cutoff_day': 3}}
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as folder:
+        f_scope = pathlib.Path(folder) / 'scope.csv'
+        make_scope(f_scope, n_student=2000, n_ass=100)
+        gradebook = Gradebook(f_scope)
+        partition = gradebook.partition(['hw', 'quiz'])
+        df_lateday = gradebook._compute_lateday()
+
+        for name, late in late_dict.items():
+            def category_mean():
+                cat_late = gradebook.category_late(
+                    cat='hw', penalty_per_day=.1, excuse_day=3,
+                    partition=partition, df_lateday=df_lateday, **late)
+                gradebook.category_mean(cat='hw', partition=partition,
+                                        drop_n=1, cat_late=cat_late)
+
+            t = min(timeit.repeat(category_mean, number=10, repeat=5)) / 10
+            print(f'{name:>20}: {t * 1e3:.2f} ms')
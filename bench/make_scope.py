@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+""" writes a synthetic gradescope csv (for benchmarks) """
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+def make_scope(f_scope, n_student=1000, n_ass=40, n_section=4, seed=0):
+    """ writes a synthetic gradescope csv
+
+    assignments are named hw{idx:03d} and quiz{idx:03d} (alternating)
+
+    Args:
+        f_scope (str): output csv
+        n_student (int): number of students
+        n_ass (int): number of assignments
+        n_section (int): number of sections
+        seed (int): random seed
+    """
+    rng = np.random.default_rng(seed)
+
+    col_dict = {
+        'First Name': [f'first{idx}' for idx in range(n_student)],
+        'Last Name': [f'last{idx}' for idx in range(n_student)],
+        'SID': [f'{idx:010d}S' for idx in range(n_student)],
+        'Email': [f'last{idx}@uni.edu' for idx in range(n_student)],
+        'section_name': [f'cs2810-34240-mathematics-of-data-models-sec-'
+                         f'{sec:02d}-spring-2022'
+                         for sec in rng.integers(n_section, size=n_student)]}
+
+    due = pd.Timestamp('2022-01-18 23:59:00-0500')
+    for idx in range(n_ass):
+        ass = f'HW{idx:03d}' if idx % 2 else f'Quiz{idx:03d}'
+        max_pts = int(rng.integers(1, 20))
+        submit = rng.random(n_student) > .1
+        score = rng.integers(0, max_pts + 1, size=n_student).astype(float)
+        score[~submit] = np.nan
+
+        late_minutes = np.where(rng.random(n_student) > .8,
+                                rng.integers(0, 5 * 24 * 60, n_student), 0)
+        late_minutes[~submit] = 0
+        submit_time = (due + pd.Timedelta(days=7 * idx) +
+                       pd.to_timedelta(late_minutes - 600, unit='min'))
+
+        col_dict[ass] = score
+        col_dict[f'{ass} - Max Points'] = max_pts
+        col_dict[f'{ass} - Submission Time'] = np.where(
+            submit, submit_time.strftime('%Y-%m-%d %H:%M:%S %z'), '')
+        col_dict[f'{ass} - Lateness (H:M:S)'] = [
+            f'{m // 60:02d}:{m % 60:02d}:00' for m in late_minutes]
+
+    pd.DataFrame(col_dict).to_csv(f_scope, index=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('f_scope', type=str)
+    parser.add_argument('--n_student', type=int, default=1000)
+    parser.add_argument('--n_ass', type=int, default=40)
+    parser.add_argument('--n_section', type=int, default=4)
+    args = parser.parse_args()
+    make_scope(args.f_scope, n_student=args.n_student, n_ass=args.n_ass,
+               n_section=args.n_section)
@@ -2,5 +2,18 @@ __version__ = '0.0.20'
 
 from .canvas import *
 from .config import *
+from .config_diff import *
+from .grade_io import *
+from .grade_result import *
 from .gradebook import *
+from .late_ledger import *
+from .late_policy import *
+from .long_format import *
+from .pipeline import *
 from .plot import *
+from .plot_svg import plot_hist_svg
+from .projection import *
+from .reconcile import *
+from .report import *
+from .store import *
+from .timeline import *
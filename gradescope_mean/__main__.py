@@ -35,17 +35,46 @@ grade_parser.add_argument(
 grade_parser.add_argument(
     '--new-config', dest='new_config', action='store_true',
     help='force creation of a fresh default config.yaml (ignores existing)')
+grade_parser.add_argument(
+    '--no-cache', dest='cache', action='store_false',
+    help='always re-parse the config (by default the parsed config is cached '
+         'in a hidden file beside it, until the config changes)')
+grade_parser.add_argument(
+    '--memo', dest='memo_dir', default=None,
+    help='folder memoizing every processing stage, so re-running after '
+         'changing only later settings (e.g. grade_thresh or waive) skips '
+         'the earlier stages (e.g. parsing the CSV)')
 grade_parser.add_argument(
     '-o', '--output', dest='f_output', default=None,
-    help='output CSV path (default: grade_full.csv in same directory as '
+    help='output path (default: grade_full.<format> in same directory as '
          'the Gradescope CSV)')
+grade_parser.add_argument(
+    '--no-journal', dest='journal', action='store_false',
+    help='skip appending the cells which changed since the last run to the '
+         'journal beside the output (grade_full.journal.jsonl, see history)')
+grade_parser.add_argument(
+    '--format', dest='fmt', default=None,
+    choices=gradescope_mean.GRADE_FORMAT_LIST,
+    help='output format (default: from suffix of --output, else csv), must '
+         'match a .csv / .parquet / .feather suffix of --output.  parquet / '
+         'feather require pyarrow')
+grade_parser.add_argument(
+    '--columns', dest='columns', default=None,
+    help='comma-separated output columns.  Groups "meta", "grade" and '
+         '"perc" expand to the metadata, grade and percentage columns '
+         '(default: all)')
 grade_parser.add_argument(
     '--plot', dest='f_hist', nargs='?', const='hist.html', default=None,
     help='generate histogram HTML per assignment category '
-         '(default filename: hist.html)')
+         '(default filename: hist.html).  A filename ending in .svg writes '
+         'a static SVG instead')
 grade_parser.add_argument(
     '--late_csv', dest='f_late_csv', default=None,
     help='output CSV of late days per student-assignment pair')
+grade_parser.add_argument(
+    '--late_ledger', dest='f_late_ledger', default=None,
+    help='output CSV of every late student-assignment pair: late days, '
+         'excuse days allocated to it and its penalty')
 grade_parser.add_argument(
     '--per_student', dest='per_stud', action='store_true',
     help='output a CSV per student into a per_student/ folder')
@@ -61,14 +90,20 @@ canvas_parser = subparsers.add_parser(
          '/upload_canvas.md)')
 canvas_parser.add_argument(
     'grade_full', type=str,
-    help='output CSV of "gradescope-mean grade" command')
+    help='output of "gradescope-mean grade" command (csv, parquet or '
+         'feather)')
 canvas_parser.add_argument(
-    'canvas', type=str,
-    help='CSV of grades downloaded from Canvas')
+    'canvas', type=str, nargs='+',
+    help='CSV of grades downloaded from Canvas (one per section of a '
+         'cross-listed course may be given)')
 canvas_parser.add_argument(
     '--scale100', action='store_true',
     help='scale output by 100 (grades between 0-100) to avoid Canvas '
          'rounding ambiguity')
+canvas_parser.add_argument(
+    '--mapping', dest='f_mapping', default=None,
+    help='CSV matching canvas sid (left) to gradescope sid (right) of '
+         'students whose sid differs, e.g. a reviewed canvas_mapping*.csv')
 canvas_parser.add_argument(
     '-q', '--quiet', action='store_true',
     help='suppress informational output')
@@ -81,7 +116,8 @@ banner_parser = subparsers.add_parser(
          '/upload_banner.md)')
 banner_parser.add_argument(
     'grade_full', type=str,
-    help='output CSV of "gradescope-mean grade" command')
+    help='output of "gradescope-mean grade" command (csv, parquet or '
+         'feather)')
 banner_parser.add_argument(
     'term_code', type=str,
     help='Banner term code (added as a new column)')
@@ -92,6 +128,279 @@ banner_parser.add_argument(
     '-q', '--quiet', action='store_true',
     help='suppress informational output')
 
+# ---------- "timeline" subcommand ----------
+timeline_parser = subparsers.add_parser(
+    'timeline',
+    help='submission time quantiles and late counts per assignment')
+timeline_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV (Assignments > Download Grades > CSV)')
+timeline_parser.add_argument(
+    '-o', '--output', dest='f_output', default=None,
+    help='output CSV path (default: timeline.csv in same directory as the '
+         'Gradescope CSV)')
+timeline_parser.add_argument(
+    '--quantiles', dest='quantiles', default='.1,.5,.9',
+    help='comma-separated quantiles of submission time (default: .1,.5,.9)')
+timeline_parser.add_argument(
+    '--grace_period_minutes', dest='grace_period_minutes', type=int,
+    default=60,
+    help='lateness within this many minutes is not late (default: 60)')
+timeline_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "store" subcommand ----------
+store_parser = subparsers.add_parser(
+    'store',
+    help='sqlite database of grades across courses / terms')
+store_subparsers = store_parser.add_subparsers(dest='store_command')
+
+store_import_parser = store_subparsers.add_parser(
+    'import',
+    help='grade a Gradescope CSV and import it into the database')
+store_import_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV (Assignments > Download Grades > CSV)')
+store_import_parser.add_argument(
+    '--db', dest='f_db', required=True,
+    help='sqlite database file (created if needed)')
+store_import_parser.add_argument(
+    '--course', required=True,
+    help='course name (e.g. cs2810)')
+store_import_parser.add_argument(
+    '--term', required=True,
+    help='term (e.g. 202310), re-importing a course / term replaces it')
+store_import_parser.add_argument(
+    '--config', dest='f_config', default=None,
+    help='YAML configuration file (default: config.yaml in same directory '
+         'as the CSV, if it exists)')
+store_import_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+store_query_parser = store_subparsers.add_parser(
+    'query',
+    help='query the database')
+store_query_parser.add_argument(
+    'sql', type=str, nargs='?', default=None,
+    help='SQL query (tables: term, student, assignment, score, late_day, '
+         'grade, category_grade)')
+store_query_parser.add_argument(
+    '--db', dest='f_db', required=True,
+    help='sqlite database file')
+store_query_parser.add_argument(
+    '--email', default=None,
+    help='final grades of this student in every course / term')
+store_query_parser.add_argument(
+    '--section_mean', dest='course', default=None,
+    help='mean grade per section per term of this course')
+store_query_parser.add_argument(
+    '-o', '--output', dest='f_output', default=None,
+    help='output CSV path (default: print)')
+store_query_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "explain" subcommand ----------
+explain_parser = subparsers.add_parser(
+    'explain',
+    help="one student's grade breakdown (category means, drops, late days)")
+explain_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV (Assignments > Download Grades > CSV)')
+explain_parser.add_argument(
+    'email', type=str,
+    help='student email (matched by prefix, before @)')
+explain_parser.add_argument(
+    '--config', dest='f_config', default=None,
+    help='YAML configuration file (default: config.yaml in same directory '
+         'as the CSV, if it exists)')
+explain_parser.add_argument(
+    '--no-cache', dest='cache', action='store_false',
+    help='neither read nor write the snapshot of the processed gradebook '
+         '(written by explain beside the CSV)')
+explain_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "diff" subcommand ----------
+diff_parser = subparsers.add_parser(
+    'diff',
+    help='students whose letter differs between two configs')
+diff_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV (Assignments > Download Grades > CSV)')
+diff_parser.add_argument(
+    '--config', dest='f_config_list', action='append', required=True,
+    help='YAML configuration file, given twice (before, then after)')
+diff_parser.add_argument(
+    '-o', '--output', dest='f_diff', default=None,
+    help='output CSV of changed students (default: print only)')
+diff_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "project" subcommand ----------
+project_parser = subparsers.add_parser(
+    'project',
+    help='projected letter grade probabilities of an in-progress course '
+         '(scores of assignments to come are sampled)')
+project_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV (Assignments > Download Grades > CSV)')
+project_parser.add_argument(
+    '--config', dest='f_config', default=None,
+    help='YAML configuration file (default: config.yaml in same directory '
+         'as the CSV, if it exists)')
+project_parser.add_argument(
+    '--remaining', nargs='+', default=list(), metavar='CATEGORY=N',
+    help='number of assignments still to come per category, e.g. hw=3 '
+         'exam=1')
+project_parser.add_argument(
+    '--ungraded', nargs='+', default=list(), metavar='ASSIGNMENT',
+    help='assignments in the CSV which are not graded yet')
+project_parser.add_argument(
+    '--n_sample', type=int, default=1000,
+    help='samples per student (default: 1000)')
+project_parser.add_argument(
+    '--source', choices=['student', 'class'], default='student',
+    help="sample each student's own scores in the category (default) or "
+         "the whole class's")
+project_parser.add_argument(
+    '--seed', type=int, default=None,
+    help='random seed (for reproducible output)')
+project_parser.add_argument(
+    '--prior', nargs='+', default=list(), metavar='CATEGORY=P,...',
+    help='percentages sampled for a category with nothing graded yet, e.g. '
+         'exam=0.7,0.8,0.9 (default: every graded score of the class)')
+project_parser.add_argument(
+    '-o', '--output', dest='f_project', default=None,
+    help='output CSV (default: project.csv in same directory as the CSV)')
+project_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "reconcile" subcommand ----------
+reconcile_parser = subparsers.add_parser(
+    'reconcile',
+    help='propose Gradescope emails for email_list entries not found, '
+         'writes a mapping CSV to review and set as email_mapping in config')
+reconcile_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV (Assignments > Download Grades > CSV)')
+reconcile_parser.add_argument(
+    '--config', dest='f_config', default=None,
+    help='YAML configuration file (default: config.yaml in same directory '
+         'as the CSV, if it exists)')
+reconcile_parser.add_argument(
+    '-o', '--output', dest='f_mapping', default=None,
+    help='output mapping CSV (default: email_mapping.csv in same '
+         'directory as the CSV)')
+reconcile_parser.add_argument(
+    '--min_score', type=float, default=.3,
+    help='candidates scoring below this (0 to 1) are not proposed '
+         '(default: .3)')
+reconcile_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "report" subcommand ----------
+report_parser = subparsers.add_parser(
+    'report',
+    help='summary per section (or other metadata column): means, letter '
+         'counts, late days and completion rates')
+report_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV (Assignments > Download Grades > CSV)')
+report_parser.add_argument(
+    '--config', dest='f_config', default=None,
+    help='YAML configuration file (default: config.yaml in same directory '
+         'as the CSV, if it exists)')
+report_parser.add_argument(
+    '--by', default='sections',
+    help='metadata column to group students by (default: sections, the '
+         'section column)')
+report_parser.add_argument(
+    '-o', '--output', dest='f_report', default=None,
+    help='output CSV (default: report.csv in same directory as the CSV)')
+report_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "stats" subcommand ----------
+stats_parser = subparsers.add_parser(
+    'stats',
+    help='statistics per assignment (completion, difficulty, '
+         'discrimination, late and waived rates) to spot broken assignments')
+stats_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV (Assignments > Download Grades > CSV)')
+stats_parser.add_argument(
+    '--config', dest='f_config', default=None,
+    help='YAML configuration file (default: config.yaml in same directory '
+         'as the CSV, if it exists)')
+stats_parser.add_argument(
+    '--grace_period_minutes', dest='grace_period_minutes', type=int,
+    default=60,
+    help='lateness within this many minutes is not late (default: 60)')
+stats_parser.add_argument(
+    '-o', '--output', dest='f_stats', default=None,
+    help='output CSV (default: stats.csv in same directory as the CSV)')
+stats_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "history" subcommand ----------
+history_parser = subparsers.add_parser(
+    'history',
+    help="one student's grade timeline, from the journal written by grade")
+history_parser.add_argument(
+    'f_scope', type=str,
+    help='Gradescope CSV which grade was run on')
+history_parser.add_argument(
+    'email', type=str,
+    help='student email (matched by prefix, before @)')
+history_parser.add_argument(
+    '-g', '--grade', dest='f_grade', default=None,
+    help='grade output whose journal is read, as given to grade -o '
+         '(default: grade_full.csv in same directory as the CSV)')
+history_parser.add_argument(
+    '--journal', dest='f_journal', default=None,
+    help='journal file (default: beside the grade output, e.g. '
+         'grade_full.journal.jsonl)')
+history_parser.add_argument(
+    '--columns', dest='columns', default=None,
+    help='comma-separated columns to print (default: every column which '
+         'ever changed)')
+history_parser.add_argument(
+    '-o', '--output', dest='f_history', default=None,
+    help='output CSV (default: print only)')
+history_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
+# ---------- "serve" subcommand ----------
+serve_parser = subparsers.add_parser(
+    'serve',
+    help='local HTTP/JSON server which keeps gradebooks in memory')
+serve_parser.add_argument(
+    '--host', default='127.0.0.1',
+    help='host to bind (default: 127.0.0.1, local only)')
+serve_parser.add_argument(
+    '--port', type=int, default=8765,
+    help='port (default: 8765)')
+serve_parser.add_argument(
+    '--max_course', type=int, default=8,
+    help='courses kept in memory, least recently used are evicted '
+         '(default: 8)')
+serve_parser.add_argument(
+    '--max_idle', type=float, default=3600,
+    help='seconds an unused course is kept in memory (default: 3600)')
+serve_parser.add_argument(
+    '-q', '--quiet', action='store_true',
+    help='suppress informational output')
+
 
 def _setup_logging(quiet):
     """Configure logging level based on --quiet flag."""
@@ -99,6 +408,12 @@ def _setup_logging(quiet):
     logging.basicConfig(level=level, format='%(message)s', force=True)
 
 
+def _exit_bind_error(e):
+    """ logs each message of a ConfigBindError (no traceback) and exits """
+    logger.error(str(e))
+    sys.exit(1)
+
+
 def cmd_grade(args):
     """Execute the 'grade' subcommand."""
     _setup_logging(args.quiet)
@@ -107,28 +422,52 @@ def cmd_grade(args):
 
     # --- config resolution (non-interactive) ---
     if args.f_config is not None:
-        config = gradescope_mean.Config.from_file(args.f_config)
+        if args.cache:
+            config = gradescope_mean.Config.from_file_cached(args.f_config)
+        else:
+            config = gradescope_mean.Config.from_file(args.f_config)
     else:
         config = gradescope_mean.Config.resolve_config(
-            folder, force_new=args.new_config)
-
-    # process
-    gradebook, df_grade_full = config(f_scope=args.f_scope)
+            folder, force_new=args.new_config, cache=args.cache)
 
-    # output
-    f_output = args.f_output or str(folder / 'grade_full.csv')
-    df_grade_full.to_csv(f_output)
+    # output (format checked before anything is written)
+    if args.f_output is None:
+        fmt = args.fmt or 'csv'
+        f_output = str(folder / f'grade_full.{fmt}')
+    else:
+        f_output = args.f_output
+    gradescope_mean.get_format(f_output, args.fmt)
+
+    # process (GradeResult: written in row blocks, never concatenated)
+    pipeline = None
+    if args.memo_dir is not None:
+        pipeline = gradescope_mean.Pipeline(folder=args.memo_dir)
+    try:
+        gradebook, result, bound_config = config(
+            f_scope=args.f_scope, as_result=True, pipeline=pipeline,
+            return_bound=True)
+    except gradescope_mean.ConfigBindError as e:
+        _exit_bind_error(e)
+
+    result.write(f_output, fmt=args.fmt, columns=args.columns)
     logger.info(f'wrote {f_output}')
 
+    if args.journal:
+        from gradescope_mean.journal import get_f_journal, update_journal
+        f_journal = get_f_journal(f_output)
+        n_change = update_journal(result, config, args.f_scope, f_journal)
+        logger.info(f'journaled {n_change} changed cells in {f_journal}')
+
     # per-student CSVs
     if args.per_stud:
         _folder = folder / 'per_student'
         _folder.mkdir(exist_ok=True)
-        for idx, row in df_grade_full.iterrows():
-            _df = pd.DataFrame(row)
-            last = row['lastname']
-            first = row['firstname']
-            _df.to_csv(_folder / f'{last}_{first}.csv')
+        for df_block in result.iter_blocks():
+            for idx, row in df_block.iterrows():
+                _df = pd.DataFrame(row)
+                last = row['lastname']
+                first = row['firstname']
+                _df.to_csv(_folder / f'{last}_{first}.csv')
         logger.info(f'wrote per-student CSVs to {_folder}')
 
     # late days CSV
@@ -137,14 +476,33 @@ def cmd_grade(args):
         gradebook.df_lateday.to_csv(f_late.with_suffix('.csv'))
         logger.info(f'wrote {f_late}')
 
+    # late ledger (of the gradebook processed above)
+    if args.f_late_ledger is not None:
+        f_ledger = folder / args.f_late_ledger
+        bound_config.late_ledger(gradebook).to_csv(f_ledger, index=False)
+        logger.info(f'wrote {f_ledger}')
+
     # histogram
     if args.f_hist:
-        fig = gradescope_mean.plot_hist(
-            df_grade_full=df_grade_full,
-            cat_weight_dict=config.cat_weight_dict)
-        f_html = folder / args.f_hist
-        fig.write_html(str(f_html), include_plotlyjs='cdn')
-        logger.info(f'wrote {f_html}')
+        partition = None
+        if config.cat_weight_dict:
+            partition = gradebook.partition(config.cat_weight_dict.keys())
+        f_hist = folder / args.f_hist
+        if f_hist.suffix == '.svg':
+            svg = gradescope_mean.plot_hist_svg(
+                df_grade_full=result.df_grade,
+                cat_weight_dict=config.cat_weight_dict,
+                partition=partition)
+            f_hist.write_text(svg)
+        else:
+            # binned: html size doesn't grow with class size
+            fig = gradescope_mean.plot_hist(
+                df_grade_full=result.df_grade,
+                cat_weight_dict=config.cat_weight_dict,
+                partition=partition,
+                binned=True)
+            fig.write_html(str(f_hist), include_plotlyjs='cdn')
+        logger.info(f'wrote {f_hist}')
 
 
 
@@ -154,17 +512,57 @@ def cmd_canvas(args):
 
     from datetime import datetime
 
-    df_grade_full = pd.read_csv(args.grade_full)
-    df_canvas_out = gradescope_mean.canvas_merge(
-        f_canvas=args.canvas,
-        df_grade=df_grade_full,
-        rm_gradescope_meta=True,
-        scale100=args.scale100)
-
+    df_grade_full = gradescope_mean.read_grade(args.grade_full)
     timestamp = datetime.now().strftime('%b%d_%H%M')
-    f_canvas_out = args.canvas.replace('.csv', f'{timestamp}.csv')
-    df_canvas_out.to_csv(f_canvas_out, index=False)
-    logger.info(f'wrote {f_canvas_out}')
+    sid_mapping = None
+    if args.f_mapping is not None:
+        sid_mapping = gradescope_mean.load_mapping(args.f_mapping)
+
+    if len(args.canvas) == 1:
+        f_canvas = args.canvas[0]
+        df_canvas_out, df_mapping = gradescope_mean.canvas_merge(
+            f_canvas=f_canvas,
+            df_grade=df_grade_full,
+            rm_gradescope_meta=True,
+            scale100=args.scale100,
+            sid_mapping=sid_mapping,
+            return_mapping=True)
+
+        f_canvas_out = f_canvas.replace('.csv', f'{timestamp}.csv')
+        df_canvas_out.to_csv(f_canvas_out, index=False)
+        logger.info(f'wrote {f_canvas_out}')
+    else:
+        df_canvas_out_dict, df_coverage, df_mapping = \
+            gradescope_mean.canvas_merge_many(
+                f_canvas_list=args.canvas,
+                df_grade=df_grade_full,
+                rm_gradescope_meta=True,
+                scale100=args.scale100,
+                sid_mapping=sid_mapping,
+                return_mapping=True)
+
+        for f_canvas, df_canvas_out in df_canvas_out_dict.items():
+            f_canvas_out = f_canvas.replace('.csv', f'{timestamp}.csv')
+            df_canvas_out.to_csv(f_canvas_out, index=False)
+            logger.info(f'wrote {f_canvas_out}')
+
+        f_coverage = pathlib.Path(args.grade_full).with_name(
+            f'canvas_coverage{timestamp}.csv')
+        df_coverage.to_csv(f_coverage, index=False)
+        s_count = df_coverage['missing_from'].value_counts()
+        logger.info(f'wrote {f_coverage} ({s_count.get("gradescope", 0)} '
+                    f'missing from gradescope, {s_count.get("canvas", 0)} '
+                    f'missing from canvas)')
+
+    # proposed matches of students whose sid differs, review and pass back
+    # via --mapping
+    if len(df_mapping):
+        f_mapping = pathlib.Path(args.grade_full).with_name(
+            f'canvas_mapping{timestamp}.csv')
+        gradescope_mean.save_mapping(df_mapping, f_mapping)
+        logger.info(f'wrote {f_mapping} ({len(df_mapping)} proposed matches '
+                    f'of students whose sid differs, review then pass via '
+                    f'--mapping)')
 
 
 def cmd_banner(args):
@@ -173,7 +571,7 @@ def cmd_banner(args):
 
     from datetime import datetime
 
-    df = pd.read_csv(args.grade_full)
+    df = gradescope_mean.read_grade(args.grade_full)
     df['Term Code'] = args.term_code
 
     if args.crn_list:
@@ -185,11 +583,306 @@ def cmd_banner(args):
     del df['sid']
 
     timestamp = datetime.now().strftime('%b%d_%H%M')
-    f_out = args.grade_full.replace('.csv', f'_banner_{timestamp}.xlsx')
+    f_grade_full = pathlib.Path(args.grade_full)
+    f_out = str(f_grade_full.with_name(
+        f'{f_grade_full.stem}_banner_{timestamp}.xlsx'))
     df.to_excel(f_out, index=False)
     logger.info(f'wrote {f_out}')
 
 
+def cmd_timeline(args):
+    """Execute the 'timeline' subcommand."""
+    _setup_logging(args.quiet)
+
+    folder = pathlib.Path(args.f_scope).resolve().parent
+    quantiles = [float(q) for q in args.quantiles.split(',')]
+
+    gradebook = gradescope_mean.Gradebook(args.f_scope)
+    df_timeline = gradescope_mean.submission_timeline(
+        gradebook, quantiles=quantiles,
+        grace_period_minutes=args.grace_period_minutes)
+
+    f_output = args.f_output or str(folder / 'timeline.csv')
+    df_timeline.to_csv(f_output)
+    logger.info(f'wrote {f_output}')
+
+
+def _get_config(f_scope, f_config, cache=False):
+    """Config from f_config, else config.yaml next to f_scope, else default."""
+    Config = gradescope_mean.Config
+    from_file = Config.from_file_cached if cache else Config.from_file
+    if f_config is not None:
+        return from_file(f_config)
+
+    f_config = pathlib.Path(f_scope).resolve().parent / 'config.yaml'
+    if f_config.exists():
+        logger.info(f'using existing config: {f_config}')
+        return from_file(f_config)
+    return Config()
+
+
+def cmd_store(args):
+    """Execute the 'store' subcommand."""
+    _setup_logging(args.quiet)
+
+    if args.store_command == 'import':
+        config = _get_config(args.f_scope, args.f_config)
+        gradebook, result = config(f_scope=args.f_scope, as_result=True)
+        with gradescope_mean.GradeStore(args.f_db) as store:
+            store.import_grades(gradebook, result.df_grade,
+                                course=args.course, term=args.term)
+        logger.info(f'imported {args.course} {args.term} into {args.f_db}')
+
+    elif args.store_command == 'query':
+        with gradescope_mean.GradeStore(args.f_db) as store:
+            if args.email is not None:
+                df = store.student_history(args.email)
+            elif args.course is not None:
+                df = store.section_mean(args.course)
+            elif args.sql is not None:
+                df = store.query(args.sql)
+            else:
+                store_query_parser.error(
+                    'one of sql, --email or --section_mean is required')
+
+        if args.f_output is None:
+            print(df.to_string(index=False))
+        else:
+            df.to_csv(args.f_output, index=False)
+            logger.info(f'wrote {args.f_output}')
+
+    else:
+        store_parser.print_help()
+        sys.exit(1)
+
+
+def cmd_explain(args):
+    """Execute the 'explain' subcommand."""
+    _setup_logging(args.quiet)
+
+    from gradescope_mean.snapshot import load_snapshot, save_snapshot
+
+    config = _get_config(args.f_scope, args.f_config, cache=args.cache)
+    gradebook = None
+    if args.cache:
+        gradebook = load_snapshot(args.f_scope, config)
+    if gradebook is None:
+        gradebook = gradescope_mean.Gradebook(
+            args.f_scope, dtype_policy=config.dtype_policy)
+        try:
+            config.prepare(gradebook)
+        except gradescope_mean.ConfigBindError as e:
+            _exit_bind_error(e)
+        if args.cache:
+            save_snapshot(gradebook, config, args.f_scope)
+
+    try:
+        d = gradebook.explain(args.email, config)
+    except KeyError as e:
+        logger.error(str(e).strip('"\''))
+        sys.exit(1)
+
+    meta = d['meta']
+    name = ' '.join(str(meta[c]) for c in ('firstname', 'lastname')
+                    if c in meta.index)
+    df_cat = d['category'].copy()
+    df_cat['drop'] = df_cat['drop'].map(', '.join)
+    print(f'{d["email"]} ({name})')
+    print(df_cat.to_string())
+    print(f'mean: {d["mean"]:.4f}  letter: {d["letter"]}')
+
+
+def cmd_diff(args):
+    """Execute the 'diff' subcommand."""
+    _setup_logging(args.quiet)
+
+    if len(args.f_config_list) != 2:
+        logger.error('diff expects --config twice (before, then after)')
+        sys.exit(1)
+
+    name = tuple(pathlib.Path(f).name for f in args.f_config_list)
+    if name[0] == name[1]:
+        name = tuple(args.f_config_list)
+    config_a, config_b = map(gradescope_mean.Config.from_file,
+                             args.f_config_list)
+    try:
+        df_diff = gradescope_mean.diff_config(args.f_scope, config_a,
+                                              config_b, name=name)
+    except gradescope_mean.ConfigBindError as e:
+        _exit_bind_error(e)
+
+    logger.info(f'{len(df_diff)} students change letter')
+    if len(df_diff):
+        df_print = df_diff.drop(columns='meta', level=0)
+        print(df_print.to_string(float_format='{:.4f}'.format))
+    if args.f_diff is not None:
+        df_diff.to_csv(args.f_diff)
+        logger.info(f'wrote {args.f_diff}')
+
+
+def cmd_project(args):
+    """Execute the 'project' subcommand."""
+    _setup_logging(args.quiet)
+
+    remaining = dict()
+    for s in args.remaining:
+        cat, _, n = s.partition('=')
+        if not n.isdigit():
+            logger.error(f'--remaining expects CATEGORY=N, got: {s}')
+            sys.exit(1)
+        remaining[cat] = int(n)
+
+    prior = dict()
+    for s in args.prior:
+        cat, _, p = s.partition('=')
+        try:
+            prior[cat] = [float(x) for x in p.split(',')]
+        except ValueError:
+            logger.error(f'--prior expects CATEGORY=P,..., got: {s}')
+            sys.exit(1)
+
+    config = _get_config(args.f_scope, args.f_config)
+    gradebook = gradescope_mean.Gradebook(args.f_scope,
+                                          dtype_policy=config.dtype_policy)
+    try:
+        bound_config = config.prepare(gradebook)
+    except gradescope_mean.ConfigBindError as e:
+        _exit_bind_error(e)
+    df_project = gradescope_mean.project(
+        gradebook, bound_config, remaining=remaining,
+        ungraded=args.ungraded, n_sample=args.n_sample, source=args.source,
+        seed=args.seed, prior=prior)
+
+    f_project = args.f_project
+    if f_project is None:
+        f_project = pathlib.Path(args.f_scope).with_name('project.csv')
+    df_project.to_csv(f_project)
+    logger.info(f'wrote {f_project}')
+
+
+def cmd_reconcile(args):
+    """Execute the 'reconcile' subcommand."""
+    _setup_logging(args.quiet)
+
+    config = _get_config(args.f_scope, args.f_config)
+    if not config.email_list:
+        logger.error('config has no email_list to reconcile')
+        sys.exit(1)
+
+    gradebook = gradescope_mean.Gradebook(args.f_scope,
+                                          dtype_policy=config.dtype_policy)
+    email_list = [config.get_email_mapping().get(email, email)
+                  for email in config.email_list]
+    df_candidate = gradebook.email_candidate(email_list,
+                                             min_score=args.min_score)
+    df_mapping = gradescope_mean.match_best(df_candidate)
+
+    f_mapping = args.f_mapping
+    if f_mapping is None:
+        f_mapping = pathlib.Path(args.f_scope).with_name('email_mapping.csv')
+    gradescope_mean.save_mapping(df_mapping, f_mapping)
+    for left, right, score in df_mapping.itertuples(index=False):
+        logger.info(f'  {left} -> {right} (score: {score:.2f})')
+    logger.info(f'wrote {f_mapping} ({len(df_mapping)} proposed matches, '
+                f'review then set email_mapping in config)')
+
+
+def cmd_report(args):
+    """Execute the 'report' subcommand."""
+    _setup_logging(args.quiet)
+
+    config = _get_config(args.f_scope, args.f_config)
+    gradebook, result = config(args.f_scope, as_result=True)
+    try:
+        df_report = gradescope_mean.report_by(
+            gradebook, result.df_grade, by=args.by,
+            grade_thresh=config.grade_thresh)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    f_report = args.f_report
+    if f_report is None:
+        f_report = pathlib.Path(args.f_scope).with_name('report.csv')
+    df_report.to_csv(f_report)
+    logger.info(f'wrote {f_report} ({len(df_report)} groups)')
+
+
+def cmd_stats(args):
+    """Execute the 'stats' subcommand."""
+    _setup_logging(args.quiet)
+
+    config = _get_config(args.f_scope, args.f_config)
+    gradebook = gradescope_mean.Gradebook(args.f_scope,
+                                          dtype_policy=config.dtype_policy)
+    config.prepare(gradebook)
+    df_stats = gradebook.assignment_stats(
+        grace_period_minutes=args.grace_period_minutes)
+
+    f_stats = args.f_stats
+    if f_stats is None:
+        f_stats = pathlib.Path(args.f_scope).with_name('stats.csv')
+    df_stats.to_csv(f_stats)
+    logger.info(f'wrote {f_stats}')
+
+    # students who do well overall do worse on these, worth a look
+    for ass, x in df_stats['discrimination'].items():
+        if x < 0:
+            logger.warning(f'negative discrimination ({x:.2f}): {ass}')
+
+
+def cmd_history(args):
+    """Execute the 'history' subcommand."""
+    _setup_logging(args.quiet)
+
+    from gradescope_mean.journal import get_f_journal, student_history
+
+    # same default as grade
+    f_journal = args.f_journal
+    if f_journal is None:
+        f_grade = args.f_grade
+        if f_grade is None:
+            f_grade = pathlib.Path(args.f_scope).resolve().parent / \
+                      'grade_full.csv'
+        f_journal = get_f_journal(f_grade)
+
+    if not pathlib.Path(f_journal).exists():
+        logger.error(f'journal not found: {f_journal}')
+        sys.exit(1)
+    try:
+        df = student_history(f_journal, args.email)
+    except KeyError as e:
+        logger.error(str(e).strip('"\''))
+        sys.exit(1)
+
+    if args.columns is not None:
+        col_list = [c.strip() for c in args.columns.split(',') if c.strip()]
+        df = df.reindex(columns=['time', 'cause', 'changed'] + col_list)
+    print(df.to_string())
+    if args.f_history is not None:
+        df.to_csv(args.f_history)
+        logger.info(f'wrote {args.f_history}')
+
+
+def cmd_serve(args):
+    """Execute the 'serve' subcommand."""
+    _setup_logging(args.quiet)
+
+    from gradescope_mean.serve import make_server
+
+    server = make_server(host=args.host, port=args.port,
+                         max_course=args.max_course,
+                         max_idle=args.max_idle)
+    host, port = server.server_address[:2]
+    logger.info(f'serving on http://{host}:{port} (ctrl-c to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 def main(args=None):
     if args is None:
         args = parser.parse_args()
@@ -202,6 +895,16 @@ def main(args=None):
         'grade': cmd_grade,
         'canvas': cmd_canvas,
         'banner': cmd_banner,
+        'timeline': cmd_timeline,
+        'store': cmd_store,
+        'explain': cmd_explain,
+        'diff': cmd_diff,
+        'project': cmd_project,
+        'reconcile': cmd_reconcile,
+        'report': cmd_report,
+        'stats': cmd_stats,
+        'history': cmd_history,
+        'serve': cmd_serve,
     }
     dispatch[args.command](args)
 
@@ -18,6 +18,7 @@ class AssignmentList(list):
     """
     MAX_PTS = normalize(' - max points')
     LATE = normalize(' - lateness (h:m:s)')
+    SUBMIT = normalize(' - submission time')
 
     def __init__(self, ass_list):
         # normalize
@@ -65,3 +66,10 @@ class AssignmentList(list):
             raise AssignmentNotFoundError(s_error)
 
         return s_assign_tup[0]
+
+    def lookup(self, s_assign):
+        """ exact assignment name if it is one, otherwise match() """
+        ass = normalize(s_assign)
+        if ass in self:
+            return ass
+        return self.match(s_assign)
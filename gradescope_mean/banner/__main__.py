@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 
 import argparse
+import pathlib
 from datetime import datetime
 
-import pandas as pd
+from gradescope_mean.grade_io import read_grade
 
 parser = argparse.ArgumentParser(description='preps xls for banner upload ('
                                              'https://github.com/matthigger/gradescope_mean/blob/main/doc/upload_banner.md)')
 parser.add_argument('grade_full', type=str,
-                    help='output csv of gradescope_mean CLI')
+                    help='output of gradescope_mean CLI (csv, parquet or '
+                         'feather)')
 parser.add_argument('term_code', type=str,
                     help='banner term code (new column)')
 parser.add_argument('-c', '--crn', action='append', dest='crn_list',
@@ -20,7 +22,7 @@ def main(args=None):
     if args is None:
         args = parser.parse_args()
 
-    df = pd.read_csv(args.grade_full)
+    df = read_grade(args.grade_full)
 
     df['Term Code'] = args.term_code
 
@@ -33,7 +35,9 @@ def main(args=None):
 
     # output csv
     timestamp = datetime.now().strftime('%b%d_%H%M')
-    f_canvas_out = args.grade_full.replace('.csv', f'_banner_{timestamp}.xlsx')
+    f_grade_full = pathlib.Path(args.grade_full)
+    f_canvas_out = f_grade_full.with_name(
+        f'{f_grade_full.stem}_banner_{timestamp}.xlsx')
     df.to_excel(f_canvas_out, index=False)
 
 
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+from .late_ledger import LEDGER_COL_LIST
+
+
+class ConfigBindError(ValueError):
+    """ every reference in a config which doesn't resolve against a gradebook
+
+    Attributes:
+        error_list (list): one message per unresolved reference
+    """
+
+    def __init__(self, error_list):
+        self.error_list = list(error_list)
+        s = '\n'.join(f'  {msg}' for msg in self.error_list)
+        super().__init__(f'config does not match gradebook:\n{s}')
+
+
+class BoundConfig:
+    """ a Config resolved against one gradebook, see Config.bind()
+
+    Every name is resolved (and validated) when bound, so processing never
+    matches names again.  Indices refer to ass_list / emails of the
+    gradebook as bound (after email_list pruning, before any other stage).
+
+    Attributes:
+        config (Config): configuration
+        fingerprint (str): Gradebook.fingerprint() when bound
+        ass_list (np.array): assignments when bound
+        sub_idx_dict (dict): keys are index of substituted assignment, values
+            are arrays of indices of its substitutes (including itself)
+        remove_idx (np.array): indices of excluded assignments
+        waive_idx (tuple): arrays of student and assignment indices of every
+            waived student-assignment pair
+        late_waive_dict (dict): keys are emails, values are lists of
+            assignments (exact emails and names, see Gradebook.average())
+        cat_late_dict (dict): as Config.cat_late_dict, but with exact
+            excuse_day_offset emails
+        curve_idx_dict (dict): keys are index of curved assignment, values
+            are curves (see check_curve())
+    """
+
+    def __init__(self, config, fingerprint, ass_list, sub_idx_dict,
+                 remove_idx, waive_idx, late_waive_dict, cat_late_dict,
+                 curve_idx_dict=None):
+        self.config = config
+        self.fingerprint = fingerprint
+        self.ass_list = np.asarray(ass_list, dtype=object)
+        self.sub_idx_dict = sub_idx_dict
+        self.remove_idx = np.asarray(remove_idx, dtype=int)
+        self.waive_idx = tuple(np.asarray(idx, dtype=int) for idx in waive_idx)
+        self.late_waive_dict = late_waive_dict
+        self.cat_late_dict = cat_late_dict
+        if curve_idx_dict is None:
+            self.curve_idx_dict = dict()
+        else:
+            self.curve_idx_dict = curve_idx_dict
+
+    def __call__(self, gradebook):
+        """ substitutes, removes, waives, curves and averages a gradebook
+
+        Args:
+            gradebook (Gradebook): the gradebook this config was bound to
+
+        Returns:
+            result (GradeResult): see Gradebook.average_result()
+        """
+        self.prepare(gradebook)
+        return self.average(gradebook)
+
+    def prepare(self, gradebook):
+        """ substitutes, removes, waives and curves a gradebook (in place)
+
+        Args:
+            gradebook (Gradebook): the gradebook this config was bound to
+        """
+        if gradebook.fingerprint() != self.fingerprint:
+            raise ValueError('gradebook changed since config was bound, '
+                             'call Config.bind() again')
+        self.substitute(gradebook)
+        self.remove(gradebook)
+        self.waive(gradebook)
+        self.curve(gradebook)
+
+    def substitute(self, gradebook):
+        """ first stage of prepare(), substitutes assignments (in place) """
+        if self.sub_idx_dict:
+            gradebook.substitute(sub_dict={
+                self.ass_list[idx_to]: list(self.ass_list[idx_from])
+                for idx_to, idx_from in self.sub_idx_dict.items()},
+                exclude_source=self.config.sub_exclude, skip_match=True)
+
+    def remove(self, gradebook):
+        """ second stage of prepare(), excludes assignments (in place) """
+        gradebook.remove_many(
+            list(self.ass_list[self.remove_idx]),
+            min_complete_thresh=self.config.exclude_complete_thresh,
+            skip_match=True)
+
+    def waive(self, gradebook):
+        """ third stage of prepare(), waives assignments (in place) """
+        # assignment indices shift once some are removed
+        email_idx, ass_idx = self.waive_idx
+        ass_idx = gradebook.df_perc.columns.get_indexer(
+            self.ass_list[ass_idx])
+        keep = ass_idx >= 0
+        if keep.any():
+            gradebook.waive_idx(email_idx[keep], ass_idx[keep])
+
+    def curve(self, gradebook):
+        """ last stage of prepare(), curves assignments (in place) """
+        # curves of excluded assignments are ignored
+        ass_set = set(gradebook.df_perc.columns)
+        curve_dict = {self.ass_list[idx]: curve
+                      for idx, curve in self.curve_idx_dict.items()
+                      if self.ass_list[idx] in ass_set}
+        gradebook.curve(curve_dict, skip_match=True)
+
+    def get_average_kwargs(self, gradebook):
+        """ arguments of Gradebook.average() for a prepared gradebook """
+        config = self.config
+        ass_set = set(gradebook.ass_list)
+        late_waive_dict = {email: [ass for ass in ass_list if ass in ass_set]
+                           for email, ass_list in self.late_waive_dict.items()}
+
+        return dict(cat_weight_dict=config.cat_weight_dict,
+                    cat_drop_dict=config.cat_drop_dict,
+                    cat_late_dict=self.cat_late_dict,
+                    grade_thresh=config.grade_thresh,
+                    late_waive_dict=late_waive_dict)
+
+    def late_ledger(self, gradebook):
+        """ late ledger of every late penalty category (see average())
+
+        Args:
+            gradebook (Gradebook): gradebook, after prepare()
+
+        Returns:
+            df_ledger (pd.DataFrame): see Gradebook.late_ledger(), columns are
+                LEDGER_COL_LIST
+        """
+        kwargs = self.get_average_kwargs(gradebook)
+        cat_weight_dict = kwargs['cat_weight_dict'] or {'': 1}
+        partition = gradebook.partition(cat_weight_dict.keys())
+        df_list = [gradebook.late_ledger(
+            cat=cat, waive_dict=kwargs['late_waive_dict'],
+            partition=partition, **late)
+            for cat, late in self.cat_late_dict.items()]
+        if not df_list:
+            return pd.DataFrame(columns=LEDGER_COL_LIST)
+        return pd.concat(df_list, ignore_index=True)
+
+    def average(self, gradebook):
+        """ averages a prepared gradebook (see prepare())
+
+        Args:
+            gradebook (Gradebook): gradebook, after prepare()
+
+        Returns:
+            result (GradeResult): see Gradebook.average_result()
+        """
+        return gradebook.average_result(**self.get_average_kwargs(gradebook))
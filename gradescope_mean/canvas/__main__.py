@@ -3,14 +3,13 @@
 import argparse
 from datetime import datetime
 
-import pandas as pd
-
 import gradescope_mean
 
 parser = argparse.ArgumentParser(description='preps csv for canvas upload ('
                                              'https://github.com/matthigger/gradescope_mean/blob/main/doc/upload_canvas.md)')
 parser.add_argument('grade_full', type=str,
-                    help='output csv of gradescope_mean CLI')
+                    help='output of gradescope_mean CLI (csv, parquet or '
+                         'feather)')
 parser.add_argument('canvas', type=str,
                     help='csv of grades downloaded from canvas ')
 parser.add_argument('--scale100', dest='scale100', action='store_true',
@@ -24,7 +23,7 @@ def main(args=None):
     if args is None:
         args = parser.parse_args()
 
-    df_grade_full = pd.read_csv(args.grade_full)
+    df_grade_full = gradescope_mean.read_grade(args.grade_full)
 
     df_canvas_out = gradescope_mean.canvas_merge(f_canvas=args.canvas,
                                                  df_grade=df_grade_full,
@@ -1,8 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
+from ..reconcile import match_best, reconcile
+
+# we discard all canvas grades
+N_COL_CANVAS_META = 5
+
 
 def canvas_merge(f_canvas, df_grade, del_col_list=None,
-                 rm_gradescope_meta=True, scale100=True):
+                 rm_gradescope_meta=True, scale100=True, sid_mapping=None,
+                 return_mapping=False):
     """ merges canvas and gradescope data
 
     Args:
@@ -15,31 +23,21 @@ def canvas_merge(f_canvas, df_grade, del_col_list=None,
             'firstname', 'lastname', 'sid', 'sections', 'sid (banner)'
         scale100 (bool): if True, scales grades by 100 (canvas displays with
             precision 2 and rounds this final value ...)
+        sid_mapping (dict): keys are canvas sids, values are gradescope sids
+            they should match (see canvas_reconcile())
+        return_mapping (bool): if True, returns df_mapping too
 
     Returns:
         df_canvas_out (pd.DataFrame): canvas consistent dataframe of grades
+        df_mapping (pd.DataFrame): only if return_mapping, proposed gradescope
+            sid of canvas students whose sid doesn't match, see
+            canvas_reconcile()
     """
-
-    if del_col_list is None:
-        del_col_list = list()
-
-    if rm_gradescope_meta:
-        del_col_list += ['firstname', 'lastname', 'sid', 'sections']
-
-    # we discard all canvas grades
-    N_COL_CANVAS_META = 5
-
-    # load df_canvas & merge
-    df_canvas = pd.read_csv(f_canvas)
-    df_canvas = df_canvas.iloc[:, :N_COL_CANVAS_META]
-
-    # merge
-    df_canvas.set_index('SIS User ID', inplace=True)
-    df_grade.set_index('sid', inplace=True)
-    df_canvas_out = df_canvas.merge(df_grade,
-                                    left_index=True,
-                                    right_index=True,
-                                    how='left')
+    df_canvas = read_canvas(f_canvas)
+    df_grade = index_sid(df_grade, sid_mapping=sid_mapping)
+    df_canvas_out = _merge(df_canvas, df_grade, del_col_list=del_col_list,
+                           rm_gradescope_meta=rm_gradescope_meta,
+                           scale100=scale100)
 
     def print_missing(df, idx_missing, msg, n_cols=3):
         print(msg)
@@ -60,6 +58,103 @@ def canvas_merge(f_canvas, df_grade, del_col_list=None,
                   idx_missing=idx_missing,
                   msg='students in gradescope, not in canvas:')
 
+    if return_mapping:
+        return df_canvas_out, canvas_reconcile(df_canvas, df_grade)
+    return df_canvas_out
+
+
+def read_canvas(f_canvas):
+    """ reads canvas csv, keeps only its metadata columns
+
+    Returns:
+        df_canvas (pd.DataFrame): index is 'SIS User ID'
+    """
+    df_canvas = pd.read_csv(f_canvas)
+    df_canvas = df_canvas.iloc[:, :N_COL_CANVAS_META]
+    return df_canvas.set_index('SIS User ID')
+
+
+def index_sid(df_grade, sid_mapping=None):
+    """ df_grade indexed by sid (a copy, df_grade isn't modified)
+
+    Args:
+        df_grade (pd.DataFrame): processed grades
+        sid_mapping (dict): keys are canvas sids, values are gradescope sids.
+            mapped gradescope sids are replaced by their canvas sid
+    """
+    if df_grade.index.name == 'email':
+        # keep email as a column, canvas_reconcile() matches on it
+        df_grade = df_grade.reset_index()
+    if df_grade.index.name != 'sid':
+        df_grade = df_grade.set_index('sid')
+    if sid_mapping:
+        df_grade = df_grade.rename(index={sid_gs: sid_canvas for
+                                          sid_canvas, sid_gs in
+                                          sid_mapping.items()})
+    return df_grade
+
+
+def canvas_reconcile(df_canvas, df_grade, min_score=.5):
+    """ proposes gradescope sid of canvas students whose sid doesn't match
+
+    Canvas students not in gradescope are compared to gradescope students not
+    in canvas by email (canvas 'SIS Login ID') and name, see reconcile().
+
+    Args:
+        df_canvas (pd.DataFrame): see read_canvas()
+        df_grade (pd.DataFrame): see index_sid(), sid_mapping is expected to
+            be applied already.  if not indexed by sid it is indexed here
+        min_score (float): candidates below this score aren't proposed
+
+    Returns:
+        df_mapping (pd.DataFrame): left is canvas sid, right is gradescope
+            sid, see match_best()
+    """
+    df_grade = index_sid(df_grade)
+    idx_canvas = ~df_canvas.index.isin(df_grade.index)
+    idx_grade = ~df_grade.index.isin(df_canvas.index)
+    df_canvas = df_canvas.loc[idx_canvas, :]
+    df_grade = df_grade.loc[idx_grade, :]
+    if df_canvas.empty or df_grade.empty or 'email' not in df_grade.columns:
+        return match_best(reconcile([], []))
+
+    col_name = [c for c in ('firstname', 'lastname') if c in df_grade.columns]
+    name_left = name_right = None
+    if col_name:
+        name_left = df_canvas['Student'].astype(str).tolist()
+        name_right = df_grade[col_name].astype(str).agg(' '.join, axis=1)
+        name_right = name_right.tolist()
+    df_candidate = reconcile(
+        email_left=df_canvas['SIS Login ID'].astype(str).tolist(),
+        email_right=df_grade['email'].astype(str).tolist(),
+        name_left=name_left,
+        name_right=name_right,
+        id_left=df_canvas.index.tolist(),
+        id_right=df_grade.index.tolist(),
+        min_score=min_score)
+    return match_best(df_candidate)
+
+
+def _merge(df_canvas, df_grade, del_col_list=None, rm_gradescope_meta=True,
+           scale100=True):
+    """ merges canvas (see read_canvas()) & grades (see index_sid()) """
+    if del_col_list is None:
+        del_col_list = list()
+    else:
+        del_col_list = list(del_col_list)
+
+    # merge
+    df_canvas_out = df_canvas.merge(df_grade,
+                                    left_index=True,
+                                    right_index=True,
+                                    how='left')
+
+    if rm_gradescope_meta:
+        # sid is the index, restored as a column below
+        del_col_list += [col for col in ('firstname', 'lastname', 'sid',
+                                         'sections')
+                         if col in df_canvas_out.columns or col == 'sid']
+
     # strip out any missing data
     df_canvas_out.index.name = 'sid'
     df_canvas_out.reset_index(inplace=True)
@@ -75,4 +170,92 @@ def canvas_merge(f_canvas, df_grade, del_col_list=None,
             if pd.api.types.is_numeric_dtype(dtype):
                 df_canvas_out[col] = df_canvas_out[col] * 100
 
-    return df_canvas_out
\ No newline at end of file
+    return df_canvas_out
+
+
+def canvas_merge_many(f_canvas_list, df_grade, del_col_list=None,
+                      rm_gradescope_meta=True, scale100=True,
+                      max_workers=None, sid_mapping=None,
+                      return_mapping=False):
+    """ merges many canvas files (e.g. one per section) against one grade file
+
+    df_grade is indexed by sid once, each canvas file is then read & merged
+    against it in its own thread.
+
+    Args:
+        f_canvas_list (list): canvas csv outputs
+        df_grade (pd.DataFrame): see canvas_merge()
+        del_col_list (list): see canvas_merge()
+        rm_gradescope_meta (bool): see canvas_merge()
+        scale100 (bool): see canvas_merge()
+        max_workers (int): threads (default: see ThreadPoolExecutor)
+        sid_mapping (dict): see canvas_merge()
+        return_mapping (bool): if True, returns df_mapping too
+
+    Returns:
+        df_canvas_out_dict (dict): keys are f_canvas, values are outputs of
+            canvas_merge()
+        df_coverage (pd.DataFrame): one row per student missing on either
+            side.  columns are sid, missing_from ('gradescope' or 'canvas'),
+            f_canvas (canvas file of student, if missing from gradescope),
+            candidate_sid & score (most similar gradescope student missing
+            from canvas, see canvas_reconcile()) and Student / firstname /
+            lastname (name as given by either side)
+        df_mapping (pd.DataFrame): only if return_mapping, see
+            canvas_reconcile() (all canvas files against df_grade)
+    """
+    df_grade = index_sid(df_grade, sid_mapping=sid_mapping)
+
+    def merge(f_canvas):
+        df_canvas = read_canvas(f_canvas)
+        df_canvas_out = _merge(df_canvas, df_grade,
+                               del_col_list=del_col_list,
+                               rm_gradescope_meta=rm_gradescope_meta,
+                               scale100=scale100)
+        return df_canvas, df_canvas_out
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        out_list = list(executor.map(merge, f_canvas_list))
+
+    # coverage: canvas students not in gradescope (per file) and gradescope
+    # students not in any canvas file
+    df_list = list()
+    sid_canvas = set()
+    for f_canvas, (df_canvas, _) in zip(f_canvas_list, out_list):
+        sid_canvas.update(df_canvas.index)
+        df_missing = df_canvas.loc[~df_canvas.index.isin(df_grade.index),
+                                   ['Student']]
+        df_missing['missing_from'] = 'gradescope'
+        df_missing['f_canvas'] = str(f_canvas)
+        df_list.append(df_missing)
+
+    col_name = [c for c in ('firstname', 'lastname') if c in df_grade.columns]
+    df_missing = df_grade.loc[~df_grade.index.isin(list(sid_canvas)),
+                              col_name].copy()
+    df_missing['missing_from'] = 'canvas'
+    df_missing['f_canvas'] = None
+    df_list.append(df_missing)
+
+    df_coverage = pd.concat(df_list)
+    df_coverage.index.name = 'sid'
+    df_coverage = df_coverage.reset_index()
+
+    # propose a gradescope student per canvas student missing from gradescope
+    df_mapping = canvas_reconcile(
+        pd.concat([df_canvas for df_canvas, _ in out_list]), df_grade)
+    df_candidate = df_mapping.rename(columns={'left': 'sid',
+                                              'right': 'candidate_sid'})
+    df_candidate['missing_from'] = 'gradescope'
+    df_coverage = df_coverage.merge(df_candidate, how='left',
+                                    on=['sid', 'missing_from'])
+
+    col_first = ['sid', 'missing_from', 'f_canvas', 'candidate_sid', 'score']
+    df_coverage = df_coverage[col_first + [c for c in df_coverage.columns
+                                           if c not in col_first]]
+
+    df_canvas_out_dict = {f_canvas: df_canvas_out
+                          for f_canvas, (_, df_canvas_out)
+                          in zip(f_canvas_list, out_list)}
+    if return_mapping:
+        return df_canvas_out_dict, df_coverage, df_mapping
+    return df_canvas_out_dict, df_coverage
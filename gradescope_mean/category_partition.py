@@ -0,0 +1,58 @@
+from warnings import warn
+
+import numpy as np
+
+
+class CategoryPartition:
+    """ assignment columns per category, computed once per assignment list
+
+    An assignment belongs to a category when the category name is a
+    substring of the (normalized) assignment name.  Categories should
+    partition the assignments, any which are in no category or in multiple
+    categories are recorded (see warn()).
+
+    Attributes:
+        cat_list (tuple): category names, in input order
+        cat_idx_dict (dict): keys are categories, values are integer column
+            indices (into ass_list) of the assignments in the category
+        cat_ass_dict (dict): keys are categories, values are lists of
+            assignment names in the category
+        cat_points_dict (dict): keys are categories, values are points per
+            assignment in the category (same order as cat_idx_dict)
+        ass_not_include (list): assignments in no category
+        ass_over_include (list): assignments in more than one category
+    """
+
+    def __init__(self, ass_list, points, cat_list):
+        self.cat_list = tuple(cat_list)
+        points = np.asarray(points)
+
+        self.cat_idx_dict = dict()
+        self.cat_ass_dict = dict()
+        self.cat_points_dict = dict()
+        cat_count = np.zeros(len(ass_list), dtype=int)
+        for cat in self.cat_list:
+            idx = np.flatnonzero([cat in ass for ass in ass_list])
+            self.cat_idx_dict[cat] = idx
+            self.cat_ass_dict[cat] = [ass_list[i] for i in idx]
+            self.cat_points_dict[cat] = points[idx]
+            cat_count[idx] += 1
+
+        ass_array = np.array(ass_list, dtype=object)
+        self.ass_not_include = sorted(ass_array[cat_count < 1])
+        self.ass_over_include = sorted(ass_array[cat_count > 1])
+
+    @property
+    def is_partition(self):
+        """ True if every assignment is in exactly one category """
+        return not (self.ass_not_include or self.ass_over_include)
+
+    def warn(self):
+        """ warns if categories don't partition assignments """
+        if self.ass_not_include:
+            s = ', '.join(self.ass_not_include)
+            warn(f'assignment not in any category: {s}')
+
+        if self.ass_over_include:
+            s = ', '.join(self.ass_over_include)
+            warn(f'assignment in multiple categories: {s}')
@@ -1,11 +1,20 @@
+import hashlib
 import pathlib
+import pickle
 import shutil
 from datetime import datetime
 
+import numpy as np
 from ruamel.yaml import YAML
 
-from .assign_list import normalize
+from .assign_list import AssignmentNotFoundError, normalize
+from .bound_config import BoundConfig, ConfigBindError
+from .config_cache import ConfigCache, get_file_key
+from .curve import check_curve
+from .dtype_policy import get_dtype_policy
 from .gradebook import Gradebook
+from .late_policy import check_late_policy
+from .reconcile import load_mapping
 
 F_CONFIG_DEFAULT = (pathlib.Path(__file__).parent / 'config.yaml').resolve()
 yaml = YAML(typ='safe')
@@ -16,7 +25,8 @@ class Config:
                  remove_list=tuple(), sub_dict=None, waive_dict=None,
                  email_list=None, cat_late_dict=None,
                  exclude_complete_thresh=0, grade_thresh=None,
-                 late_waive_dict=None):
+                 late_waive_dict=None, dtype_policy=None, sub_exclude=False,
+                 email_mapping=None, curve_dict=None):
         if cat_weight_dict is None:
             self.cat_weight_dict = dict()
         else:
@@ -57,11 +67,23 @@ class Config:
         else:
             self.late_waive_dict = late_waive_dict
 
+        if curve_dict is None:
+            self.curve_dict = dict()
+        else:
+            self.curve_dict = curve_dict
+
         if exclude_complete_thresh is None:
             self.exclude_complete_thresh = 0
         else:
             self.exclude_complete_thresh = exclude_complete_thresh
         self.grade_thresh = grade_thresh
+        self.dtype_policy = dtype_policy
+        self.sub_exclude = bool(sub_exclude)
+        # dict or mapping csv (see get_email_mapping())
+        self.email_mapping = email_mapping
+
+        # ConfigCache (if loaded via from_file_cached)
+        self._cache = None
 
         self._normalize()
 
@@ -108,13 +130,22 @@ class Config:
         self.cat_late_dict = {normalize(c): l
                               for c, l in self.cat_late_dict.items()}
 
-        # lowercase email keys inside excuse_day_offset
+        # lowercase email keys inside excuse_day_offset, normalize
+        # assignments of per assignment max_penalty
         for cat, d in self.cat_late_dict.items():
             if isinstance(d, dict) and 'excuse_day_offset' in d:
                 offset = d['excuse_day_offset']
                 if isinstance(offset, dict):
                     d['excuse_day_offset'] = {
                         e.lower(): v for e, v in offset.items()}
+            if isinstance(d, dict) and \
+                    isinstance(d.get('max_penalty'), dict):
+                d['max_penalty'] = {normalize(ass): v for ass, v in
+                                    d['max_penalty'].items()}
+
+        # validate late policies (raises ValueError)
+        for cat, d in self.cat_late_dict.items():
+            check_late_policy(d, name=cat)
 
         self.late_waive_dict = {
             email.lower(): self._parse_waive_value(
@@ -124,6 +155,10 @@ class Config:
         self.late_waive_dict = {k: v for k, v in self.late_waive_dict.items()
                                 if v}
 
+        # validate curves (raises ValueError), filling in defaults
+        self.curve_dict = {normalize(ass): check_curve(curve, name=ass)
+                           for ass, curve in self.curve_dict.items()}
+
         # lowercase email list entries
         self.email_list = [e.lower() for e in self.email_list]
 
@@ -149,41 +184,342 @@ class Config:
                     f'exclude_complete_thresh must be between 0 and 1, '
                     f'got {t!r}')
 
-    def __call__(self, f_scope):
+        # validate dtype_policy (raises ValueError if unknown)
+        get_dtype_policy(self.dtype_policy)
+
+    def _get_state(self):
+        """ normalized config (everything but the cache), see ConfigCache """
+        return {k: v for k, v in vars(self).items() if k != '_cache'}
+
+    def get_f_email_mapping(self):
+        """ email_mapping csv (None if not given or given as a dict) """
+        if not self.email_mapping or isinstance(self.email_mapping, dict):
+            return None
+        return pathlib.Path(self.email_mapping)
+
+    def get_key(self, key_mapping_prev=None):
+        """ sha256 of the normalized config and its email_mapping csv
+
+        email_mapping is stored as the path of its csv, the contents of the
+        csv are hashed too (see get_file_key()) so editing the mapping
+        changes the key.
+
+        Args:
+            key_mapping_prev (dict): previous key of the mapping csv, see
+                get_file_key()
+
+        Returns:
+            key (str): sha256 hex digest
+        """
+        key_list = [self._get_state()]
+        f_mapping = self.get_f_email_mapping()
+        if f_mapping is not None:
+            key_list.append(get_file_key(
+                f_mapping, key_prev=key_mapping_prev)['sha256'])
+        return hashlib.sha256(pickle.dumps(key_list)).hexdigest()
+
+    def get_email_mapping(self):
+        """ email_mapping as a dict, read from its csv if it is a file
+
+        Returns:
+            mapping (dict): keys are emails of email_list, values are emails
+                of gradebook (see Gradebook.prune_email()), lowercase
+        """
+        if not self.email_mapping:
+            return dict()
+        mapping = self.email_mapping
+        if not isinstance(mapping, dict):
+            mapping = load_mapping(mapping)
+        return {k.lower(): v.lower() for k, v in mapping.items()}
+
+    def _get_offset_list(self):
+        """ excuse_day_offset dicts (keys are emails) of every category """
+        return [d['excuse_day_offset'] for d in self.cat_late_dict.values()
+                if isinstance(d, dict) and
+                isinstance(d.get('excuse_day_offset'), dict)]
+
+    def _resolve_names(self, gradebook):
+        """ resolves every email & assignment name of config against gradebook
+
+        Emails are resolved as in Gradebook._resolve_email(), assignments as
+        in AssignmentList.lookup().  If the config was loaded via
+        from_file_cached() the resolutions are cached per
+        Gradebook.fingerprint().
+
+        Args:
+            gradebook (Gradebook): gradebook
+
+        Returns:
+            resolve (dict): keys are 'email' and 'ass', values are dicts from
+                config name to gradebook name.  names which don't resolve
+                aren't included
+        """
+        fingerprint = None
+        if self._cache is not None:
+            fingerprint = gradebook.fingerprint()
+            resolve = self._cache.get_resolve(fingerprint)
+            if resolve is not None:
+                return resolve
+
+        email_set = set(self.waive_dict) | set(self.late_waive_dict)
+        for offset in self._get_offset_list():
+            email_set.update(offset)
+        ass_set = set(self.sub_dict) | set(self.curve_dict)
+        for ass_list in self.sub_dict.values():
+            ass_set.update(ass_list)
+        for d in (self.waive_dict, self.late_waive_dict):
+            for ass_list in d.values():
+                ass_set.update(ass_list)
+        for d in self.cat_late_dict.values():
+            if isinstance(d, dict) and isinstance(d.get('max_penalty'), dict):
+                ass_set.update(d['max_penalty'])
+
+        email_index = set(gradebook.df_perc.index)
+        email_dict = dict()
+        for email in email_set:
+            _email = gradebook._resolve_email(email)
+            if _email in email_index:
+                email_dict[email] = _email
+
+        ass_dict = dict()
+        for ass in ass_set:
+            try:
+                ass_dict[ass] = gradebook.ass_list.lookup(ass)
+            except AssignmentNotFoundError:
+                continue
+        resolve = {'email': email_dict, 'ass': ass_dict}
+
+        if self._cache is not None:
+            self._cache.set_resolve(fingerprint, resolve)
+        return resolve
+
+    def bind(self, gradebook):
+        """ resolves every reference of config against gradebook, at once
+
+        Categories, excludes, substitutes, waivers, late waivers and curves
+        are all resolved before any processing.  References which don't
+        resolve (e.g. a weighted category with no assignments yet, an
+        exclude which matches nothing or a waiver of a missing assignment)
+        are ignored, with a single warning which lists them all, as are
+        emails not in the gradebook.  Only contradictions within the config
+        (drop_low or late_penalty of a category without weight) are errors.
+
+        Substitutes, excludes, waivers and curves are bound to indices.
+        Categories, late waivers, excuse_day_offset and per assignment
+        max_penalty are bound to exact names: assignments are removed after
+        binding, so categories are partitioned (by the exact names) once the
+        gradebook is prepared.
+
+        Args:
+            gradebook (Gradebook): gradebook (after email_list is pruned)
+
+        Returns:
+            bound_config (BoundConfig): call on gradebook to process it
+
+        Raises:
+            ConfigBindError: lists every contradiction
+        """
+        from warnings import warn
+
+        resolve = self._resolve_names(gradebook)
+        email_dict, ass_dict = resolve['email'], resolve['ass']
+        ass_list = list(gradebook.ass_list)
+        ass_idx_dict = {ass: idx for idx, ass in enumerate(ass_list)}
+        email_idx_dict = {email: idx
+                          for idx, email in enumerate(gradebook.df_perc.index)}
+        error_list = list()
+        missing_list = list()
+        email_missing = set()
+
+        def get_ass(ass, field):
+            if ass not in ass_dict:
+                missing_list.append(f'{field}: no unique assignment "{ass}"')
+                return None
+            return ass_dict[ass]
+
+        def get_email(email):
+            if email not in email_dict:
+                email_missing.add(email)
+                return None
+            return email_dict[email]
+
+        # categories
+        for cat in self.cat_weight_dict:
+            if not any(cat in ass for ass in ass_list):
+                missing_list.append(f'weight: category "{cat}" matches no '
+                                    f'assignment')
+        for field, d in (('drop_low', self.cat_drop_dict),
+                         ('late_penalty', self.cat_late_dict)):
+            for cat in d:
+                if cat not in self.cat_weight_dict:
+                    error_list.append(f'{field}: category "{cat}" has no '
+                                      f'weight')
+
+        # excludes
+        remove_idx = set()
+        for s in self.remove_list:
+            idx = {ass_idx_dict[ass]
+                   for ass in gradebook.ass_list.match_iter(s)}
+            if not idx:
+                missing_list.append(f'exclude: no assignment "{s}"')
+            remove_idx |= idx
+        remove_idx = sorted(remove_idx)
+
+        # substitutes
+        sub_idx_dict = dict()
+        for ass_to, ass_from_list in self.sub_dict.items():
+            _ass_to = get_ass(ass_to, 'substitute')
+            _ass_from_list = [get_ass(ass, f'substitute ({ass_to})')
+                              for ass in ass_from_list]
+            if _ass_to is None:
+                continue
+            idx_from = {ass_idx_dict[ass] for ass in _ass_from_list
+                        if ass is not None}
+            idx_from.add(ass_idx_dict[_ass_to])
+            sub_idx_dict[ass_idx_dict[_ass_to]] = np.array(sorted(idx_from))
+
+        # waivers
+        email_idx, ass_idx = list(), list()
+        for email, a_list in self.waive_dict.items():
+            _ass_list = [get_ass(ass, f'waive ({email})') for ass in a_list]
+            _email = get_email(email)
+            if _email is None:
+                continue
+            for ass in _ass_list:
+                if ass is not None:
+                    email_idx.append(email_idx_dict[_email])
+                    ass_idx.append(ass_idx_dict[ass])
+
+        # curves
+        curve_idx_dict = dict()
+        for ass, curve in self.curve_dict.items():
+            _ass = get_ass(ass, 'curve')
+            if _ass is not None:
+                curve_idx_dict[ass_idx_dict[_ass]] = curve
+
+        late_waive_dict = dict()
+        for email, a_list in self.late_waive_dict.items():
+            _ass_list = [get_ass(ass, f'waive_late ({email})')
+                         for ass in a_list]
+            _email = get_email(email)
+            if _email is None:
+                continue
+            # two config emails may resolve to the same student
+            late_waive_dict.setdefault(_email, []).extend(
+                ass for ass in _ass_list if ass is not None)
+
+        cat_late_dict = dict()
+        for cat, d in self.cat_late_dict.items():
+            if isinstance(d, dict) and \
+                    isinstance(d.get('excuse_day_offset'), dict):
+                offset = dict()
+                for email, x in d['excuse_day_offset'].items():
+                    _email = get_email(email)
+                    if _email is not None:
+                        offset[_email] = offset.get(_email, 0) + x
+                d = {**d, 'excuse_day_offset': offset}
+            if isinstance(d, dict) and isinstance(d.get('max_penalty'), dict):
+                max_penalty = dict()
+                for ass, cap in d['max_penalty'].items():
+                    _ass = get_ass(ass, f'late_penalty ({cat}) max_penalty')
+                    if _ass is not None:
+                        max_penalty[_ass] = cap
+                d = {**d, 'max_penalty': max_penalty}
+            cat_late_dict[cat] = d
+
+        if error_list:
+            raise ConfigBindError(error_list)
+
+        if missing_list:
+            s = '\n'.join(f'  {msg}' for msg in missing_list)
+            warn(f'config does not match gradebook (ignored):\n{s}')
+        if email_missing:
+            s = '\n'.join(sorted(email_missing))
+            warn(f'email not found in gradebook (ignored):\n{s}')
+
+        return BoundConfig(config=self,
+                           fingerprint=gradebook.fingerprint(),
+                           ass_list=ass_list,
+                           sub_idx_dict=sub_idx_dict,
+                           remove_idx=remove_idx,
+                           waive_idx=(email_idx, ass_idx),
+                           late_waive_dict=late_waive_dict,
+                           cat_late_dict=cat_late_dict,
+                           curve_idx_dict=curve_idx_dict)
+
+    def __call__(self, f_scope, as_result=False, pipeline=None,
+                 return_bound=False):
         """ runs a typical processing pipeline given config and f_scop
 
         Args:
             f_scope (str): raw gradescope csv
+            as_result (bool): if True, returns a GradeResult rather than
+                copying into df_grade_full
+            pipeline (Pipeline): if given, every stage is memoized by it (see
+                Pipeline.run())
+            return_bound (bool): if True, returns bound_config too
 
         Returns:
             gradebook (Gradebook): processed gradebook
-            df_grade_full (pd.DataFrame): full data frame
+            df_grade_full (pd.DataFrame): full data frame (GradeResult if
+                as_result)
+            bound_config (BoundConfig): only if return_bound, config bound
+                to gradebook (e.g. for BoundConfig.late_ledger(gradebook))
         """
-        gradebook = Gradebook(f_scope=f_scope)
+        if pipeline is not None:
+            return pipeline.run(f_scope, self, as_result=as_result,
+                                return_bound=return_bound)
+
+        gradebook = Gradebook(f_scope=f_scope, dtype_policy=self.dtype_policy)
+        bound_config = self.prepare(gradebook)
+        result = bound_config.average(gradebook)
+
+        out = gradebook, result if as_result else result.to_frame()
+        if return_bound:
+            return out + (bound_config,)
+        return out
 
+    def prune(self, gradebook):
+        """ keeps only students of email_list (if given), in place
+
+        first stage of prepare(), a pruned gradebook can be bound (see
+        bind()) and processed any number of times
+
+        Args:
+            gradebook (Gradebook): gradebook (freshly loaded)
+        """
         if self.email_list:
-            gradebook.prune_email(email_list=self.email_list)
+            gradebook.prune_email(email_list=self.email_list,
+                                  mapping=self.get_email_mapping())
 
-        if self.sub_dict:
-            gradebook.substitute(sub_dict=self.sub_dict)
+    def prepare(self, gradebook):
+        """ prunes, substitutes, removes, waives and curves a (freshly loaded)
+        gradebook in place, everything but averaging
 
-        for ass in self.remove_list:
-            gradebook.remove(ass, multi=True)
+        Args:
+            gradebook (Gradebook): gradebook
+
+        Returns:
+            bound_config (BoundConfig): config bound to gradebook, see
+                BoundConfig.average()
+        """
+        self.prune(gradebook)
 
-        gradebook.remove_thresh(
-            min_complete_thresh=self.exclude_complete_thresh)
+        # resolve (and validate) everything before processing
+        bound_config = self.bind(gradebook)
+        bound_config.prepare(gradebook)
+        return bound_config
 
-        if self.waive_dict:
-            gradebook.waive(waive_dict=self.waive_dict)
+    def process(self, gradebook):
+        """ processes a (freshly loaded) gradebook in place, see __call__()
 
-        df_grade_full = gradebook.average_full(
-            cat_weight_dict=self.cat_weight_dict,
-            cat_drop_dict=self.cat_drop_dict,
-            cat_late_dict=self.cat_late_dict,
-            grade_thresh=self.grade_thresh,
-            late_waive_dict=self.late_waive_dict)
+        Args:
+            gradebook (Gradebook): gradebook
 
-        return gradebook, df_grade_full
+        Returns:
+            result (GradeResult): see Gradebook.average_result()
+        """
+        return self.prepare(gradebook).average(gradebook)
 
     @classmethod
     def from_file(cls, f_config):
@@ -222,20 +558,52 @@ class Config:
         cat_late_dict = _get(d, 'category', 'late_penalty')
         exclude_list = _get(d, 'assignments', 'exclude')
         sub_dict = _get(d, 'assignments', 'substitute')
+        sub_exclude = _get(d, 'assignments', 'substitute_exclude',
+                           default=False)
         waive_dict = _get(d, 'waive')
         email_list = _get(d, 'email_list')
         exclude_complete_thresh = _get(d, 'assignments',
                                        'exclude_complete_thresh')
         grade_thresh = _get(d, 'grade_thresh')
         late_waive_dict = _get(d, 'waive_late')
+        dtype_policy = _get(d, 'dtype_policy')
+        email_mapping = _get(d, 'email_mapping')
+        curve_dict = _get(d, 'curve')
+        if isinstance(email_mapping, str):
+            # mapping csv is relative to config (absolute, as the cached
+            # config may be loaded from another directory)
+            email_mapping = str((f_config.parent / email_mapping).resolve())
 
         return cls(cat_weight_dict, cat_drop_n, exclude_list, sub_dict,
                    waive_dict, email_list, cat_late_dict,
                    exclude_complete_thresh, grade_thresh=grade_thresh,
-                   late_waive_dict=late_waive_dict)
+                   late_waive_dict=late_waive_dict,
+                   dtype_policy=dtype_policy, sub_exclude=sub_exclude,
+                   email_mapping=email_mapping, curve_dict=curve_dict)
+
+    @classmethod
+    def from_file_cached(cls, f_config, f_cache=None):
+        """ loads config from yaml file, via a compiled cache if unchanged
+
+        Args:
+            f_config (str): yaml file
+            f_cache (str): cache file (default: see ConfigCache.get_f_cache())
+
+        Returns:
+            config (Config): configuration
+        """
+        cache = ConfigCache(f_config, f_cache=f_cache)
+        if cache.state is None:
+            config = cls.from_file(f_config)
+            cache.set_state(config._get_state())
+        else:
+            config = cls.__new__(cls)
+            config.__dict__.update(cache.state)
+        config._cache = cache
+        return config
 
     @classmethod
-    def resolve_config(cls, folder, force_new=False):
+    def resolve_config(cls, folder, force_new=False, cache=False):
         """Resolve config: use existing config.yaml or copy default.
 
         Non-interactive replacement for the old cli_copy_config. When no
@@ -248,15 +616,17 @@ class Config:
         Args:
             folder (pathlib.Path): directory to look for / place config
             force_new (bool): if True, always create a fresh config
+            cache (bool): if True, loads via from_file_cached()
         """
         import logging
         logger = logging.getLogger('gradescope_mean')
 
         f_config = pathlib.Path(folder) / F_CONFIG_DEFAULT.name
+        from_file = cls.from_file_cached if cache else cls.from_file
 
         if f_config.exists() and not force_new:
             logger.info(f'using existing config: {f_config.resolve()}')
-            return cls.from_file(f_config)
+            return from_file(f_config)
 
         # need to create a new config
         if f_config.exists():
@@ -271,7 +641,7 @@ class Config:
             f'https://github.com/matthigger/gradescope_mean#configuration'
             f' for details:\n  {f_config}')
 
-        return cls.from_file(f_config)
+        return from_file(f_config)
 
     @classmethod
     def cli_copy_config(cls, folder):
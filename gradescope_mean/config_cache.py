@@ -0,0 +1,147 @@
+import hashlib
+import pathlib
+import pickle
+
+
+def get_file_key(f, key_prev=None):
+    """ sha256, mtime and size of a file
+
+    Args:
+        f (pathlib.Path): file
+        key_prev (dict): previous key of f, its sha256 is reused (not
+            recomputed) if mtime and size are unchanged
+
+    Returns:
+        key (dict): keys are sha256, mtime_ns and size
+    """
+    stat = f.stat()
+    if key_prev is not None and \
+            key_prev.get('mtime_ns') == stat.st_mtime_ns and \
+            key_prev.get('size') == stat.st_size:
+        sha256 = key_prev['sha256']
+    else:
+        sha256 = hashlib.sha256(f.read_bytes()).hexdigest()
+    return {'sha256': sha256,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size}
+
+
+class ConfigCache:
+    """ compiled config, cached (pickled) next to its yaml file
+
+    Parsing yaml and normalizing every key (waive strings, emails, ...) is
+    done once per version of the yaml file.  The cache also keeps the
+    assignment / email resolutions of the config against the last few
+    gradebooks (see Gradebook.fingerprint()), so re-running an unchanged
+    config on an unchanged roster skips the matching too.
+
+    The cache is valid if the sha256 of the yaml (and of its email_mapping
+    csv, if any) matches.  mtime and size are a fast path: if both match the
+    hash isn't recomputed.
+
+    Attributes:
+        f_config (pathlib.Path): yaml file
+        f_cache (pathlib.Path): cache file
+        state (dict): normalized config, see Config._get_state() (None if
+            cache is invalid)
+        resolve_dict (dict): keys are gradebook fingerprints, values are
+            resolutions (see Config._resolve_names())
+    """
+    VERSION = 7
+
+    # number of gradebook fingerprints whose resolutions are kept
+    RESOLVE_MAX = 8
+
+    def __init__(self, f_config, f_cache=None):
+        self.f_config = pathlib.Path(f_config)
+        if f_cache is None:
+            f_cache = self.get_f_cache(self.f_config)
+        self.f_cache = pathlib.Path(f_cache)
+
+        self.state = None
+        self.resolve_dict = dict()
+        self._key = None
+        self._key_mapping = None
+
+        self._load()
+
+    @staticmethod
+    def get_f_cache(f_config):
+        """ default cache file, hidden file beside f_config """
+        f_config = pathlib.Path(f_config)
+        return f_config.with_name(f'.{f_config.name}.cache')
+
+    def _load(self):
+        d_cache = None
+        if self.f_cache.exists():
+            try:
+                with open(self.f_cache, 'rb') as f:
+                    d_cache = pickle.load(f)
+            except Exception:
+                # corrupt or written by an incompatible version, rebuild it
+                d_cache = None
+            if not isinstance(d_cache, dict) or \
+                    d_cache.get('version') != self.VERSION:
+                d_cache = None
+
+        self._key = get_file_key(self.f_config, key_prev=d_cache)
+        if d_cache is None or d_cache['sha256'] != self._key['sha256']:
+            return
+
+        key_mapping = self._get_key_mapping(d_cache['state'],
+                                            key_prev=d_cache['mapping'])
+        if key_mapping is not None and (
+                d_cache['mapping'] is None or
+                key_mapping['sha256'] != d_cache['mapping']['sha256']):
+            # email_mapping csv was edited (or moved)
+            return
+        self.state = d_cache['state']
+        self.resolve_dict = d_cache['resolve_dict']
+        self._key_mapping = key_mapping
+
+    @staticmethod
+    def _get_key_mapping(state, key_prev=None):
+        """ key of the email_mapping csv of state (None if there is none)
+
+        A csv which doesn't exist has a key with sha256 None.
+        """
+        f = state.get('email_mapping')
+        if not isinstance(f, str):
+            return None
+        f = pathlib.Path(f)
+        if not f.exists():
+            return {'sha256': None}
+        return get_file_key(f, key_prev=key_prev)
+
+    def save(self):
+        """ writes cache file (silently skipped if folder isn't writable) """
+        d_cache = {'version': self.VERSION,
+                   **self._key,
+                   'mapping': self._key_mapping,
+                   'state': self.state,
+                   'resolve_dict': self.resolve_dict}
+        try:
+            with open(self.f_cache, 'wb') as f:
+                pickle.dump(d_cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+
+    def set_state(self, state):
+        """ stores compiled config, discards resolutions of old config """
+        self.state = state
+        self.resolve_dict = dict()
+        self._key_mapping = self._get_key_mapping(state)
+        self.save()
+
+    def get_resolve(self, fingerprint):
+        """ resolutions against gradebook with fingerprint (None if absent) """
+        return self.resolve_dict.get(fingerprint)
+
+    def set_resolve(self, fingerprint, resolve):
+        """ stores resolutions against gradebook with fingerprint """
+        self.resolve_dict.pop(fingerprint, None)
+        self.resolve_dict[fingerprint] = resolve
+        while len(self.resolve_dict) > self.RESOLVE_MAX:
+            # dicts are ordered, first key is oldest
+            del self.resolve_dict[next(iter(self.resolve_dict))]
+        self.save()
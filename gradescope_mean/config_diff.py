@@ -0,0 +1,156 @@
+import json
+
+import pandas as pd
+
+from .gradebook import Gradebook
+
+# config attributes which change the gradebook before averaging
+PREPARE_ATTR_LIST = ['email_list', 'email_mapping', 'remove_list', 'sub_dict',
+                     'sub_exclude', 'waive_dict', 'exclude_complete_thresh',
+                     'curve_dict']
+
+
+def _freeze(x):
+    """ hashable (and order independent) key of a config value """
+    return json.dumps(x, sort_keys=True, default=str)
+
+
+class AverageMemo:
+    """ intermediates of Gradebook.average(), shared between configs
+
+    Built on the kernel of Gradebook.average() (category_late() and
+    category_mean()): late days are keyed by grace period, late penalties by
+    all their parameters and category means by drop count and late penalty,
+    each within one prepared gradebook.  So averaging a second config only
+    computes what differs, e.g. nothing but the weighted sum if only weights
+    differ.
+
+    Attributes:
+        memo (dict): keys are tuples, first item is kind of intermediate
+            ('mean', 'lateday' or 'late'), second is key of gradebook
+        n_compute (dict): keys are kinds, values are number computed
+    """
+
+    def __init__(self):
+        self.memo = dict()
+        self.n_compute = {'mean': 0, 'lateday': 0, 'late': 0}
+
+    def _get(self, key, fnc):
+        if key not in self.memo:
+            self.memo[key] = fnc()
+            self.n_compute[key[0]] += 1
+        return self.memo[key]
+
+    def average(self, gradebook, bound_config, key):
+        """ as BoundConfig.average(), reusing intermediates
+
+        Args:
+            gradebook (Gradebook): gradebook, after bound_config.prepare()
+            bound_config (BoundConfig): bound config
+            key (str): identifies gradebook (same key, same gradebook)
+
+        Returns:
+            df_grade (pd.DataFrame): as Gradebook.average()
+        """
+        config = bound_config.config
+        cat_weight_dict = config.cat_weight_dict
+        if not cat_weight_dict:
+            # all assignments contain ''
+            cat_weight_dict = {'': 1}
+        partition = gradebook.partition(cat_weight_dict.keys())
+
+        late_waive_dict = bound_config.get_average_kwargs(gradebook)[
+            'late_waive_dict']
+
+        df_grade = pd.DataFrame(index=gradebook.df_perc.index)
+        for cat in partition.cat_list:
+            cat_late, late_key = None, None
+            if cat in bound_config.cat_late_dict:
+                late = bound_config.cat_late_dict[cat]
+                grace = late.get('grace_period_minutes', 60)
+
+                def get_late():
+                    df_lateday = self._get(
+                        ('lateday', key, grace),
+                        lambda: gradebook._compute_lateday(
+                            grace_period_minutes=grace))
+                    return gradebook.category_late(
+                        cat=cat, partition=partition,
+                        waive_dict=late_waive_dict, df_lateday=df_lateday,
+                        **late)
+
+                late_key = _freeze(late), _freeze(late_waive_dict)
+                cat_late = self._get(('late', key, cat) + late_key, get_late)
+
+            drop_n = config.cat_drop_dict.get(cat, 0)
+            df_grade[f'mean_{cat}'] = self._get(
+                ('mean', key, cat, drop_n, late_key),
+                lambda: gradebook.category_mean(
+                    cat=cat, partition=partition, drop_n=drop_n,
+                    cat_late=cat_late))
+            if cat_late is not None:
+                df_grade[f'late days remain ({cat})'] = -cat_late['unexcused']
+
+        return Gradebook.combine_category(df_grade, cat_weight_dict,
+                                          grade_thresh=config.grade_thresh)
+
+
+def diff_config(f_scope, config_a, config_b, name=('a', 'b'), memo=None):
+    """ students whose letter differs between two configs
+
+    The csv is parsed once per dtype_policy and prepared (pruned,
+    substituted, excluded, waived and curved) once per distinct preparation,
+    then every intermediate the configs share is computed once (see
+    AverageMemo).
+
+    Args:
+        f_scope (str): gradescope csv
+        config_a (Config): configuration (before)
+        config_b (Config): configuration (after)
+        name (tuple): names of config_a and config_b in output
+        memo (AverageMemo): shared intermediates (default: new)
+
+    Returns:
+        df_diff (pd.DataFrame): index is email of students whose letter
+            changed, columns are ('meta', metadata column) then (name,
+            column of Gradebook.average()) of each config
+    """
+    if memo is None:
+        memo = AverageMemo()
+
+    gradebook_dict = dict()
+    df_grade_list = list()
+    for config in (config_a, config_b):
+        key_parse = _freeze(config.dtype_policy)
+        if key_parse not in gradebook_dict:
+            gradebook_dict[key_parse] = Gradebook(
+                f_scope, dtype_policy=config.dtype_policy)
+
+        key = _freeze([key_parse] + [getattr(config, attr)
+                                     for attr in PREPARE_ATTR_LIST])
+        if key not in gradebook_dict:
+            gradebook = gradebook_dict[key_parse].copy()
+            if config.email_list:
+                gradebook.prune_email(email_list=config.email_list,
+                                      mapping=config.get_email_mapping())
+            # (pruned, prepared) gradebook, configs are bound to the former
+            gradebook_dict[key] = gradebook, None
+        gradebook, gradebook_prepared = gradebook_dict[key]
+
+        bound_config = config.bind(gradebook)
+        if gradebook_prepared is None:
+            gradebook_prepared = gradebook.copy()
+            bound_config.prepare(gradebook_prepared)
+            gradebook_dict[key] = gradebook, gradebook_prepared
+        df_grade_list.append(memo.average(gradebook_prepared, bound_config,
+                                          key=key))
+
+    df_a, df_b = df_grade_list
+    df_a, df_b = df_a.align(df_b, join='outer', axis=0)
+    changed = df_a['letter'] != df_b['letter']
+    df_meta = gradebook_dict[_freeze(config_a.dtype_policy)].df_meta
+    df_meta = df_meta.reindex(df_a.index[changed])
+
+    return pd.concat({'meta': df_meta,
+                      name[0]: df_a.loc[changed, :],
+                      name[1]: df_b.loc[changed, :]}, axis=1)
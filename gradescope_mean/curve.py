@@ -0,0 +1,144 @@
+import warnings
+
+import numpy as np
+
+# keys of one assignment's curve (see check_curve()), and their defaults
+CURVE_DEFAULT = {'mean': None,
+                 'std': None,
+                 'percentile': None,
+                 'to': 1,
+                 'raise_only': True,
+                 'max': None}
+
+
+def check_curve(curve, name=''):
+    """ validates one assignment's curve, filling in defaults
+
+    A curve either matches a target mean (and optionally std), via z-scores:
+
+        perc' = mean + std * (perc - perc.mean()) / perc.std()
+
+    or scales percentages so the given percentile scores `to`:
+
+        perc' = perc * to / perc.quantile(percentile / 100)
+
+    Curved percentages are floored at 0 (and capped at max, if given).  If
+    raise_only, no percentage is lowered by the curve (a student keeps the
+    larger of their curved and uncurved percentage).
+
+    Args:
+        curve (dict): see CURVE_DEFAULT
+        name (str): assignment, used in error messages
+
+    Returns:
+        curve (dict): every key of CURVE_DEFAULT
+    """
+    if not isinstance(curve, dict):
+        raise ValueError(f'curve ({name}): expected a mapping, got {curve!r}')
+    unknown = set(curve) - set(CURVE_DEFAULT)
+    if unknown:
+        raise ValueError(f'curve ({name}): unknown keys {sorted(unknown)}')
+    curve = {**CURVE_DEFAULT,
+             **{k: v for k, v in curve.items() if v is not None}}
+
+    if (curve['mean'] is None) == (curve['percentile'] is None):
+        raise ValueError(f'curve ({name}): give exactly one of mean or '
+                         f'percentile')
+    if curve['std'] is not None and curve['mean'] is None:
+        raise ValueError(f'curve ({name}): std requires mean')
+    if curve['percentile'] is not None and \
+            not 0 <= curve['percentile'] <= 100:
+        raise ValueError(f'curve ({name}): percentile must be between 0 and '
+                         f'100, got {curve["percentile"]!r}')
+    if curve['std'] is not None and curve['std'] < 0:
+        raise ValueError(f'curve ({name}): std must be non-negative, got '
+                         f'{curve["std"]!r}')
+    curve['raise_only'] = bool(curve['raise_only'])
+    return curve
+
+
+def get_ass_stats(perc, q=(.25, .5, .75)):
+    """ statistics of every assignment at once, ignoring nan (waived)
+
+    Args:
+        perc (np.array): (n_student, n_ass) percentages
+        q (tuple): quantiles (between 0 and 1)
+
+    Returns:
+        stats (dict): keys are 'count', 'mean', 'std' (population) and
+            'quantile', values are arrays of n_ass ('quantile' is (len(q),
+            n_ass)).  nan for assignments without any percentage
+    """
+    perc = np.asarray(perc, dtype=float)
+    with warnings.catch_warnings():
+        # all nan assignments (everyone waived) are nan, without warning
+        warnings.simplefilter('ignore', RuntimeWarning)
+        stats = {'count': (~np.isnan(perc)).sum(axis=0),
+                 'mean': np.nanmean(perc, axis=0),
+                 'std': np.nanstd(perc, axis=0)}
+        if len(q) and perc.shape[0]:
+            stats['quantile'] = np.nanquantile(perc, q, axis=0)
+        else:
+            stats['quantile'] = np.full((len(q), perc.shape[1]), np.nan)
+    return stats
+
+
+def get_curve_param(perc, curve_list):
+    """ scale and offset of each assignment's curve, perc' = perc * a + b
+
+    Every statistic is computed for all curved assignments in one pass (a
+    single quantile call over every distinct percentile).
+
+    Args:
+        perc (np.array): (n_student, n_ass) percentages, nan ignored
+        curve_list (list): curve per assignment (see check_curve())
+
+    Returns:
+        scale (np.array): a, per assignment
+        offset (np.array): b, per assignment
+    """
+    perc = np.asarray(perc, dtype=float)
+    q_list = sorted({c['percentile'] / 100 for c in curve_list
+                     if c['percentile'] is not None})
+    stats = get_ass_stats(perc, q=q_list)
+
+    n_ass = len(curve_list)
+    scale = np.ones(n_ass)
+    offset = np.zeros(n_ass)
+    for idx, curve in enumerate(curve_list):
+        if curve['mean'] is not None:
+            mean, std = stats['mean'][idx], stats['std'][idx]
+            if curve['std'] is not None and std > 0:
+                scale[idx] = curve['std'] / std
+            offset[idx] = curve['mean'] - mean * scale[idx]
+        else:
+            q_idx = q_list.index(curve['percentile'] / 100)
+            x = stats['quantile'][q_idx, idx]
+            if x > 0:
+                scale[idx] = curve['to'] / x
+
+    # assignments without percentages aren't curved
+    valid = np.isfinite(scale) & np.isfinite(offset)
+    scale[~valid] = 1
+    offset[~valid] = 0
+    return scale, offset
+
+
+def apply_curve(perc, curve_list):
+    """ curves each assignment (column) of perc
+
+    Args:
+        perc (np.array): (n_student, n_ass) percentages, nan stay nan
+        curve_list (list): curve per assignment (see check_curve())
+
+    Returns:
+        perc_curve (np.array): (n_student, n_ass) curved percentages
+    """
+    perc = np.asarray(perc, dtype=float)
+    scale, offset = get_curve_param(perc, curve_list)
+    raise_only = np.array([c['raise_only'] for c in curve_list], dtype=bool)
+    cap = np.array([np.inf if c['max'] is None else c['max']
+                    for c in curve_list], dtype=float)
+
+    perc_curve = np.clip(perc * scale + offset, 0, cap)
+    return np.where(raise_only, np.fmax(perc_curve, perc), perc_curve)
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from .perc_to_letter import GRADE_THRESH
+
+# dtypes of Gradebook matrices.  keys:
+#   perc: df_perc
+#   late_minutes: df_late_minutes
+#   lateday: df_lateday (None keeps int, which becomes float once waived)
+#   meta: 'category' casts repetitive df_meta columns (e.g. section) to
+#       pd.Categorical, None leaves them as python str
+DTYPE_DEFAULT = {'perc': 'float64',
+                 'late_minutes': 'int64',
+                 'lateday': None,
+                 'meta': None}
+
+DTYPE_COMPACT = {'perc': 'float32',
+                 'late_minutes': 'int32',
+                 'lateday': 'Int16',
+                 'meta': 'category'}
+
+DTYPE_POLICY_DICT = {'default': DTYPE_DEFAULT,
+                     'compact': DTYPE_COMPACT}
+
+# a meta column is categorical if it has fewer unique values than this
+# fraction of students
+META_CATEGORY_RATIO = .5
+
+
+def get_dtype_policy(dtype_policy=None):
+    """ gets full dtype policy
+
+    Args:
+        dtype_policy (str or dict): None or 'default' for DTYPE_DEFAULT,
+            'compact' for DTYPE_COMPACT.  a dict overrides some keys of
+            DTYPE_DEFAULT
+
+    Returns:
+        dtype_policy (dict): has every key of DTYPE_DEFAULT
+    """
+    if dtype_policy is None:
+        return dict(DTYPE_DEFAULT)
+
+    if isinstance(dtype_policy, str):
+        if dtype_policy not in DTYPE_POLICY_DICT:
+            raise ValueError(
+                f'unknown dtype_policy {dtype_policy!r}, must be one of '
+                f'{", ".join(DTYPE_POLICY_DICT)} (or a dict)')
+        return dict(DTYPE_POLICY_DICT[dtype_policy])
+
+    key_extra = set(dtype_policy) - set(DTYPE_DEFAULT)
+    if key_extra:
+        raise ValueError(f'unknown dtype_policy keys: {sorted(key_extra)}')
+    return {**DTYPE_DEFAULT, **dtype_policy}
+
+
+def cast_int(df, dtype):
+    """ casts to integer dtype, raises if values don't fit
+
+    Args:
+        df (pd.DataFrame): integer valued
+        dtype (str): integer dtype (e.g. 'int16' or nullable 'Int16')
+
+    Returns:
+        df (pd.DataFrame): cast to dtype
+    """
+    if dtype is None:
+        return df
+
+    dtype = pd.api.types.pandas_dtype(dtype)
+    info = np.iinfo(getattr(dtype, 'numpy_dtype', dtype))
+    values = df.to_numpy(dtype=float, na_value=np.nan)
+    if values.size and (np.nanmax(values, initial=0) > info.max or
+                        np.nanmin(values, initial=0) < info.min):
+        raise OverflowError(f'values exceed range of {dtype}, use a larger '
+                            f'dtype in dtype_policy')
+    return df.astype(dtype)
+
+
+def cast_meta(df_meta, meta_dtype, skip_col=('sid',)):
+    """ casts repetitive metadata columns to pd.Categorical
+
+    Args:
+        df_meta (pd.DataFrame): see Gradebook.df_meta
+        meta_dtype (str): 'category' or None (no cast)
+        skip_col (tuple): columns never cast
+
+    Returns:
+        df_meta (pd.DataFrame): with some columns categorical
+    """
+    if meta_dtype is None:
+        return df_meta
+
+    df_meta = df_meta.copy()
+    for col in df_meta.columns:
+        if col in skip_col:
+            continue
+        n_unique = df_meta[col].nunique(dropna=False)
+        if n_unique < META_CATEGORY_RATIO * len(df_meta):
+            df_meta[col] = df_meta[col].astype(meta_dtype)
+    return df_meta
+
+
+def assert_grade_close(df_grade, df_grade_exp, atol=1e-6, grade_thresh=None):
+    """ asserts grades (e.g. compact dtypes) are close to expected (float64)
+
+    numeric columns must match to within atol (nan matches nan).  letters
+    must match unless the expected mean is within atol of a grade threshold
+    (where rounding may legitimately move a student across it).
+
+    Args:
+        df_grade (pd.DataFrame): output of Gradebook.average()
+        df_grade_exp (pd.DataFrame): expected output of Gradebook.average()
+        atol (float): absolute tolerance
+        grade_thresh (dict): see perc_to_letter() (default GRADE_THRESH)
+
+    Raises:
+        AssertionError: message lists every mismatched cell
+    """
+    if grade_thresh is None:
+        grade_thresh = GRADE_THRESH
+
+    assert list(df_grade.columns) == list(df_grade_exp.columns), \
+        f'columns differ: {list(df_grade.columns)} ' \
+        f'{list(df_grade_exp.columns)}'
+    assert df_grade.index.equals(df_grade_exp.index), 'index differs'
+
+    msg_list = list()
+    for col in df_grade_exp.columns:
+        if col == 'letter':
+            continue
+        x = df_grade[col].to_numpy(dtype=float, na_value=np.nan)
+        x_exp = df_grade_exp[col].to_numpy(dtype=float, na_value=np.nan)
+        close = np.isclose(x, x_exp, rtol=0, atol=atol, equal_nan=True)
+        for email in df_grade.index[~close]:
+            msg_list.append(f'{col} {email}: {df_grade.loc[email, col]} != '
+                            f'{df_grade_exp.loc[email, col]}')
+
+    if 'letter' in df_grade_exp.columns:
+        thresh = np.array(sorted(grade_thresh))
+        mean_exp = df_grade_exp['mean'].to_numpy(dtype=float)
+        dist = np.abs(mean_exp[:, None] - thresh[None, :]).min(axis=1)
+        differ = (df_grade['letter'] != df_grade_exp['letter']).to_numpy()
+        for email in df_grade.index[differ & (dist > atol)]:
+            msg_list.append(f'letter {email}: {df_grade.loc[email, "letter"]}'
+                            f' != {df_grade_exp.loc[email, "letter"]}')
+
+    if msg_list:
+        raise AssertionError('grades not close:\n' + '\n'.join(msg_list))
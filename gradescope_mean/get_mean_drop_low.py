@@ -1,7 +1,7 @@
 import numpy as np
 
 
-def get_mean_drop_low(perc, weight, drop_n=0):
+def get_mean_drop_low(perc, weight, drop_n=0, return_drop=False):
     """ drops low perc assignment (largest weight if tied), gets weighted mean
 
     we skip any assignments whose perc or weight is nan
@@ -14,24 +14,29 @@ def get_mean_drop_low(perc, weight, drop_n=0):
         perc (np.array): percentage earned per assignment
         weight (np.array): weight of each assignment
         drop_n (int): number of assignments to drop
+        return_drop (bool): if True, indices of dropped assignments are
+            returned too
     Returns:
         mean (float): mean score, weighted by weight after having dropped the
             most damaging drop_n assignments
+        idx_drop (np.array): indices (into perc) of dropped assignments, only
+            if return_drop
     """
     # cast to array & copy
     weight = np.array(weight)
     perc = np.array(perc)
 
     # drop nans
-    idx_keep = np.logical_and(~np.isnan(weight),
-                              ~np.isnan(perc))
-    weight = weight[idx_keep]
-    perc = perc[idx_keep]
+    idx_valid = np.flatnonzero(np.logical_and(~np.isnan(weight),
+                                              ~np.isnan(perc)))
+    weight = weight[idx_valid]
+    perc = perc[idx_valid]
 
     # keep assignments in with largest perc (and smaller weight if tie)
     idx_p_w_iter = enumerate(zip(perc, weight))
     iter_ass = sorted([(p, -w, idx) for idx, (p, w) in idx_p_w_iter])
     idx_keep = [idx for _, _, idx in iter_ass[drop_n:]]
+    idx_drop = idx_valid[[idx for _, _, idx in iter_ass[:drop_n]]]
 
     # drop assignments
     weight = weight[idx_keep]
@@ -39,7 +44,87 @@ def get_mean_drop_low(perc, weight, drop_n=0):
 
     if not weight.size:
         # no assignments to average
-        return np.nan
+        mean = np.nan
+    else:
+        # compute weighted average
+        mean = np.inner(perc, weight) / weight.sum()
+
+    if return_drop:
+        return mean, idx_drop
+    return mean
+
+
+def mean_drop_low(perc, weight, drop_n=0, return_drop=False):
+    """ get_mean_drop_low(), along the last axis of perc at once
+
+    Args:
+        perc (np.array): percentage per assignment (last axis), nan skipped
+        weight (np.array): weight of each assignment
+        drop_n (int): number of assignments to drop
+        return_drop (bool): if True, mask of dropped assignments is returned
+            too
+
+    Returns:
+        mean (np.array): shape of perc without its last axis, nan if no
+            assignment remains
+        drop (np.array): shape of perc, True where dropped (never nan
+            entries), only if return_drop
+    """
+    perc = np.asarray(perc, dtype=float)
+    weight = np.asarray(weight, dtype=float)
+    valid = ~np.isnan(perc) & ~np.isnan(weight)
+    drop = np.zeros(perc.shape, dtype=bool)
+    if drop_n:
+        # lowest perc first (larger weight if tied), nan last.  stable, so
+        # ties in both drop the first assignment, as get_mean_drop_low()
+        w = np.broadcast_to(-weight, perc.shape)
+        order = np.lexsort((w, perc), axis=-1)
+        np.put_along_axis(drop, order[..., :drop_n], True, axis=-1)
+        drop &= valid
+        valid &= ~drop
+
+    w = np.where(valid, weight, 0)
+    num = (np.where(valid, perc, 0) * w).sum(axis=-1)
+    den = w.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(den > 0, num / den, np.nan)
+
+    if return_drop:
+        return mean, drop
+    return mean
+
+
+def get_cat_mean(perc, weight, drop_n=0, deduct=None, penalty=None,
+                 return_drop=False):
+    """ category means: late deductions, drop lowest, weighted mean, penalty
+
+    The one kernel behind Gradebook.average(), Gradebook.explain(),
+    project() and AverageMemo.  Late deductions of a policy lower each
+    assignment's percentage, so they count before the lowest are dropped.
+
+    Args:
+        perc (np.array): percentage per assignment (last axis), nan skipped
+        weight (np.array): weight of each assignment
+        drop_n (int): number of assignments to drop
+        deduct (np.array): fraction of each assignment deducted for
+            lateness, broadcast to perc (default: none)
+        penalty (np.array): late penalty (non-positive) added to each mean,
+            shape of perc without its last axis.  means are floored at 0
+            after (default: none)
+        return_drop (bool): see mean_drop_low()
+
+    Returns:
+        mean (np.array): shape of perc without its last axis, nan if no
+            assignment remains
+        drop (np.array): see mean_drop_low(), only if return_drop
+    """
+    if deduct is not None:
+        perc = perc - deduct
+    mean, drop = mean_drop_low(perc, weight, drop_n=drop_n, return_drop=True)
+    if penalty is not None:
+        # ensure penalty doesn't drop mean below 0
+        mean = np.maximum(mean + penalty, 0)
 
-    # compute weighted average
-    return np.inner(perc, weight) / weight.sum()
+    if return_drop:
+        return mean, drop
+    return mean
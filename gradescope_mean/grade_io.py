@@ -0,0 +1,78 @@
+import pathlib
+
+import pandas as pd
+
+GRADE_FORMAT_LIST = ('csv', 'parquet', 'feather')
+
+
+def get_format(f, fmt=None):
+    """ gets output format, inferred from file suffix if fmt not given
+
+    Args:
+        f (str): file name
+        fmt (str): one of GRADE_FORMAT_LIST (or None to infer from suffix,
+            unknown suffixes are csv)
+
+    Returns:
+        fmt (str): one of GRADE_FORMAT_LIST
+    """
+    suffix = pathlib.Path(f).suffix.lstrip('.').lower()
+    if fmt is None:
+        # e.g. grades.txt (or no suffix) is written as csv
+        return suffix if suffix in GRADE_FORMAT_LIST else 'csv'
+
+    if fmt not in GRADE_FORMAT_LIST:
+        raise ValueError(f'unknown grade format {fmt!r}, must be one of '
+                         f'{", ".join(GRADE_FORMAT_LIST)}')
+    if suffix in GRADE_FORMAT_LIST and suffix != fmt:
+        raise ValueError(f'grade format {fmt!r} doesn\'t match file suffix: '
+                         f'{f}')
+    return fmt
+
+
+def select_columns(df_grade_full, columns, group_dict=None):
+    """ selects a subset of columns (keeps order given)
+
+    Args:
+        df_grade_full (pd.DataFrame): output of Gradebook.average_full()
+        columns (list): column names or group names (keys of group_dict).
+            a str is split on commas.
+        group_dict (dict): keys are group names (e.g. 'meta'), values are
+            lists of columns in the group
+
+    Returns:
+        df (pd.DataFrame): df_grade_full restricted to columns
+    """
+    if isinstance(columns, str):
+        columns = [c.strip() for c in columns.split(',') if c.strip()]
+    if group_dict is None:
+        group_dict = dict()
+
+    col_list = list()
+    for col in columns:
+        for _col in group_dict.get(col, [col]):
+            if _col not in df_grade_full.columns:
+                raise KeyError(f'column not found in grade output: {_col}')
+            if _col not in col_list:
+                col_list.append(_col)
+
+    return df_grade_full.loc[:, col_list]
+
+
+def read_grade(f, fmt=None):
+    """ reads output of GradeResult.write()
+
+    Args:
+        f (str): grade file (csv, parquet or feather)
+        fmt (str): one of GRADE_FORMAT_LIST (default: from suffix of f)
+
+    Returns:
+        df_grade_full (pd.DataFrame): email is a column (not the index),
+            as with pd.read_csv(f)
+    """
+    fmt = get_format(f, fmt)
+    if fmt == 'csv':
+        return pd.read_csv(f)
+    elif fmt == 'parquet':
+        return pd.read_parquet(f)
+    return pd.read_feather(f)
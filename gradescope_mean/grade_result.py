@@ -0,0 +1,201 @@
+import pandas as pd
+
+from .grade_io import get_format, select_columns
+
+
+class GradeResult:
+    """ metadata, grades and percentages side by side, without copying
+
+    Gradebook.average_full() concatenates these into one (wide, mixed dtype)
+    frame, which copies every block.  GradeResult only keeps references to
+    the three frames; output is written in row blocks so at most chunksize
+    rows are ever combined at once.  Use to_frame() to explicitly build the
+    combined frame.
+
+    Attributes:
+        df_meta (pd.DataFrame): see Gradebook.df_meta
+        df_grade (pd.DataFrame): see Gradebook.average()
+        df_perc (pd.DataFrame): see Gradebook.df_perc
+    """
+    CHUNKSIZE = 1024
+
+    def __init__(self, df_meta, df_grade, df_perc):
+        if not df_meta.index.equals(df_grade.index):
+            df_meta = df_meta.reindex(df_grade.index)
+        if not df_perc.index.equals(df_grade.index):
+            df_perc = df_perc.reindex(df_grade.index)
+
+        self.df_meta = df_meta
+        self.df_grade = df_grade
+        self.df_perc = df_perc
+
+    @property
+    def index(self):
+        return self.df_grade.index
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.columns)
+
+    @property
+    def columns(self):
+        return (list(self.df_meta.columns) + list(self.df_grade.columns) +
+                list(self.df_perc.columns))
+
+    @property
+    def group_dict(self):
+        """ keys are 'meta', 'grade', 'perc', values are lists of columns """
+        return {'meta': list(self.df_meta.columns),
+                'grade': list(self.df_grade.columns),
+                'perc': list(self.df_perc.columns)}
+
+    def select(self, columns=None):
+        """ resolves column / group names into a list of columns per frame
+
+        Args:
+            columns (list): column names or group names (see group_dict). a
+                str is split on commas. (default: all columns)
+
+        Returns:
+            col_list_tuple (tuple): columns of df_meta, df_grade, df_perc
+            col_order (list): all selected columns, in requested order
+        """
+        df_tuple = self.df_meta, self.df_grade, self.df_perc
+        if columns is None:
+            col_list_tuple = tuple(list(df.columns) for df in df_tuple)
+            return col_list_tuple, self.columns
+
+        # an empty frame of all columns resolves the names, without data
+        col_order = list(select_columns(pd.DataFrame(columns=self.columns),
+                                        columns,
+                                        group_dict=self.group_dict).columns)
+        col_list_tuple = tuple([c for c in col_order if c in df.columns]
+                               for df in df_tuple)
+        return col_list_tuple, col_order
+
+    def iter_blocks(self, columns=None, chunksize=None):
+        """ yields combined frames of (at most) chunksize rows
+
+        Args:
+            columns (list): see select()
+            chunksize (int): rows per block (default: CHUNKSIZE)
+
+        Yields:
+            df_block (pd.DataFrame): index is email, columns as selected
+        """
+        if chunksize is None:
+            chunksize = self.CHUNKSIZE
+        col_list_tuple, col_order = self.select(columns)
+        df_tuple = self.df_meta, self.df_grade, self.df_perc
+
+        for start in range(0, max(len(self.index), 1), chunksize):
+            stop = start + chunksize
+            df_block = pd.concat([df.iloc[start:stop][col_list]
+                                  for df, col_list in zip(df_tuple,
+                                                          col_list_tuple)],
+                                 axis=1)
+            yield df_block.loc[:, col_order]
+
+    def to_frame(self, columns=None):
+        """ materializes the combined frame (as Gradebook.average_full())
+
+        Args:
+            columns (list): see select()
+
+        Returns:
+            df_grade_full (pd.DataFrame): combined frame
+        """
+        return next(self.iter_blocks(columns=columns,
+                                     chunksize=max(len(self.index), 1)))
+
+    def to_csv(self, f, columns=None, chunksize=None):
+        """ writes csv, one row block at a time
+
+        Args:
+            f (str): output file
+            columns (list): see select()
+            chunksize (int): rows per block (default: CHUNKSIZE)
+        """
+        with open(f, 'w', newline='') as f_out:
+            for idx, df_block in enumerate(self.iter_blocks(
+                    columns=columns, chunksize=chunksize)):
+                df_block.to_csv(f_out, header=idx == 0)
+
+    def _iter_record_batch(self, columns=None, chunksize=None):
+        """ yields (schema, pyarrow.RecordBatch) per row block """
+        import pyarrow as pa
+
+        schema = None
+        for df_block in self.iter_blocks(columns=columns,
+                                         chunksize=chunksize):
+            df_block = df_block.reset_index()
+            df_block.columns = df_block.columns.map(str)
+            if schema is None:
+                # all nan object columns in the first block would be typed
+                # null, which later blocks can't be written as
+                schema = pa.Schema.from_pandas(df_block, preserve_index=False)
+                for idx, field in enumerate(schema):
+                    if pa.types.is_null(field.type):
+                        schema = schema.set(idx, field.with_type(pa.string()))
+            yield schema, pa.RecordBatch.from_pandas(df_block, schema=schema,
+                                                     preserve_index=False)
+
+    def to_parquet(self, f, columns=None, chunksize=None):
+        """ writes parquet, one row group per row block (requires pyarrow)
+
+        Args:
+            f (str): output file
+            columns (list): see select()
+            chunksize (int): rows per block (default: CHUNKSIZE)
+        """
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for schema, batch in self._iter_record_batch(
+                    columns=columns, chunksize=chunksize):
+                if writer is None:
+                    writer = pq.ParquetWriter(str(f), schema)
+                writer.write_batch(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def to_feather(self, f, columns=None, chunksize=None):
+        """ writes feather (arrow ipc file), one batch per row block
+
+        Args:
+            f (str): output file
+            columns (list): see select()
+            chunksize (int): rows per block (default: CHUNKSIZE)
+        """
+        import pyarrow as pa
+
+        writer = None
+        try:
+            for schema, batch in self._iter_record_batch(
+                    columns=columns, chunksize=chunksize):
+                if writer is None:
+                    writer = pa.ipc.new_file(str(f), schema)
+                writer.write_batch(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def write(self, f, fmt=None, columns=None, chunksize=None):
+        """ writes csv, parquet or feather
+
+        the index (student email) is written as the first column in every
+        format, so read_grade() gives the same frame regardless of format
+
+        Args:
+            f (str): output file
+            fmt (str): one of GRADE_FORMAT_LIST (default: from suffix of f)
+            columns (list): see select()
+            chunksize (int): rows per block (default: CHUNKSIZE)
+        """
+        fmt = get_format(f, fmt)
+        write_fnc = {'csv': self.to_csv,
+                     'parquet': self.to_parquet,
+                     'feather': self.to_feather}[fmt]
+        write_fnc(f, columns=columns, chunksize=chunksize)
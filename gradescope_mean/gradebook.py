@@ -1,3 +1,5 @@
+import copy
+import hashlib
 from math import ceil
 from warnings import warn
 
@@ -5,8 +7,15 @@ import numpy as np
 import pandas as pd
 
 from .assign_list import AssignmentList, AssignmentNotFoundError, normalize
-from .get_mean_drop_low import get_mean_drop_low
+from .category_partition import CategoryPartition
+from .curve import apply_curve, check_curve, get_ass_stats
+from .dtype_policy import cast_int, cast_meta, get_dtype_policy
+from .get_mean_drop_low import get_cat_mean
+from .grade_result import GradeResult
+from .late_ledger import allocate_excuse, ledger_frame
+from .late_policy import get_late_deduct
 from .perc_to_letter import perc_to_letter
+from .reconcile import reconcile
 
 
 class Gradebook:
@@ -21,10 +30,24 @@ class Gradebook:
             values are days each assignment is late
         ass_list (AssignmentList): a list of assignments
         points (np.array): points per assignment (same order as ass_list)
+        ass_version (int): incremented whenever ass_list changes, keys the
+            CategoryPartition cache
+        dtype_policy (dict): dtypes of the above, see dtype_policy.py
     """
     META_DATA_COLS = 4
 
-    def __init__(self, f_scope):
+    def __init__(self, f_scope, dtype_policy=None):
+        """
+        Args:
+            f_scope (str): raw gradescope csv
+            dtype_policy (str or dict): see get_dtype_policy().  'compact'
+                stores percentages as float32, late minutes as int32, late
+                days as nullable Int16 and repetitive metadata as categorical
+        """
+        self.dtype_policy = get_dtype_policy(dtype_policy)
+        self.f_scope = f_scope
+        self._df_submit = None
+
         df_scope = pd.read_csv(str(f_scope), index_col='Email')
 
         # groom input data
@@ -40,7 +63,8 @@ class Gradebook:
         df_scope.fillna(0, inplace=True)
 
         # store meta data
-        self.df_meta = df_scope.iloc[:, :self.META_DATA_COLS]
+        self.df_meta = cast_meta(df_scope.iloc[:, :self.META_DATA_COLS],
+                                 meta_dtype=self.dtype_policy['meta'])
 
         # compute percent per assignment & points
         self.ass_list = AssignmentList(df_scope.columns)
@@ -68,16 +92,148 @@ class Gradebook:
             self.df_late_minutes[ass] = df_scope[ass_late].map(
                 get_late_minutes)
 
+        self._init_derived()
+
+    def _init_derived(self):
+        """ applies dtype_policy, computes df_lateday and resets caches
+
+        called once df_meta, df_perc, df_late_minutes, ass_list and points
+        are set
+        """
+        self.df_perc = self.df_perc.astype(self.dtype_policy['perc'])
+        self.df_late_minutes = cast_int(self.df_late_minutes,
+                                        self.dtype_policy['late_minutes'])
+
         # legacy df_lateday: default 60-min grace, computed on demand via
         # _compute_lateday
         self.df_lateday = self._compute_lateday(grace_period_minutes=60)
 
-    def _compute_lateday(self, grace_period_minutes=60):
+        self.ass_version = 0
+        self._partition_cache = dict()
+
+    def to_long(self):
+        """ long (tidy) format: one row per student-assignment pair
+
+        Returns:
+            df_long (pd.DataFrame): columns are student (email), assignment,
+                score (points earned, nan if waived), max_pts and
+                late_minutes.  student and assignment are categorical, rows
+                are sorted by assignment then student.
+        """
+        n_student, n_ass = self.df_perc.shape
+        score = self.df_perc.to_numpy(dtype=float) * self.points[None, :]
+        late_minutes = self.df_late_minutes.reindex(
+            index=self.df_perc.index, columns=self.df_perc.columns)
+
+        # column-major ravel: sorted by assignment, then student
+        student_code = np.tile(np.arange(n_student), n_ass)
+        ass_code = np.repeat(np.arange(n_ass), n_student)
+        return pd.DataFrame({
+            'student': pd.Categorical.from_codes(
+                student_code, categories=self.df_perc.index),
+            'assignment': pd.Categorical.from_codes(
+                ass_code, categories=self.df_perc.columns),
+            'score': score.ravel(order='F'),
+            'max_pts': np.repeat(self.points, n_student),
+            'late_minutes': late_minutes.to_numpy().ravel(order='F')})
+
+    @classmethod
+    def from_long(cls, df_long, df_meta=None, dtype_policy=None):
+        """ builds gradebook from long format (see to_long())
+
+        student-assignment pairs without a row earn 0 (as an empty cell of a
+        gradescope csv), a nan score is kept (waived).
+
+        Args:
+            df_long (pd.DataFrame): columns student, assignment, score,
+                max_pts and late_minutes
+            df_meta (pd.DataFrame): see Gradebook.df_meta (default: no
+                metadata columns)
+            dtype_policy (str or dict): see get_dtype_policy()
+
+        Returns:
+            gradebook (Gradebook): f_scope is None, so submission_time() is
+                unavailable
+        """
+        gradebook = cls.__new__(cls)
+        gradebook.dtype_policy = get_dtype_policy(dtype_policy)
+        gradebook.f_scope = None
+        gradebook._df_submit = None
+
+        student = df_long['student'].astype(str).str.lower()
+        ass = df_long['assignment'].astype(str).map(normalize)
+        student_code, student_uniq = pd.factorize(student)
+        ass_code, ass_uniq = pd.factorize(ass)
+
+        # points per assignment
+        max_pts = df_long['max_pts'].to_numpy(dtype=float)
+        points = np.full(len(ass_uniq), np.nan)
+        points[ass_code] = max_pts
+        assert (points[ass_code] == max_pts).all(), 'multiple max pts'
+
+        # scatter into student x assignment matrices
+        shape = len(student_uniq), len(ass_uniq)
+        score = np.zeros(shape)
+        score[student_code, ass_code] = df_long['score'].to_numpy(dtype=float)
+        late_minutes = np.zeros(shape, dtype=np.int64)
+        late_minutes[student_code, ass_code] = df_long['late_minutes']
+
+        # order columns as AssignmentList does
+        gradebook.ass_list = AssignmentList(
+            [a + AssignmentList.MAX_PTS for a in ass_uniq])
+        col_idx = pd.Index(ass_uniq).get_indexer(gradebook.ass_list)
+        index = pd.Index(student_uniq, name='email')
+
+        gradebook.points = points[col_idx]
+        gradebook.df_perc = pd.DataFrame(
+            score[:, col_idx] / gradebook.points[None, :],
+            index=index, columns=list(gradebook.ass_list))
+        gradebook.df_late_minutes = pd.DataFrame(
+            late_minutes[:, col_idx], index=index,
+            columns=list(gradebook.ass_list))
+
+        if df_meta is None:
+            df_meta = pd.DataFrame(index=index)
+        gradebook.df_meta = cast_meta(df_meta.reindex(index),
+                                      meta_dtype=gradebook.dtype_policy['meta'])
+
+        gradebook._init_derived()
+
+        # nan score is a waived assignment (see waive())
+        is_waive = gradebook.df_perc.isna()
+        if is_waive.to_numpy().any():
+            gradebook.df_lateday = gradebook.df_lateday.mask(is_waive)
+
+        return gradebook
+
+    def partition(self, cat_list):
+        """ gets (cached) CategoryPartition of assignments into categories
+
+        Args:
+            cat_list (iterable): category names
+
+        Returns:
+            partition (CategoryPartition): column indices, points and
+                validation per category.  shared until ass_list changes
+        """
+        key = self.ass_version, tuple(cat_list)
+        if key not in self._partition_cache:
+            self._partition_cache[key] = CategoryPartition(
+                ass_list=self.ass_list, points=self.points, cat_list=key[1])
+        return self._partition_cache[key]
+
+    def _invalidate_partition(self):
+        """ must be called whenever ass_list (or points) changes """
+        self.ass_version += 1
+        self._partition_cache = dict()
+
+    def _compute_lateday(self, grace_period_minutes=60, email_list=None):
         """Convert raw late-minutes to late-days with a grace period.
 
         Args:
             grace_period_minutes (int): minutes of grace before lateness
                 counts (default 60, i.e. 1 hour).
+            email_list (list): only these students (default: all)
 
         Returns:
             df_lateday (pd.DataFrame): late days per student-assignment
@@ -88,7 +244,90 @@ class Gradebook:
                 return 0
             return ceil(effective / (24 * 60))
 
-        return self.df_late_minutes.map(_minutes_to_days)
+        df_late_minutes = self.df_late_minutes
+        if email_list is not None:
+            df_late_minutes = df_late_minutes.loc[email_list]
+        df_lateday = df_late_minutes.map(_minutes_to_days)
+        return cast_int(df_lateday, self.dtype_policy['lateday'])
+
+    def submission_time(self):
+        """ submission time of each student-assignment (parsed on demand)
+
+        The "- Submission Time" columns are ignored by __init__, they're only
+        read from f_scope (and parsed in a single vectorized pass) on the
+        first call.
+
+        Returns:
+            df_submit (pd.DataFrame): index is email, cols are assignment,
+                values are seconds since epoch (Int64, <NA> if no submission)
+        """
+        if self.f_scope is None:
+            raise ValueError('submission times are only available for a '
+                             'gradebook loaded from a gradescope csv')
+
+        if self._df_submit is None:
+            # find raw column names of submission times
+            col_list = pd.read_csv(str(self.f_scope), nrows=0).columns
+            col_dict = {col: normalize(col).replace(self.ass_list.SUBMIT, '')
+                        for col in col_list
+                        if normalize(col).endswith(self.ass_list.SUBMIT)}
+            df = pd.read_csv(str(self.f_scope), index_col='Email',
+                             usecols=['Email'] + list(col_dict), dtype=str)
+            df.index = df.index.map(str.lower)
+            df.index.name = df.index.name.lower()
+            df.columns = df.columns.map(col_dict)
+
+            # parse all timestamps at once (offsets such as -0800 included)
+            s_time = pd.to_datetime(pd.Series(df.to_numpy().ravel()),
+                                    format='%Y-%m-%d %H:%M:%S %z',
+                                    utc=True, errors='coerce')
+            epoch = (s_time - pd.Timestamp(0, tz='UTC')) // pd.Timedelta('1s')
+            self._df_submit = pd.DataFrame(
+                epoch.to_numpy(dtype=float).reshape(df.shape),
+                index=df.index, columns=df.columns).astype('Int64')
+
+        # only students / assignments still in gradebook
+        return self._df_submit.reindex(index=self.df_perc.index,
+                                       columns=list(self.ass_list))
+
+    def memory_usage(self):
+        """ bytes used by each matrix (including python str objects)
+
+        Returns:
+            s_bytes (pd.Series): index is attribute name, values are bytes
+        """
+        attr_list = ['df_perc', 'df_meta', 'df_lateday', 'df_late_minutes']
+        return pd.Series({attr: getattr(self, attr).memory_usage(
+            index=False, deep=True).sum() for attr in attr_list})
+
+    def copy(self):
+        """ copy which can be processed without modifying this gradebook
+
+        Returns:
+            gradebook (Gradebook): copy
+        """
+        gradebook = copy.copy(self)
+        for attr in ('df_perc', 'df_meta', 'df_lateday', 'df_late_minutes',
+                     'points'):
+            setattr(gradebook, attr, getattr(self, attr).copy())
+        gradebook.ass_list = copy.copy(self.ass_list)
+        gradebook._partition_cache = dict()
+        return gradebook
+
+    def fingerprint(self):
+        """ hash of assignment names and emails (not of scores)
+
+        Two gradebooks with the same fingerprint resolve assignment names and
+        emails identically (see Config.bind())
+
+        Returns:
+            fingerprint (str): sha256 hex digest
+        """
+        h = hashlib.sha256()
+        h.update('\n'.join(self.ass_list).encode())
+        h.update(b'\0')
+        h.update('\n'.join(self.df_perc.index).encode())
+        return h.hexdigest()
 
     def _resolve_email(self, email):
         """Resolve an email to a matching index entry by prefix.
@@ -126,40 +365,172 @@ class Gradebook:
                     msg = f'waive-fail: not found "{ass}" for {email}'
                     warn(msg)
 
-    def substitute(self, sub_dict):
+    def waive_idx(self, email_idx, ass_idx):
+        """ waives student-assignment pairs given by position (see waive())
+
+        Args:
+            email_idx (np.array): row index (into df_perc.index) per pair
+            ass_idx (np.array): column index (into df_perc.columns) per pair
+        """
+        mask = np.zeros(self.df_perc.shape, dtype=bool)
+        mask[email_idx, ass_idx] = True
+        mask = pd.DataFrame(mask, index=self.df_perc.index,
+                            columns=self.df_perc.columns)
+
+        self.df_perc = self.df_perc.mask(mask)
+        self.df_lateday = self.df_lateday.mask(mask)
+
+    def substitute(self, sub_dict, exclude_source=False, skip_match=False):
         """ substitutes some assignment percentages (if sub is higher)
 
         This method is useful when there are multiple versions of a quiz, each
         with their own gradescope assignment.  It allows you to consolidate
         them into a single assignment (be sure to exclude the substituted
-        assignments so they don't count)
+        assignments so they don't count, or pass exclude_source)
+
+        Every target is computed from the percentages before substitution
+        (order of sub_dict doesn't matter), in one pass: sources are gathered
+        into a (target x student x source) array, padded with nan, whose max
+        (ignoring nan) is written back as a single block.
 
         Args:
             sub_dict (dict): keys are target assignment, values are list of
                 all assignments which could be substituted
+            exclude_source (bool): if True, sources (which aren't themselves a
+                target) are removed after substitution
+            skip_match (bool): when True, assignment names are assumed exact
+                and no matching is done (otherwise see AssignmentList.lookup())
         """
-        # we keep all the new, substituted grades in a dict before substituting
-        # (were we to substitute, the order of substitutions could cause issue)
-        new_col_dict = dict()
+        if not sub_dict:
+            return
+
+        lookup = (lambda ass: ass) if skip_match else self.ass_list.lookup
+        col_idx_dict = {ass: idx
+                        for idx, ass in enumerate(self.df_perc.columns)}
+
+        idx_to = list()
+        idx_from_list = list()
         for ass_to, ass_from_list in sub_dict.items():
-            if ass_to not in ass_from_list:
-                # ensure ass_to is in the list of potential substitutes
-                ass_from_list = ass_from_list + [ass_to]
+            _idx_to = col_idx_dict[lookup(ass_to)]
+            # ensure ass_to is in the list of potential substitutes
+            _idx_from = {col_idx_dict[lookup(ass)] for ass in ass_from_list}
+            _idx_from.add(_idx_to)
+            idx_to.append(_idx_to)
+            idx_from_list.append(sorted(_idx_from))
+
+        # pad sources with an all nan column (index n_ass)
+        perc = self.df_perc.to_numpy()
+        n_student, n_ass = perc.shape
+        n_from = max(len(idx_from) for idx_from in idx_from_list)
+        idx_from = np.full((len(idx_to), n_from), n_ass)
+        for row, _idx_from in enumerate(idx_from_list):
+            idx_from[row, :len(_idx_from)] = _idx_from
+        perc_pad = np.concatenate((perc, np.full((n_student, 1), np.nan,
+                                                 dtype=perc.dtype)), axis=1)
+
+        # (target x student x source), max ignores nan (nan if all are nan)
+        perc_from = perc_pad[:, idx_from].transpose(1, 0, 2)
+        perc_to = np.fmax.reduce(perc_from, axis=2)
+
+        perc = perc.copy()
+        perc[:, idx_to] = perc_to.T
+        self.df_perc = pd.DataFrame(perc, index=self.df_perc.index,
+                                    columns=self.df_perc.columns)
+
+        if exclude_source:
+            ass_list = list(self.df_perc.columns)
+            ass_source = {ass_list[idx] for _idx_from in idx_from_list
+                          for idx in _idx_from}
+            self._drop_ass(ass_source - {ass_list[idx] for idx in idx_to})
+
+    def curve(self, curve_dict, skip_match=False):
+        """ curves some assignments' percentages (see check_curve())
+
+        Statistics ignore waived (nan) percentages and are computed for every
+        curved assignment at once, the curve is written back as a single
+        block (see apply_curve()).
+
+        Args:
+            curve_dict (dict): keys are assignments, values are curves (see
+                check_curve())
+            skip_match (bool): when True, assignment names are assumed exact
+                and no matching is done (otherwise see AssignmentList.lookup())
+        """
+        if not curve_dict:
+            return
+
+        lookup = (lambda ass: ass) if skip_match else self.ass_list.lookup
+        col_idx = self.df_perc.columns.get_indexer(
+            [lookup(ass) for ass in curve_dict])
+        curve_list = [check_curve(curve, name=ass)
+                      for ass, curve in curve_dict.items()]
 
-            # get max percentage across all assignments, substitute it
-            new_col_dict[ass_to] = self.df_perc.loc[:, ass_from_list].max(
-                axis=1)
+        perc = self.df_perc.to_numpy().copy()
+        perc[:, col_idx] = apply_curve(perc[:, col_idx], curve_list)
+        self.df_perc = pd.DataFrame(perc, index=self.df_perc.index,
+                                    columns=self.df_perc.columns)
 
-        # substitute
-        for ass_to, s in new_col_dict.items():
-            self.df_perc[ass_to] = s
+    def _email_unmatched(self, email_list, ignore_suffix=True):
+        """ emails of email_list not in gradebook & vice versa
+
+        Returns:
+            email_missing (list): emails of email_list not in gradebook
+            email_extra (list): emails of gradebook not in email_list
+        """
+        def get_key(email):
+            return email.split('@')[0] if ignore_suffix else email
 
-    def prune_email(self, email_list, ignore_suffix=True):
+        key_list = {get_key(email) for email in email_list}
+        key_scope = {get_key(email) for email in self.df_meta.index}
+        email_missing = sorted(email for email in email_list
+                               if get_key(email) not in key_scope)
+        email_extra = sorted(email for email in self.df_meta.index
+                             if get_key(email) not in key_list)
+        return email_missing, email_extra
+
+    def email_candidate(self, email_list, ignore_suffix=True, **kwargs):
+        """ ranked candidates of each email of email_list not in gradebook
+
+        Args:
+            email_list (list): list of strings
+            ignore_suffix (bool): see prune_email()
+            kwargs: passed to reconcile()
+
+        Returns:
+            df_candidate (pd.DataFrame): see reconcile(), left are emails of
+                email_list, right are unmatched emails of gradebook
+        """
+        email_missing, email_extra = self._email_unmatched(
+            email_list, ignore_suffix=ignore_suffix)
+        if not email_missing or not email_extra:
+            return reconcile([], [])
+
+        name_extra = None
+        if {'firstname', 'lastname'} <= set(self.df_meta.columns):
+            df = self.df_meta.loc[email_extra, ['firstname', 'lastname']]
+            name_extra = (df['firstname'].astype(str) + ' ' +
+                          df['lastname'].astype(str)).tolist()
+        if name_extra is not None:
+            # email_list has no names, its email prefix is the best guess
+            kwargs.setdefault('name_left', [email.split('@')[0]
+                                            for email in email_missing])
+            kwargs.setdefault('name_right', name_extra)
+        return reconcile(email_missing, email_extra, **kwargs)
+
+    def prune_email(self, email_list, ignore_suffix=True, mapping=None):
         """ discards rows not in email_list, warns if emails in list not a row
 
         Args:
             email_list (list): list of strings
+            ignore_suffix (bool): if True, only the email prefix (before @)
+                is compared
+            mapping (dict): keys are emails of email_list, values are emails
+                of gradebook they should match (see load_mapping())
         """
+        if mapping:
+            mapping = {k.lower(): v.lower() for k, v in mapping.items()}
+            email_list = [mapping.get(email, email) for email in email_list]
+
         if ignore_suffix:
             def discard_suffix(email_list):
                 prefix_list = [email.split('@')[0] for email in email_list]
@@ -177,15 +548,21 @@ class Gradebook:
             email_scope = set(self.df_meta.index)
             email_target = set(email_list)
 
-        # warn if any emails not found
+        # warn if any emails not found, with their most similar (unmatched)
+        # gradebook emails
         email_target_missing = email_target - email_scope
         if email_target_missing:
-            s = '\n'.join(email_target_missing)
+            s = '\n'.join(sorted(email_target_missing))
             warn(f'email not found in scope:\n{s}')
 
-            email_scope_extra = email_scope - email_target
-            if email_scope_extra:
-                s = '\n'.join(email_scope_extra)
+            df_candidate = self.email_candidate(email_list,
+                                                ignore_suffix=ignore_suffix)
+            if len(df_candidate):
+                s = '\n'.join(
+                    f'{left}: ' + ', '.join(
+                        f'{right} ({score:.2f})' for right, score in
+                        zip(df['right'], df['score']))
+                    for left, df in df_candidate.groupby('left', sort=True))
                 warn(f'maybe its one of these?\n{s}')
 
         # discard rows not in email_list
@@ -205,15 +582,120 @@ class Gradebook:
                 an assignment will be excluded (msg printed to user).  0 and
                 nan both count as not completed
         """
-        # find percent missing per assignment per ass, rm if above thresh
-        s_complete_perc = 1 - (self.df_perc.fillna(0) == 0).mean(axis=0)
-        for ass, comp_perc in s_complete_perc.sort_values().items():
-            if comp_perc < min_complete_thresh:
-                msg = f'removed: {comp_perc * 100:.0f}% complete {ass}'
-                self.remove(ass, skip_match=True)
-            else:
-                msg = f'   kept: {comp_perc * 100:.0f}% complete {ass}'
-            print(msg)
+        self.remove_many(min_complete_thresh=min_complete_thresh)
+
+    def assignment_stats(self, grace_period_minutes=60):
+        """ item statistics of every assignment, in one pass
+
+        Discrimination is the correlation (over students) of an assignment's
+        percentage with the rest-of-course mean: the points weighted mean of
+        every other (unwaived) assignment.  Every rest-of-course mean is the
+        course total less one assignment, so all are computed from a single
+        total rather than one mean per assignment.
+
+        Args:
+            grace_period_minutes (int): lateness within this many minutes
+                isn't late (see get_late_penalty())
+
+        Returns:
+            df_stats (pd.DataFrame): index is assignment, columns are:
+                points: max points
+                complete: fraction of students who submitted (0 and waived
+                    count as not submitted, as in remove_thresh())
+                mean: mean percentage (difficulty), waived ignored
+                std: std of percentage, waived ignored
+                discrimination: correlation with rest-of-course mean (nan
+                    if either is constant)
+                late: fraction of (unwaived) students who were late
+                waived: fraction of students waived
+        """
+        perc = self.df_perc.to_numpy(dtype=float)
+        waived = np.isnan(perc)
+        valid = ~waived
+        stats = get_ass_stats(perc, q=())
+
+        # rest of course mean, per student-assignment
+        weight = np.where(valid, self.points[None, :], 0)
+        perc0 = np.where(valid, perc, 0)
+        total = (perc0 * weight).sum(axis=1, keepdims=True)
+        weight_total = weight.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rest = (total - perc0 * weight) / (weight_total - weight)
+
+        # pearson correlation per column, over pairs where both are valid
+        both = valid & np.isfinite(rest)
+        n = both.sum(axis=0)
+        x = np.where(both, perc, 0)
+        y = np.where(both, rest, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_mean = x.sum(axis=0) / n
+            y_mean = y.sum(axis=0) / n
+            dx = np.where(both, x - x_mean, 0)
+            dy = np.where(both, y - y_mean, 0)
+            discrimination = (dx * dy).sum(axis=0) / np.sqrt(
+                (dx ** 2).sum(axis=0) * (dy ** 2).sum(axis=0))
+
+        late_minutes = self.df_late_minutes.reindex(
+            index=self.df_perc.index,
+            columns=self.df_perc.columns).to_numpy(dtype=float)
+        late = valid & (late_minutes > grace_period_minutes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            late = late.sum(axis=0) / valid.sum(axis=0)
+
+        df_stats = pd.DataFrame({
+            'points': self.points,
+            'complete': (np.nan_to_num(perc) > 0).mean(axis=0),
+            'mean': stats['mean'],
+            'std': stats['std'],
+            'discrimination': discrimination,
+            'late': late,
+            'waived': waived.mean(axis=0)},
+            index=self.df_perc.columns)
+        df_stats.index.name = 'assignment'
+        return df_stats
+
+    def remove_many(self, ass_list=tuple(), min_complete_thresh=None,
+                    skip_match=False):
+        """ removes many assignments at once (explicit and by completion)
+
+        All exclusions are resolved first, then every assignment is dropped
+        from every structure in a single operation (rather than one remove()
+        call per assignment).
+
+        Args:
+            ass_list (list): strings, any assignment which contains one of
+                them is removed (as in remove(multi=True))
+            min_complete_thresh (float): assignments (not already removed via
+                ass_list) below this completion threshold are removed, see
+                remove_thresh().  a kept / removed msg is printed per
+                assignment.  (default: no threshold)
+            skip_match (bool): when True, names in ass_list are assumed exact
+                and no matching is done.  (defaults False)
+        """
+        ass_rm_set = set()
+        if skip_match:
+            ass_rm_set.update(ass_list)
+        else:
+            for ass in ass_list:
+                ass_rm_set.update(self.ass_list.match_iter(ass))
+
+        if min_complete_thresh is not None:
+            # find percent complete per remaining assignment
+            col_idx = [idx for idx, ass in enumerate(self.df_perc.columns)
+                       if ass not in ass_rm_set]
+            perc = self.df_perc.values[:, col_idx]
+            complete = 1 - (np.nan_to_num(perc) == 0).mean(axis=0)
+            s_complete_perc = pd.Series(complete,
+                                        index=self.df_perc.columns[col_idx])
+            for ass, comp_perc in s_complete_perc.sort_values().items():
+                if comp_perc < min_complete_thresh:
+                    msg = f'removed: {comp_perc * 100:.0f}% complete {ass}'
+                    ass_rm_set.add(ass)
+                else:
+                    msg = f'   kept: {comp_perc * 100:.0f}% complete {ass}'
+                print(msg)
+
+        self._drop_ass(ass_rm_set)
 
     def remove(self, ass, multi=False, skip_match=False):
         """ deletes an assignment
@@ -227,24 +709,167 @@ class Gradebook:
         """
         if multi:
             # remove all assignments which match given string
-            for _ass in tuple(self.ass_list.match_iter(ass)):
-                self.remove(_ass, multi=False, skip_match=True)
+            self.remove_many([ass])
             return
 
         # normalize assignment name
         if not skip_match:
             ass = self.ass_list.match(ass)
-        ass_idx = self.ass_list.index(ass)
+        if ass not in self.ass_list:
+            raise ValueError(f'{ass} is not in list')
+
+        self._drop_ass({ass})
+
+    def _drop_ass(self, ass_rm_set):
+        """ drops (exact) assignments from every per-assignment structure
+
+        Args:
+            ass_rm_set (set): assignments to remove
+        """
+        if not ass_rm_set:
+            return
+
+        keep = np.array([ass not in ass_rm_set for ass in self.ass_list])
+        ass_rm_list = [ass for ass in self.ass_list if ass in ass_rm_set]
+
+        self.df_perc = self.df_perc.drop(columns=ass_rm_list)
+        self.df_lateday = self.df_lateday.drop(columns=ass_rm_list)
+        self.df_late_minutes = self.df_late_minutes.drop(columns=ass_rm_list)
+        self.ass_list[:] = [ass for ass in self.ass_list
+                            if ass not in ass_rm_set]
+        self.points = self.points[keep]
+        self._invalidate_partition()
+
+    def _get_late_excuse(self, cat, excuse_day=0, excuse_day_offset=None,
+                         waive_dict=None, grace_period_minutes=60,
+                         partition=None, email_list=None, df_lateday=None):
+        """ late days of a category (after waivers) and excuse days
+
+        Args: see get_late_penalty()
+
+        Returns:
+            df_late (pd.DataFrame): index is email, columns are assignments of
+                cat, values are late days (nan if waived)
+            s_excuse_day (pd.Series): index is email, values are excuse days
+            points (np.array): points per assignment of cat
+        """
+        if waive_dict is None:
+            waive_dict = dict()
+
+        # compute late days using the configured grace period
+        if df_lateday is None:
+            df_lateday = self._compute_lateday(
+                grace_period_minutes=grace_period_minutes,
+                email_list=email_list)
+
+        # get late days across category
+        if partition is None or cat not in partition.cat_ass_dict:
+            cat = normalize(cat)
+            partition = self.partition([cat])
+        ass_cat_list = partition.cat_ass_dict[cat]
+        df_late = df_lateday.loc[:, ass_cat_list].astype(float)
 
-        # remove
-        del self.df_perc[ass]
-        del self.df_lateday[ass]
-        self.ass_list.pop(ass_idx)
-        self.points = np.delete(self.points, ass_idx)
+        # waive late days per email / assignment
+        for email, ass_list in waive_dict.items():
+            email = self._resolve_email(email)
+            if email_list is not None and email not in df_late.index:
+                continue
+            for ass in ass_list:
+                if ass not in self.ass_list:
+                    ass = self.ass_list.match(ass)
+                if ass in df_late.columns:
+                    df_late.loc[email, ass] = np.nan
+
+        # get number of excuse days per student
+        s_excuse_day = pd.Series(index=df_late.index, data=excuse_day)
+        if excuse_day_offset is not None:
+            for email, offset in excuse_day_offset.items():
+                email = self._resolve_email(email)
+                if email in s_excuse_day:
+                    s_excuse_day[email] += offset
+                elif email_list is None:
+                    warn(f'email not found, excuse_day_offset ({offset}) not '
+                         f'applied: {email}')
+
+        return df_late, s_excuse_day, partition.cat_points_dict[cat]
+
+    def _get_late_deduct(self, df_late, s_excuse_day, points,
+                         penalty_per_day, policy=None, max_penalty=None,
+                         cutoff_day=None):
+        """ allocates excuse days, fraction of each assignment deducted
+
+        Args:
+            df_late (pd.DataFrame): see _get_late_excuse()
+            s_excuse_day (pd.Series): see _get_late_excuse()
+            points (np.array): see _get_late_excuse()
+            others: see get_late_penalty()
+
+        Returns:
+            excused (np.array): see allocate_excuse()
+            deduct (np.array): (n_student, n_ass) fraction of each assignment
+                deducted
+        """
+        late_day = df_late.to_numpy(dtype=float)
+        excuse_day = s_excuse_day.to_numpy(dtype=float)
+        if policy is None:
+            excused = allocate_excuse(late_day, points, excuse_day)
+            unexcused = np.nan_to_num(late_day) - excused
+            return excused, penalty_per_day * unexcused
+
+        perc = self.df_perc[df_late.columns]
+        if not perc.index.equals(df_late.index):
+            # only some students (see email_list)
+            perc = perc.loc[df_late.index]
+        perc = perc.to_numpy(dtype=float)
+        if isinstance(max_penalty, dict):
+            # per assignment, others uncapped
+            max_penalty = np.array([max_penalty.get(ass, np.inf)
+                                    for ass in df_late.columns])
+
+        def deduct(unexcused, row=slice(None)):
+            return get_late_deduct(perc[row], unexcused, penalty_per_day,
+                                   policy=policy, max_penalty=max_penalty,
+                                   cutoff_day=cutoff_day)
+
+        excused = allocate_excuse(late_day, points, excuse_day, deduct=deduct)
+        return excused, deduct(np.nan_to_num(late_day) - excused)
+
+    def late_ledger(self, cat, penalty_per_day, excuse_day=0,
+                    excuse_day_offset=None, waive_dict=None,
+                    grace_period_minutes=60, partition=None, email_list=None,
+                    df_lateday=None, per_assignment=False, policy=None,
+                    max_penalty=None, cutoff_day=None):
+        """ which assignments each student's excuse days went to
+
+        Excuse days are allocated heaviest assignment first (where each
+        saves the most points of a policy, see allocate_excuse()).  (Without
+        per_assignment the penalty doesn't depend on which assignments are
+        excused, only on their total.)
+
+        Args: see get_late_penalty()
+
+        Returns:
+            df_ledger (pd.DataFrame): one row per late student-assignment
+                pair, see ledger_frame()
+        """
+        df_late, s_excuse_day, points = self._get_late_excuse(
+            cat=cat, excuse_day=excuse_day,
+            excuse_day_offset=excuse_day_offset, waive_dict=waive_dict,
+            grace_period_minutes=grace_period_minutes, partition=partition,
+            email_list=email_list, df_lateday=df_lateday)
+        excused, deduct = self._get_late_deduct(
+            df_late, s_excuse_day, points, penalty_per_day, policy=policy,
+            max_penalty=max_penalty, cutoff_day=cutoff_day)
+        return ledger_frame(df_late, excused, penalty_per_day, cat=cat,
+                            deduct=deduct)
 
     def get_late_penalty(self, cat, penalty_per_day, excuse_day=0,
                          excuse_day_offset=None, waive_dict=None,
-                         grace_period_minutes=60):
+                         grace_period_minutes=60, partition=None,
+                         email_list=None, return_late_day=False,
+                         df_lateday=None, per_assignment=False, policy=None,
+                         max_penalty=None, cutoff_day=None,
+                         return_deduct=False):
         """ computes modifier to category mean to incorporate late penalty
 
         Let late_day be the total number of days late (across all hws of one
@@ -256,6 +881,23 @@ class Gradebook:
         then every unexcused late day effectively negates %15 of a single hw.
         (since all hws needn't have same weight, penalty applied to average hw)
 
+        If per_assignment, excuse days are allocated to the assignments where
+        they save the most points (see allocate_excuse()) and each unexcused
+        day costs penalty_per_day of its own assignment:
+
+            -penalty_per_day * sum(points * unexcused) / sum(points)
+
+        which is the same as above when every assignment has equal points.
+
+        A policy (see LATE_POLICY_DICT) instead deducts a fraction of each
+        assignment (e.g. 'decay' keeps (1 - penalty_per_day) of the credit per
+        day), capped by max_penalty and zero credit after cutoff_day, see
+        get_late_deduct().  These deductions are subtracted from each
+        assignment's percentage before lowest assignments are dropped (see
+        return_deduct and category_mean()), so they aren't in s_penalty.  A
+        policy implies per_assignment.  Without a policy, nothing is computed
+        per assignment (unless per_assignment).
+
         Args:
             cat (str): category of assignment to apply penalty to
             penalty_per_day (float): percentage of hw penalty per unexcused day
@@ -269,62 +911,249 @@ class Gradebook:
                 of assignments whose late days are to be waived
             grace_period_minutes (int): minutes of grace before lateness
                 counts.  Defaults to 60 (1 hour).
+            partition (CategoryPartition): partition which includes cat
+                (defaults to self.partition([cat]))
+            email_list (list): only computes these students (exact emails).
+                waivers / offsets of other students are ignored
+            return_late_day (bool): if True, late days (after waivers) are
+                returned too
+            df_lateday (pd.DataFrame): output of _compute_lateday() with
+                grace_period_minutes & email_list, if already computed
+            per_assignment (bool): if True, penalizes unexcused days per
+                assignment (see above and late_ledger())
+            policy (str): key of LATE_POLICY_DICT (default: linear, see
+                above)
+            max_penalty (float): largest fraction of any one assignment
+                deducted (requires policy).  a dict caps each assignment
+                (keys are exact names) and leaves others uncapped
+            cutoff_day (int): unexcused late days after which an assignment
+                earns zero credit (requires policy)
+            return_deduct (bool): if True, a policy's deductions are returned
+                too
 
         Returns:
             s_unexcuse_late_day (pd.Series): number of unexcused late days
                 remaining (negative if late penalty applied)
             s_penalty (pd.Series): index is email.  values are adjustments
+            s_late_day (pd.Series): late days per student, only if
+                return_late_day
+            df_deduct (pd.DataFrame): index is email, columns are assignments
+                of cat, values are fractions of each assignment deducted
+                (None without a policy), only if return_deduct
         """
         if penalty_per_day < 0:
             raise AttributeError(
                 'penalty_per_day should be positive to lower credit when late')
 
-        if waive_dict is None:
-            waive_dict = dict()
-
-        # compute late days using the configured grace period
-        df_lateday = self._compute_lateday(
-            grace_period_minutes=grace_period_minutes)
-
-        # get late days across category
-        ass_cat_list = list(self.ass_list.match_iter(s_assign=cat))
-        df_late = df_lateday.loc[:, ass_cat_list].copy()
-
-        # waive late days per email / assignment
-        for email, ass_list in waive_dict.items():
-            email = self._resolve_email(email)
-            for ass in ass_list:
-                ass = self.ass_list.match(ass)
-                if ass in df_late.columns:
-                    df_late.loc[email, ass] = np.nan
-
-        # get number of excuse days per student
-        s_late_day = df_late.sum(axis=1, skipna=True)
-        s_excuse_day = pd.Series(index=s_late_day.index, data=excuse_day)
-        if excuse_day_offset is not None:
-            for email, offset in excuse_day_offset.items():
-                email = self._resolve_email(email)
-                if email in s_excuse_day:
-                    s_excuse_day[email] += offset
-                else:
-                    warn(f'email not found, excuse_day_offset ({offset}) not '
-                         f'applied: {email}')
+        df_late, s_excuse_day, points = self._get_late_excuse(
+            cat=cat, excuse_day=excuse_day,
+            excuse_day_offset=excuse_day_offset, waive_dict=waive_dict,
+            grace_period_minutes=grace_period_minutes, partition=partition,
+            email_list=email_list, df_lateday=df_lateday)
 
         # get unexcused late days per student
+        s_late_day = df_late.sum(axis=1, skipna=True)
         s_unexcuse_late_day = s_late_day - s_excuse_day
 
         # get penalty
-        s_penalty = - penalty_per_day * s_unexcuse_late_day / len(ass_cat_list)
+        df_deduct = None
+        if per_assignment or policy is not None:
+            _, deduct = self._get_late_deduct(
+                df_late, s_excuse_day, points, penalty_per_day, policy=policy,
+                max_penalty=max_penalty, cutoff_day=cutoff_day)
+            # negative excuse days are unexcused days, of an average hw
+            unexcused_extra = np.maximum(-s_excuse_day.to_numpy(dtype=float),
+                                         0)
+            penalty = penalty_per_day * unexcused_extra / len(points)
+            if policy is None:
+                penalty = penalty + deduct @ points / points.sum()
+            else:
+                df_deduct = pd.DataFrame(deduct, index=df_late.index,
+                                         columns=df_late.columns)
+            s_penalty = pd.Series(-penalty, index=df_late.index)
+        else:
+            s_penalty = - penalty_per_day * s_unexcuse_late_day / len(points)
         s_penalty = s_penalty.apply(lambda x: min(x, 0))
 
-        return s_unexcuse_late_day, s_penalty
+        out = s_unexcuse_late_day, s_penalty
+        if return_late_day:
+            out += (s_late_day,)
+        if return_deduct:
+            out += (df_deduct,)
+        return out
+
+    def category_late(self, cat, partition=None, email_list=None, **late):
+        """ late days and penalty of one category, as arrays
+
+        Args:
+            cat (str): category
+            partition (CategoryPartition): see get_late_penalty()
+            email_list (list): only these students (exact emails), default
+                is every student
+            late: passed to get_late_penalty() (penalty_per_day,
+                waive_dict, df_lateday, ...)
+
+        Returns:
+            cat_late (dict): keys are late_day, unexcused (unexcused late
+                days, negative of late days remaining), penalty (added to
+                category mean) and deduct (fraction of each assignment of
+                cat deducted by a policy, None without one), values are
+                arrays aligned with email_list
+        """
+        if email_list is None:
+            index = self.df_perc.index
+        else:
+            index = pd.Index(email_list)
+        s_unexcused_late, s_penalty, s_late_day, df_deduct = \
+            self.get_late_penalty(cat=cat, partition=partition,
+                                  email_list=email_list, return_late_day=True,
+                                  return_deduct=True, **late)
+        if df_deduct is not None:
+            df_deduct = df_deduct.reindex(index).to_numpy(dtype=float)
+
+        return {'late_day': s_late_day.reindex(index).to_numpy(dtype=float),
+                'unexcused': s_unexcused_late.reindex(index).to_numpy(
+                    dtype=float),
+                'penalty': s_penalty.reindex(index).to_numpy(dtype=float),
+                'deduct': df_deduct}
+
+    def category_mean(self, cat, partition, drop_n=0, cat_late=None,
+                      email_list=None, return_drop=False):
+        """ one category's mean per student (see get_cat_mean())
+
+        Args:
+            cat (str): category of partition
+            partition (CategoryPartition): see partition()
+            drop_n (int): number of lowest percentages dropped
+            cat_late (dict): output of category_late() with the same
+                email_list (default: no late penalty)
+            email_list (list): only these students (exact emails), default
+                is every student
+            return_drop (bool): if True, mask of dropped assignments (of
+                partition.cat_ass_dict[cat]) is returned too
+
+        Returns:
+            mean (np.array): mean per student, nan if no assignments
+            drop (np.array): (n_student, n_ass) dropped, only if return_drop
+        """
+        df_perc = self.df_perc
+        if email_list is not None:
+            df_perc = df_perc.loc[email_list]
+        perc = df_perc.to_numpy(dtype=float)[:, partition.cat_idx_dict[cat]]
+
+        if cat_late is None:
+            cat_late = dict()
+        return get_cat_mean(
+            perc, partition.cat_points_dict[cat], drop_n=drop_n,
+            deduct=cat_late.get('deduct'), penalty=cat_late.get('penalty'),
+            return_drop=return_drop)
 
     def average_full(self, *args, **kwargs):
         """ like average, but adds metadata & percentage columns to output
         """
+        return self.average_result(*args, **kwargs).to_frame()
+
+    def average_result(self, *args, **kwargs):
+        """ like average_full, but doesn't copy into a single data frame
+
+        Returns:
+            result (GradeResult): references df_meta, output of average()
+                and df_perc
+        """
         df_grade = self.average(*args, **kwargs)
 
-        return pd.concat((self.df_meta, df_grade, self.df_perc), axis=1)
+        return GradeResult(df_meta=self.df_meta, df_grade=df_grade,
+                           df_perc=self.df_perc)
+
+    def explain(self, email, config):
+        """ one student's grade breakdown, without averaging everyone
+
+        Mirrors average() for a single row: category means (after dropping
+        and late penalty), dropped assignments, late days and letter.
+
+        Args:
+            email (str): student email (matched as in waive())
+            config (Config): config which already processed this gradebook
+                (see Config.prepare())
+
+        Returns:
+            explain (dict): keys are:
+                email: exact email
+                meta: metadata (pd.Series)
+                perc: percentage per assignment (pd.Series)
+                category: index is category, columns are weight, mean,
+                    drop (list of dropped assignments), late_day,
+                    late_days_remain and penalty (added to mean, a late
+                    policy's deductions are in mean already) (pd.DataFrame)
+                mean: final mean
+                letter: letter grade
+        """
+        email = self._resolve_email(email.lower())
+        if email not in self.df_perc.index:
+            raise KeyError(f'student not found: {email}')
+
+        cat_weight_dict = config.cat_weight_dict
+        if not cat_weight_dict:
+            # all assignments contain ''
+            cat_weight_dict = {'': 1}
+        partition = self.partition(cat_weight_dict.keys())
+        perc = self.df_perc.loc[email].to_numpy(dtype=float)
+
+        # late waivers of this student, of assignments still in gradebook
+        ass_set = set(self.ass_list)
+        late_waive_list = list()
+        for _email, ass_list in config.late_waive_dict.items():
+            if self._resolve_email(_email) != email:
+                continue
+            for ass in ass_list:
+                try:
+                    ass = self.ass_list.lookup(ass)
+                except AssignmentNotFoundError:
+                    continue
+                if ass in ass_set:
+                    late_waive_list.append(ass)
+
+        row_list = list()
+        for cat in partition.cat_list:
+            cat_late = None
+            if cat in config.cat_late_dict:
+                cat_late = self.category_late(
+                    cat=cat, partition=partition,
+                    waive_dict={email: late_waive_list}, email_list=[email],
+                    **config.cat_late_dict[cat])
+            mean, drop = self.category_mean(
+                cat=cat, partition=partition,
+                drop_n=config.cat_drop_dict.get(cat, 0), cat_late=cat_late,
+                email_list=[email], return_drop=True)
+
+            row = {'category': cat,
+                   'weight': cat_weight_dict[cat],
+                   'mean': mean[0],
+                   'drop': [ass for ass, _drop in
+                            zip(partition.cat_ass_dict[cat], drop[0])
+                            if _drop],
+                   'late_day': np.nan,
+                   'late_days_remain': np.nan,
+                   'penalty': 0.}
+            if cat_late is not None:
+                row['late_day'] = cat_late['late_day'][0]
+                row['late_days_remain'] = -cat_late['unexcused'][0]
+                row['penalty'] = cat_late['penalty'][0]
+            row_list.append(row)
+        df_cat = pd.DataFrame(row_list).set_index('category')
+
+        # categories without assignments are ignored in final mean
+        cat_valid = df_cat['mean'].notna()
+        weight = df_cat.loc[cat_valid, 'weight']
+        mean = (df_cat.loc[cat_valid, 'mean'] * weight).sum() / weight.sum()
+
+        return {'email': email,
+                'meta': self.df_meta.loc[email],
+                'perc': self.df_perc.loc[email],
+                'category': df_cat,
+                'mean': mean,
+                'letter': perc_to_letter(mean,
+                                         grade_thresh=config.grade_thresh)}
 
     def average(self, cat_weight_dict=None, cat_drop_dict=None,
                 cat_late_dict=None, grade_thresh=None, late_waive_dict=None):
@@ -363,72 +1192,57 @@ class Gradebook:
             assert set(cat_drop_dict.keys()).issubset(cat_weight_dict.keys())
 
         # ensure that categories partition assignments (warn if they don't)
-        cat_bool_dict = {cat: np.array([cat in ass for ass in self.ass_list])
-                         for cat in cat_weight_dict.keys()}
-        cat_bool_sum = sum(cat_bool_dict.values())
-        if not (cat_bool_sum == 1).all():
-            # assignment not included in any category
-            ass_not_include = np.array(self.ass_list)[cat_bool_sum < 1]
-            if ass_not_include.size:
-                s = ', '.join(sorted(ass_not_include))
-                warn(f'assignment not in any category: {s}')
-
-            # assignment included in more than 1 category
-            ass_over_include = np.array(self.ass_list)[cat_bool_sum > 1]
-            if ass_over_include.size:
-                s = ', '.join(sorted(ass_over_include))
-                warn(f'assignment in multiple categories: {s}')
-
-        # extract percentages as array (a bit quicker)
-        perc_all = self.df_perc.values
-
-        df_grade = pd.DataFrame({'mean': 0}, index=self.df_perc.index)
-
-        weight_total = pd.Series(0, index=self.df_perc.index)
-        for cat, cat_bool in cat_bool_dict.items():
-            perc_cat = perc_all[:, cat_bool]
-            _points = self.points[cat_bool]
-
-            # drop lowest n assignments
-            drop_n = cat_drop_dict.get(cat, 0)
-
-            s_mean = f'mean_{cat}'
-            for idx, email in enumerate(self.df_perc.index):
-                # compute mean per student-category
-                _perc = perc_cat[idx, :]
-
-                # average across all assignments
-                df_grade.loc[email, s_mean] = get_mean_drop_low(perc=_perc,
-                                                                weight=_points,
-                                                                drop_n=drop_n)
+        partition = self.partition(cat_weight_dict.keys())
+        partition.warn()
 
+        df_grade = pd.DataFrame(index=self.df_perc.index)
+        for cat in partition.cat_list:
+            cat_late = None
             if cat in cat_late_dict:
-                s_unexcused_late, s_penalty = self.get_late_penalty(
-                    cat=cat,
-                    waive_dict=late_waive_dict,
-                    **cat_late_dict[cat])
-
-                df_grade[s_mean] += s_penalty
-
-                # ensure penalty doesn't drop mean below 0
-                df_grade[s_mean] = df_grade[s_mean].map(lambda x: max(x, 0))
+                cat_late = self.category_late(cat=cat, partition=partition,
+                                              waive_dict=late_waive_dict,
+                                              **cat_late_dict[cat])
 
+            s_mean = f'mean_{cat}'
+            df_grade[s_mean] = self.category_mean(
+                cat=cat, partition=partition,
+                drop_n=cat_drop_dict.get(cat, 0), cat_late=cat_late)
+            if cat_late is not None:
                 # add late days remaining to output
-                df_grade[f'late days remain ({cat})'] = \
-                    - s_unexcused_late
+                df_grade[f'late days remain ({cat})'] = -cat_late['unexcused']
 
-            # add category's contribution to overall mean
             cat_missing = df_grade[s_mean].isna()
             for email in cat_missing.index[cat_missing]:
                 print(
                     f'{email} has no assignments in category: {cat} (ignored in final mean)')
-            weight_total += cat_weight_dict[cat] * ~cat_missing
 
-            cat_mean = df_grade[s_mean].copy()
-            cat_mean.fillna(0, inplace=True)
-            df_grade['mean'] += cat_mean * cat_weight_dict[cat]
+        return self.combine_category(df_grade, cat_weight_dict,
+                                     grade_thresh=grade_thresh)
+
+    @staticmethod
+    def combine_category(df_grade, cat_weight_dict, grade_thresh=None):
+        """ final mean & letter from category means (see average())
+
+        Args:
+            df_grade (pd.DataFrame): has a mean_{cat} column per category of
+                cat_weight_dict
+            cat_weight_dict (dict): see average()
+            grade_thresh (dict): see perc_to_letter()
 
-        df_grade['mean'] *= 1 / weight_total
+        Returns:
+            df_grade (pd.DataFrame): copy of df_grade with mean (first) and
+                letter (last) columns
+        """
+        df_grade = df_grade.copy()
+        total = np.zeros(len(df_grade))
+        weight_total = np.zeros(len(df_grade))
+        for cat, weight in cat_weight_dict.items():
+            # categories without assignments are ignored in final mean
+            mean = df_grade[f'mean_{cat}'].to_numpy(dtype=float)
+            cat_valid = ~np.isnan(mean)
+            weight_total += weight * cat_valid
+            total += np.where(cat_valid, mean, 0) * weight
+        df_grade.insert(0, 'mean', total * (1 / weight_total))
 
         # compute letter grade
         def _perc_to_letter(perc):
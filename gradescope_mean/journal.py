@@ -0,0 +1,206 @@
+import json
+import pathlib
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .config_cache import get_file_key
+
+JOURNAL_VERSION = 1
+
+
+def get_f_journal(f_grade):
+    """ default journal file, beside grade output (grade_full.journal.jsonl)
+    """
+    f_grade = pathlib.Path(f_grade)
+    return f_grade.with_name(f'{f_grade.stem}.journal.jsonl')
+
+
+def get_f_journal_snapshot(f_journal):
+    """ state of the last run journaled, hidden file beside the journal """
+    f_journal = pathlib.Path(f_journal)
+    return f_journal.with_name(f'.{f_journal.name}.snapshot')
+
+
+def get_state(result):
+    """ journaled cells of every student: inputs, grades and letters
+
+    Args:
+        result (GradeResult): see Config.__call__()
+
+    Returns:
+        df_num (pd.DataFrame): index is email, columns are percentage per
+            assignment then numeric columns of df_grade (float64)
+        df_str (pd.DataFrame): index is email, remaining columns of
+            df_grade (e.g. letter)
+    """
+    df_grade = result.df_grade
+    col_num = [c for c in df_grade.columns
+               if pd.api.types.is_numeric_dtype(df_grade[c])]
+    col_str = [c for c in df_grade.columns if c not in col_num]
+    df_num = pd.concat([result.df_perc.astype(float),
+                        df_grade[col_num].astype(float)], axis=1)
+    return df_num, df_grade[col_str].astype(object)
+
+
+def _json_value(x):
+    """ cell as a json value (nan and missing are None) """
+    if pd.isna(x):
+        return None
+    if isinstance(x, (float, np.floating)):
+        return float(x)
+    return str(x)
+
+
+def diff_state(state_old, state_new):
+    """ cells which differ between two states (see get_state())
+
+    Each frame is aligned once and compared as a whole array.  A student or
+    column only in one state differs from None (missing) in the other.
+
+    Returns:
+        change (dict): keys are emails, values are dicts whose keys are
+            columns and values are [old, new]
+    """
+    change = dict()
+    for df_old, df_new, numeric in zip(state_old, state_new, (True, False)):
+        index = df_old.index.union(df_new.index, sort=False)
+        columns = df_old.columns.union(df_new.columns, sort=False)
+        a = df_old.reindex(index=index, columns=columns).to_numpy()
+        b = df_new.reindex(index=index, columns=columns).to_numpy()
+        a_na, b_na = pd.isna(a), pd.isna(b)
+        if numeric:
+            same = (a == b) | (a_na & b_na)
+        else:
+            same = np.where(a_na | b_na, a_na & b_na, a == b)
+        for row, col in zip(*np.nonzero(~same)):
+            change.setdefault(index[row], dict())[columns[col]] = [
+                _json_value(a[row, col]), _json_value(b[row, col])]
+    return change
+
+
+def update_journal(result, config, f_scope, f_journal):
+    """ appends the cells which changed since the last run to the journal
+
+    The journal is append-only JSONL, one line per run which changed any
+    cell:
+
+        {"version": 1, "run": 3, "time": "...", "scope": sha256 of csv,
+         "config": sha256 of config, "cause": ["config"],
+         "change": {email: {column: [old, new], ...}, ...}}
+
+    cause lists which of scope / config differ from the previous run
+    ("baseline" for the first run, whose change is every cell).  Runs which
+    change no cell aren't journaled, but their scope / config hashes are
+    kept to compare the next run against.  Only the state of the last run
+    is kept (a pickle beside the journal, see get_f_journal_snapshot()),
+    never a full copy per run.
+
+    Args:
+        result (GradeResult): see Config.__call__()
+        config (Config): config which produced result
+        f_scope (str): raw gradescope csv
+        f_journal (str): journal file (see get_f_journal())
+
+    Returns:
+        n_change (int): number of cells which changed
+    """
+    f_journal = pathlib.Path(f_journal)
+    f_snapshot = get_f_journal_snapshot(f_journal)
+    state = get_state(result)
+
+    d_prev = None
+    if f_snapshot.exists():
+        try:
+            with open(f_snapshot, 'rb') as f:
+                d_prev = pickle.load(f)
+        except Exception:
+            d_prev = None
+        if not isinstance(d_prev, dict) or \
+                d_prev.get('version') != JOURNAL_VERSION:
+            d_prev = None
+
+    key = {'scope': get_file_key(pathlib.Path(f_scope))['sha256'],
+           'config': config.get_key()}
+    if d_prev is None:
+        state_prev = tuple(pd.DataFrame(index=pd.Index([], dtype=object))
+                           for _ in state)
+        run = 0
+        cause = ['baseline']
+    else:
+        state_prev = d_prev['state']
+        run = d_prev['run'] + 1
+        cause = [k for k in ('scope', 'config') if key[k] != d_prev[k]]
+
+    change = diff_state(state_prev, state)
+    if change:
+        entry = {'version': JOURNAL_VERSION,
+                 'run': run,
+                 'time': datetime.now().isoformat(timespec='seconds'),
+                 **key,
+                 'cause': cause,
+                 'change': change}
+        with open(f_journal, 'a') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+    elif d_prev is None:
+        # nothing to record (no students), no baseline yet
+        return 0
+    else:
+        # not journaled, but keys are kept so a later change isn't blamed
+        # on a scope / config change which changed no cell
+        run = d_prev['run']
+
+    d = {'version': JOURNAL_VERSION, 'run': run, 'state': state, **key}
+    try:
+        with open(f_snapshot, 'wb') as f:
+            pickle.dump(d, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+
+    return sum(len(d_email) for d_email in change.values())
+
+
+def student_history(f_journal, email):
+    """ one student's grade timeline, replayed from the journal
+
+    Args:
+        f_journal (str): journal file (see update_journal())
+        email (str): student email (exact, else matched by prefix before @)
+
+    Returns:
+        df_history (pd.DataFrame): one row per run which changed the
+            student, index is run, columns are time, cause, config, scope,
+            changed (columns changed) then every journaled cell, as of that
+            run
+    """
+    email = email.lower()
+    prefix = email.split('@')[0]
+
+    row_list = list()
+    cell = dict()
+    with open(f_journal) as f:
+        for line in f:
+            # most runs don't change most students, skip parsing those
+            if prefix not in line:
+                continue
+            entry = json.loads(line)
+            _email = email if email in entry['change'] else next(
+                (e for e in entry['change'] if e.split('@')[0] == prefix),
+                None)
+            if _email is None:
+                continue
+            d_change = entry['change'][_email]
+            cell.update({col: new for col, (_, new) in d_change.items()})
+            row_list.append({'run': entry['run'],
+                             'time': entry['time'],
+                             'cause': ','.join(entry['cause']),
+                             'config': entry['config'][:8],
+                             'scope': entry['scope'][:8],
+                             'changed': ', '.join(d_change),
+                             **cell})
+
+    if not row_list:
+        raise KeyError(f'student not found in journal: {email}')
+    return pd.DataFrame(row_list).set_index('run')
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+# columns of a ledger (see ledger_frame())
+LEDGER_COL_LIST = ['email', 'assignment', 'category', 'late_day', 'excused',
+                   'unexcused', 'penalty']
+
+
+def allocate_excuse(late_day, weight, excuse_day, deduct=None):
+    """ excuse days per student-assignment, saving the most points
+
+    Without deduct, every unexcused late day of an assignment costs
+    penalty_per_day of its weight (see
+    Gradebook.get_late_penalty(per_assignment=True)), so each excuse day
+    saves the most points on the heaviest assignment which is still late.
+    Late days are unit items of value weight: filling the budget heaviest
+    first (greedy) is the optimal knapsack.
+
+    The order of assignments (heaviest first, earlier first if tied) is the
+    same for every student, so a single sort of the assignments and one
+    cumulative sum allocate every student at once.
+
+    A deduct kernel (e.g. of a late policy, see get_late_deduct()) isn't
+    additive: it is clipped to the percentage earned, may decay or jump to
+    zero credit at a cutoff, so heaviest first isn't optimal.  Whole excuse
+    days are then allocated by a knapsack over excuse days (see
+    _allocate_excuse_knapsack()), which maximizes the points saved exactly.
+    Dropping lowest assignments isn't accounted for.
+
+    Args:
+        late_day (np.array): (n_student, n_ass) late days, nan (waived) are
+            never excused
+        weight (np.array): weight (points) of each assignment
+        excuse_day (np.array): excuse days per student, negative are none
+        deduct (callable): deduct(unexcused, row) maps unexcused late days
+            of students row (indices into late_day) to the fraction of each
+            assignment deducted (default: penalty per day, greedy above)
+
+    Returns:
+        excused (np.array): (n_student, n_ass) excuse days allocated to each
+            assignment (at most its late days)
+    """
+    late_day = np.nan_to_num(np.asarray(late_day, dtype=float))
+    excuse_day = np.maximum(np.asarray(excuse_day, dtype=float), 0)
+    if deduct is not None:
+        return _allocate_excuse_knapsack(late_day, weight, excuse_day,
+                                         deduct)
+
+    order = np.argsort(-np.asarray(weight, dtype=float), kind='stable')
+
+    late_sort = late_day[:, order]
+    late_before = np.cumsum(late_sort, axis=1) - late_sort
+    excused_sort = np.clip(excuse_day[:, None] - late_before, 0, late_sort)
+
+    excused = np.empty_like(excused_sort)
+    excused[:, order] = excused_sort
+    return excused
+
+
+def _allocate_excuse_knapsack(late_day, weight, excuse_day, deduct):
+    """ allocate_excuse() of a deduct kernel, by dynamic program
+
+    Each assignment is a group of choices (excuse 0, 1, ... of its late
+    days) and excusing k of its days saves weight * (deduct(late) -
+    deduct(late - k)).  best[:, e] is the most saved with e excuse days over
+    the assignments so far, one pass per assignment and excused day count
+    updates every student at once.  Only students who are late and have
+    excuse days are allocated, time and memory are about n_student * n_ass
+    * n_day ** 2 of those, where n_day is the most excuse days of any
+    student (capped by late days).
+
+    Args: see allocate_excuse()
+
+    Returns:
+        excused (np.array): see allocate_excuse()
+    """
+    weight = np.asarray(weight, dtype=float)
+    late_int = np.ceil(late_day).astype(int)
+    budget = np.minimum(np.floor(excuse_day).astype(int),
+                        late_int.sum(axis=1))
+    excused = np.zeros(late_day.shape)
+    row = np.flatnonzero(budget > 0)
+    if not row.size:
+        return excused
+    late_day, late_int, budget = late_day[row], late_int[row], budget[row]
+    n_student, n_ass = late_day.shape
+    n_day = int(budget.max())
+
+    # points saved by excusing k days of each assignment (-inf if > late)
+    deduct_late = deduct(late_day, row)
+    k_max = min(n_day, int(late_int.max()))
+    saved = np.full((k_max + 1, n_student, n_ass), -np.inf)
+    saved[0] = 0
+    for k in range(1, k_max + 1):
+        saved[k] = np.where(
+            k <= late_int,
+            weight * (deduct_late - deduct(np.maximum(late_day - k, 0), row)),
+            -np.inf)
+
+    best = np.zeros((n_student, n_day + 1))
+    choice = np.zeros((n_ass, n_student, n_day + 1), dtype=int)
+    for j in range(n_ass):
+        best_new = best.copy()
+        for k in range(1, min(k_max, late_int[:, j].max()) + 1):
+            # strictly better (with float tolerance), else fewer excused
+            cand = best[:, :-k] + saved[k, :, j, None]
+            better = cand > best_new[:, k:] + 1e-12
+            best_new[:, k:] = np.where(better, cand, best_new[:, k:])
+            choice[j, :, k:] = np.where(better, k, choice[j, :, k:])
+        best = best_new
+
+    # trace back each student's choices, last assignment first
+    idx = np.arange(n_student)
+    day = budget.copy()
+    for j in reversed(range(n_ass)):
+        excused[row, j] = choice[j, idx, day]
+        day -= choice[j, idx, day]
+    return excused
+
+
+def ledger_frame(df_late, excused, penalty_per_day, cat=None, deduct=None):
+    """ long ledger of every late student-assignment pair
+
+    Args:
+        df_late (pd.DataFrame): index is email, columns are assignments,
+            values are late days (nan if waived)
+        excused (np.array): see allocate_excuse()
+        penalty_per_day (float): see Gradebook.get_late_penalty()
+        cat (str): category, added as a column if given
+        deduct (np.array): (n_student, n_ass) fraction of each assignment
+            deducted (defaults to penalty_per_day per unexcused day), see
+            get_late_deduct()
+
+    Returns:
+        df_ledger (pd.DataFrame): one row per late (unwaived) pair, columns
+            are email, assignment, (category), late_day, excused, unexcused
+            and penalty (percentage of the assignment deducted)
+    """
+    late_day = df_late.to_numpy(dtype=float)
+    row, col = np.nonzero(np.nan_to_num(late_day) > 0)
+    unexcused = late_day[row, col] - excused[row, col]
+    if deduct is None:
+        penalty = penalty_per_day * unexcused
+    else:
+        penalty = deduct[row, col]
+
+    df_ledger = pd.DataFrame({'email': df_late.index[row],
+                              'assignment': df_late.columns[col],
+                              'late_day': late_day[row, col],
+                              'excused': excused[row, col],
+                              'unexcused': unexcused,
+                              'penalty': penalty})
+    if cat is not None:
+        df_ledger.insert(2, 'category', cat)
+    return df_ledger
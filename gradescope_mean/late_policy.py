@@ -0,0 +1,106 @@
+import numpy as np
+
+
+def late_linear(perc, late_day, penalty_per_day):
+    """ each unexcused late day deducts penalty_per_day of the assignment
+
+    Args:
+        perc (np.array): (n_student, n_ass) percentages (nan is 0)
+        late_day (np.array): (n_student, n_ass) unexcused late days
+        penalty_per_day (float): fraction of the assignment per day
+
+    Returns:
+        deduct (np.array): (n_student, n_ass) fraction of each assignment
+            deducted
+    """
+    return penalty_per_day * late_day
+
+
+def late_decay(perc, late_day, penalty_per_day):
+    """ each unexcused late day keeps (1 - penalty_per_day) of the credit
+
+    Args: see late_linear()
+
+    Returns:
+        deduct (np.array): see late_linear()
+    """
+    return perc * (1 - (1 - penalty_per_day) ** late_day)
+
+
+# kernels of late_penalty's policy key (see get_late_deduct()).  each maps
+# percentage & unexcused late day matrices to the fraction of each
+# assignment deducted, all students and assignments at once
+LATE_POLICY_DICT = {'linear': late_linear,
+                    'decay': late_decay}
+
+
+def check_late_policy(late, name=''):
+    """ validates the policy keys of one category's late_penalty
+
+    Args:
+        late (dict): late_penalty of one category (see
+            Gradebook.get_late_penalty())
+        name (str): category, used in error messages
+    """
+    if not isinstance(late, dict):
+        raise ValueError(f'late_penalty ({name}): expected a mapping, got '
+                         f'{late!r}')
+    policy = late.get('policy')
+    if policy is not None and policy not in LATE_POLICY_DICT:
+        raise ValueError(f'late_penalty ({name}): unknown policy {policy!r}, '
+                         f'must be one of {", ".join(LATE_POLICY_DICT)}')
+    if policy == 'decay' and not 0 <= late.get('penalty_per_day', 0) <= 1:
+        raise ValueError(f'late_penalty ({name}): decay penalty_per_day must '
+                         f'be between 0 and 1, got '
+                         f'{late["penalty_per_day"]!r}')
+
+    max_penalty = late.get('max_penalty')
+    if isinstance(max_penalty, dict):
+        cap_list = list(max_penalty.values())
+    else:
+        cap_list = [] if max_penalty is None else [max_penalty]
+    for cap in cap_list:
+        if not isinstance(cap, (int, float)) or not 0 <= cap <= 1:
+            raise ValueError(f'late_penalty ({name}): max_penalty must be '
+                             f'between 0 and 1, got {cap!r}')
+    cutoff_day = late.get('cutoff_day')
+    if cutoff_day is not None and cutoff_day < 0:
+        raise ValueError(f'late_penalty ({name}): cutoff_day must be '
+                         f'non-negative, got {cutoff_day!r}')
+    if policy is None and (max_penalty is not None or cutoff_day is not None):
+        raise ValueError(f'late_penalty ({name}): max_penalty and cutoff_day '
+                         f'require a policy')
+
+
+def get_late_deduct(perc, late_day, penalty_per_day, policy='linear',
+                    max_penalty=None, cutoff_day=None):
+    """ fraction of each assignment lost to lateness
+
+    The policy's kernel gives the deduction, which is capped at max_penalty
+    (if given).  Assignments more than cutoff_day unexcused days late (if
+    given) earn no credit.  No assignment loses more than its percentage.
+
+    Args:
+        perc (np.array): (n_student, n_ass) percentages, nan (waived) are
+            never deducted
+        late_day (np.array): (n_student, n_ass) unexcused late days
+        penalty_per_day (float): see LATE_POLICY_DICT
+        policy (str): key of LATE_POLICY_DICT
+        max_penalty (float): largest fraction of any one assignment deducted,
+            an (n_ass,) array caps each assignment (inf is uncapped)
+        cutoff_day (int): unexcused late days after which an assignment
+            earns zero credit
+
+    Returns:
+        deduct (np.array): (n_student, n_ass) fraction of each assignment
+            deducted (between 0 and its percentage)
+    """
+    perc = np.maximum(np.nan_to_num(np.asarray(perc, dtype=float)), 0)
+    late_day = np.nan_to_num(np.asarray(late_day, dtype=float))
+
+    deduct = LATE_POLICY_DICT[policy](perc, late_day, penalty_per_day)
+    if max_penalty is not None:
+        deduct = np.minimum(deduct, max_penalty)
+    if cutoff_day is not None:
+        deduct = np.where(late_day > cutoff_day, perc, deduct)
+    return np.clip(deduct, 0, perc)
@@ -0,0 +1,89 @@
+import pathlib
+
+import pandas as pd
+
+LONG_COL_LIST = ['student', 'assignment', 'score', 'max_pts', 'late_minutes']
+F_META = 'meta.parquet'
+
+
+def write_long(df_long, folder, df_meta=None, append=False):
+    """ writes long format to a folder of sorted, dictionary encoded parquet
+
+    each call writes a new part file (part-00000.parquet, ...), so adding an
+    assignment only writes its rows rather than rewriting everything.
+    requires pyarrow.
+
+    Args:
+        df_long (pd.DataFrame): see Gradebook.to_long()
+        folder (str): output folder (created if needed)
+        df_meta (pd.DataFrame): see Gradebook.df_meta (written if given)
+        append (bool): if False, existing part files are deleted first
+
+    Returns:
+        f_part (pathlib.Path): part file written
+    """
+    folder = pathlib.Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    f_part_list = sorted(folder.glob('part-*.parquet'))
+    if not append:
+        for f_part in f_part_list:
+            f_part.unlink()
+        f_part_list = list()
+
+    # dictionary encode student / assignment, sort so rows of an assignment
+    # are contiguous
+    df_long = df_long.loc[:, LONG_COL_LIST].copy()
+    for col in ('student', 'assignment'):
+        df_long[col] = df_long[col].astype(str).astype('category')
+    df_long.sort_values(['assignment', 'student'], inplace=True)
+
+    if f_part_list:
+        idx = int(f_part_list[-1].stem.split('-')[-1]) + 1
+    else:
+        idx = 0
+    f_part = folder / f'part-{idx:05d}.parquet'
+    df_long.to_parquet(f_part, index=False)
+
+    if df_meta is not None:
+        df_meta.reset_index().to_parquet(folder / F_META, index=False)
+
+    return f_part
+
+
+def read_long(folder):
+    """ reads output of write_long()
+
+    rows of later part files replace rows of earlier ones for the same
+    student-assignment pair (so re-exporting an assignment updates it)
+
+    Args:
+        folder (str): folder written by write_long()
+
+    Returns:
+        df_long (pd.DataFrame): see Gradebook.to_long()
+        df_meta (pd.DataFrame): see Gradebook.df_meta (None if not written)
+    """
+    folder = pathlib.Path(folder)
+    f_part_list = sorted(folder.glob('part-*.parquet'))
+    if not f_part_list:
+        raise FileNotFoundError(f'no part-*.parquet files in {folder}')
+
+    df_long = pd.concat([pd.read_parquet(f) for f in f_part_list],
+                        ignore_index=True)
+    for col in ('student', 'assignment'):
+        df_long[col] = df_long[col].astype(str)
+    if len(f_part_list) > 1:
+        df_long.drop_duplicates(['student', 'assignment'], keep='last',
+                                inplace=True)
+    df_long.sort_values(['assignment', 'student'], inplace=True,
+                        ignore_index=True)
+    for col in ('student', 'assignment'):
+        df_long[col] = df_long[col].astype('category')
+
+    df_meta = None
+    if (folder / F_META).exists():
+        df_meta = pd.read_parquet(folder / F_META)
+        df_meta.set_index(df_meta.columns[0], inplace=True)
+
+    return df_long, df_meta
@@ -0,0 +1,176 @@
+import hashlib
+import pathlib
+import pickle
+from collections import OrderedDict
+
+from .config_cache import get_file_key
+from .grade_result import GradeResult
+from .gradebook import Gradebook
+from .perc_to_letter import perc_to_letter
+
+PIPELINE_VERSION = 1
+
+# stages, in order.  each depends on the previous stage and these config
+# attributes (its slice of the config)
+STAGE_LIST = [('parse', ['dtype_policy']),
+              ('prune', ['email_list', 'email_mapping']),
+              ('substitute', ['sub_dict', 'sub_exclude']),
+              ('remove', ['remove_list', 'exclude_complete_thresh']),
+              ('waive', ['waive_dict']),
+              ('curve', ['curve_dict']),
+              ('average', ['cat_weight_dict', 'cat_drop_dict',
+                           'cat_late_dict', 'late_waive_dict']),
+              ('letter', ['grade_thresh'])]
+
+
+def _get_slice(config, attr_list):
+    """ config attributes a stage depends on """
+    d = {attr: getattr(config, attr) for attr in attr_list}
+    if 'email_mapping' in d:
+        # contents of the mapping file, not its name
+        d['email_mapping'] = config.get_email_mapping()
+    return d
+
+
+class Pipeline:
+    """ Config.__call__() as a chain of memoized stages (see STAGE_LIST)
+
+    Each stage is keyed by a hash of its parent's key and its slice of the
+    config, the parse stage by the hash of the csv.  Stages never modify
+    their input, each result is kept in memory (least recently used are
+    evicted) and optionally pickled into folder.  So changing only
+    grade_thresh re-runs only lettering, changing only a curve doesn't
+    re-parse, re-prune or re-waive.
+
+    Attributes:
+        folder (pathlib.Path): on-disk memo (None for memory only)
+        max_memo (int): results kept in memory
+        memo (OrderedDict): keys are (stage, key), values are results.  least
+            recently used first
+        n_run (dict): keys are stages, values are number of times run
+    """
+
+    def __init__(self, folder=None, max_memo=64):
+        self.folder = None if folder is None else pathlib.Path(folder)
+        if self.folder is not None:
+            self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_memo = max_memo
+        self.memo = OrderedDict()
+        self.n_run = {stage: 0 for stage, _ in STAGE_LIST}
+
+    @staticmethod
+    def get_key(key_parent, stage, config):
+        """ sha256 of parent's key, stage name and stage's config slice """
+        attr_list = dict(STAGE_LIST)[stage]
+        h = hashlib.sha256()
+        h.update(f'{PIPELINE_VERSION}\0{key_parent}\0{stage}\0'.encode())
+        h.update(pickle.dumps(_get_slice(config, attr_list)))
+        return h.hexdigest()
+
+    def _get_f_memo(self, stage, key):
+        return self.folder / f'{stage}.{key}.pkl'
+
+    def _get(self, stage, key, fnc):
+        """ result of stage with key, fnc() computes it if not memoized """
+        if (stage, key) in self.memo:
+            self.memo.move_to_end((stage, key))
+            return self.memo[stage, key]
+
+        value = None
+        if self.folder is not None:
+            f_memo = self._get_f_memo(stage, key)
+            if f_memo.exists():
+                try:
+                    with open(f_memo, 'rb') as f:
+                        value = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    value = None
+
+        if value is None:
+            value = fnc()
+            self.n_run[stage] += 1
+            if self.folder is not None:
+                try:
+                    with open(self._get_f_memo(stage, key), 'wb') as f:
+                        pickle.dump(value, f,
+                                    protocol=pickle.HIGHEST_PROTOCOL)
+                except OSError:
+                    pass
+
+        self.memo[stage, key] = value
+        while len(self.memo) > self.max_memo:
+            self.memo.popitem(last=False)
+        return value
+
+    def run(self, f_scope, config, as_result=False, return_bound=False):
+        """ processes f_scope with config, see Config.__call__()
+
+        Args:
+            f_scope (str): raw gradescope csv
+            config (Config): configuration
+            as_result (bool): if True, returns a GradeResult rather than
+                copying into df_grade_full
+            return_bound (bool): if True, returns bound_config too
+
+        Returns:
+            gradebook (Gradebook): processed gradebook (a copy, may be
+                modified)
+            df_grade_full (pd.DataFrame): full data frame (GradeResult if
+                as_result)
+            bound_config (BoundConfig): only if return_bound, see
+                Config.__call__()
+        """
+        key = get_file_key(pathlib.Path(f_scope))['sha256']
+
+        def run_stage(gradebook, fnc):
+            """ copy of gradebook, modified in place by fnc """
+            gradebook = gradebook.copy()
+            fnc(gradebook)
+            return gradebook
+
+        key = self.get_key(key, 'parse', config)
+        gradebook = self._get('parse', key, lambda: Gradebook(
+            f_scope=f_scope, dtype_policy=config.dtype_policy))
+
+        def prune(gradebook):
+            if config.email_list:
+                gradebook.prune_email(email_list=config.email_list,
+                                      mapping=config.get_email_mapping())
+
+        key = self.get_key(key, 'prune', config)
+        gradebook = self._get('prune', key,
+                              lambda: run_stage(gradebook, prune))
+
+        # resolve (and validate) everything before processing
+        bound_config = config.bind(gradebook)
+        for stage in ('substitute', 'remove', 'waive', 'curve'):
+            key = self.get_key(key, stage, config)
+            gradebook = self._get(stage, key, lambda: run_stage(
+                gradebook, getattr(bound_config, stage)))
+
+        def average():
+            kwargs = bound_config.get_average_kwargs(gradebook)
+            kwargs['grade_thresh'] = None
+            df_grade = gradebook.average(**kwargs)
+            del df_grade['letter']
+            return df_grade
+
+        key = self.get_key(key, 'average', config)
+        df_grade = self._get('average', key, average)
+
+        def letter():
+            df = df_grade.copy()
+            df['letter'] = df['mean'].map(lambda perc: perc_to_letter(
+                perc, grade_thresh=config.grade_thresh))
+            return df
+
+        key = self.get_key(key, 'letter', config)
+        df_grade = self._get('letter', key, letter).copy()
+
+        gradebook = gradebook.copy()
+        result = GradeResult(df_meta=gradebook.df_meta, df_grade=df_grade,
+                             df_perc=gradebook.df_perc)
+        out = gradebook, result if as_result else result.to_frame()
+        if return_bound:
+            return out + (bound_config,)
+        return out
@@ -1,8 +1,10 @@
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import numpy as np
 
+from .plot_svg import (BIN_END, BIN_SIZE, BIN_START, OVER_LABEL, UNDER_LABEL,
+                       get_feat_list, hist_counts)
 
-def plot_hist(df_grade_full, cat_weight_dict):
+
+def plot_hist(df_grade_full, cat_weight_dict, partition=None, binned=False):
     """ plots a histogram of grades
 
     example:
@@ -11,28 +13,56 @@ def plot_hist(df_grade_full, cat_weight_dict):
     Args:
         df_grade_full (pd.DataFrame):
         cat_weight_dict (dict): keys are categories, values are weights
+        partition (CategoryPartition): if passed, categories are taken from
+            partition (those without any assignments are skipped) rather
+            than cat_weight_dict
+        binned (bool): if True, grades are binned with np.histogram and only
+            the counts are sent to plotly (figure size doesn't grow with the
+            number of students)
 
     Returns:
         fig (plotly):
     """
+    # plotly is only needed here (plot_hist_svg() doesn't need it)
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
 
-    # always plot mean grade histogram
-    feat_list = ['mean']
-    if cat_weight_dict is not None:
-        # plot histogram per category (if specified)
-        feat_list += [f'mean_{feat}' for feat in cat_weight_dict.keys()]
+    feat_list = get_feat_list(cat_weight_dict, partition=partition)
+    if binned:
+        bin_edge, count_dict, mean_dict = hist_counts(df_grade_full,
+                                                      feat_list)
+        bin_center = (bin_edge[:-1] + bin_edge[1:]) / 2
+        # underflow / overflow bars sit one bin beyond each end
+        bin_center = np.concatenate([[BIN_START - BIN_SIZE / 2], bin_center,
+                                     [BIN_END + BIN_SIZE / 2]])
+        tick_dict = {perc: f'{perc:g}' for perc in
+                     (BIN_START, (BIN_START + BIN_END) / 2, BIN_END)}
+        tick_dict[BIN_START - BIN_SIZE / 2] = UNDER_LABEL
+        tick_dict[BIN_END + BIN_SIZE / 2] = OVER_LABEL
 
     # make histogram subplots
     fig = make_subplots(cols=len(feat_list), rows=1, subplot_titles=feat_list)
     for col_idx, feat in enumerate(feat_list):
-        trace = go.Histogram(y=df_grade_full[feat], name='feat',
-                             ybins=dict(start=.5, end=1, size=.025),
-                             opacity=0.75)
-        fig.append_trace(trace, col=col_idx + 1, row=1)
+        if binned:
+            trace = go.Bar(x=count_dict[feat], y=bin_center, name='feat',
+                           orientation='h', width=BIN_SIZE, opacity=0.75)
+            mean = mean_dict[feat]
+        else:
+            trace = go.Histogram(y=df_grade_full[feat], name='feat',
+                                 ybins=dict(start=BIN_START, end=BIN_END,
+                                            size=BIN_SIZE),
+                                 opacity=0.75)
+            mean = df_grade_full[feat].mean()
+        fig.add_trace(trace, row=1, col=col_idx + 1)
+        if binned:
+            fig.update_yaxes(tickvals=list(tick_dict.keys()),
+                             ticktext=list(tick_dict.values()),
+                             row=1, col=col_idx + 1)
 
-        mean = df_grade_full[feat].mean()
         fig.add_hline(y=mean, annotation_text=f'mean: {mean:.3f}',
                       col=col_idx + 1, row=1)
     fig.update_layout(showlegend=False)
+    if binned:
+        fig.update_layout(bargap=0)
 
     return fig
@@ -0,0 +1,141 @@
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# histogram bins (fixed so output size doesn't depend on class size)
+BIN_START = .5
+BIN_END = 1
+BIN_SIZE = .025
+
+# labels of the underflow / overflow bins (first / last count of hist_counts)
+UNDER_LABEL = f'<{BIN_START:g}'
+OVER_LABEL = f'>{BIN_END:g}'
+
+
+def get_feat_list(cat_weight_dict, partition=None):
+    """ columns of df_grade_full to plot: overall mean then per category
+
+    Args:
+        cat_weight_dict (dict): keys are categories, values are weights
+        partition (CategoryPartition): if passed, categories are taken from
+            partition (those without any assignments are skipped) rather
+            than cat_weight_dict
+
+    Returns:
+        feat_list (list): column names
+    """
+    feat_list = ['mean']
+    if partition is not None:
+        feat_list += [f'mean_{cat}' for cat in partition.cat_list
+                      if cat and partition.cat_idx_dict[cat].size]
+    elif cat_weight_dict is not None:
+        # plot histogram per category (if specified)
+        feat_list += [f'mean_{feat}' for feat in cat_weight_dict.keys()]
+    return feat_list
+
+
+def hist_counts(df_grade_full, feat_list):
+    """ bins each feature on the fixed BIN_START - BIN_END bins
+
+    Grades below BIN_START (or above BIN_END, extra credit) are counted in
+    an underflow (or overflow) bin, so every student is counted without
+    being mistaken for a grade at the edge of the range.
+
+    Args:
+        df_grade_full (pd.DataFrame): output of Gradebook.average_full()
+        feat_list (list): columns of df_grade_full to bin
+
+    Returns:
+        bin_edge (np.array): BIN_START to BIN_END, step of BIN_SIZE
+        count_dict (dict): keys are feat, values are counts per bin with
+            one more bin on each side: count[0] is underflow (UNDER_LABEL),
+            count[-1] is overflow (OVER_LABEL)
+        mean_dict (dict): keys are feat, values are mean (nan ignored)
+    """
+    n_bin = int(round((BIN_END - BIN_START) / BIN_SIZE))
+    bin_edge = np.linspace(BIN_START, BIN_END, n_bin + 1)
+
+    count_dict = dict()
+    mean_dict = dict()
+    for feat in feat_list:
+        x = np.asarray(df_grade_full[feat], dtype=float)
+        x = x[~np.isnan(x)]
+        count, _ = np.histogram(x, bins=bin_edge)
+        count_dict[feat] = np.concatenate(
+            [[(x < BIN_START).sum()], count, [(x > BIN_END).sum()]])
+        mean_dict[feat] = x.mean() if x.size else np.nan
+
+    return bin_edge, count_dict, mean_dict
+
+
+def plot_hist_svg(df_grade_full, cat_weight_dict, partition=None,
+                  width=250, height=400, margin=40):
+    """ static svg histogram of grades (no plotly needed)
+
+    Args:
+        df_grade_full (pd.DataFrame): output of Gradebook.average_full()
+        cat_weight_dict (dict): keys are categories, values are weights
+        partition (CategoryPartition): see get_feat_list()
+        width (int): width of each subplot (pixels)
+        height (int): height of each subplot (pixels)
+        margin (int): margin around each subplot (pixels)
+
+    Returns:
+        svg (str): svg document
+    """
+    feat_list = get_feat_list(cat_weight_dict, partition=partition)
+    bin_edge, count_dict, mean_dict = hist_counts(df_grade_full, feat_list)
+
+    # underflow / overflow bins are drawn one bin beyond each end
+    bin_edge = np.concatenate([[BIN_START - BIN_SIZE], bin_edge,
+                               [BIN_END + BIN_SIZE]])
+    tick_list = [(BIN_START - BIN_SIZE / 2, UNDER_LABEL)] + \
+                [(perc, f'{perc:g}') for perc in
+                 (BIN_START, (BIN_START + BIN_END) / 2, BIN_END)] + \
+                [(BIN_END + BIN_SIZE / 2, OVER_LABEL)]
+
+    def y_pix(perc):
+        # grades increase upwards (as in plot_hist)
+        frac = (perc - bin_edge[0]) / (bin_edge[-1] - bin_edge[0])
+        return margin + (1 - frac) * height
+
+    panel_width = width + 2 * margin
+    total_width = panel_width * len(feat_list)
+    total_height = height + 2 * margin
+    line_list = [f'<svg xmlns="http://www.w3.org/2000/svg" '
+                 f'width="{total_width}" height="{total_height}" '
+                 f'font-family="sans-serif" font-size="12">']
+    for col_idx, feat in enumerate(feat_list):
+        x0 = col_idx * panel_width + margin
+        counts = count_dict[feat]
+        max_count = max(counts.max(), 1)
+
+        line_list.append(f'<text x="{x0 + width / 2}" y="{margin / 2}" '
+                         f'text-anchor="middle">{escape(feat)}</text>')
+        line_list.append(f'<rect x="{x0}" y="{margin}" width="{width}" '
+                         f'height="{height}" fill="none" stroke="#ccc"/>')
+
+        for count, lo, hi in zip(counts, bin_edge[:-1], bin_edge[1:]):
+            if not count:
+                continue
+            bar_width = width * count / max_count
+            line_list.append(
+                f'<rect x="{x0}" y="{y_pix(hi):.1f}" '
+                f'width="{bar_width:.1f}" '
+                f'height="{y_pix(lo) - y_pix(hi):.1f}" '
+                f'fill="#636efa" fill-opacity="0.75"/>')
+
+        for perc, label in tick_list:
+            line_list.append(f'<text x="{x0 - 4}" y="{y_pix(perc) + 4:.1f}" '
+                             f'text-anchor="end">{escape(label)}</text>')
+
+        mean = mean_dict[feat]
+        if BIN_START <= mean <= BIN_END:
+            y = y_pix(mean)
+            line_list.append(f'<line x1="{x0}" x2="{x0 + width}" '
+                             f'y1="{y:.1f}" y2="{y:.1f}" stroke="black"/>')
+            line_list.append(f'<text x="{x0 + width}" y="{y - 4:.1f}" '
+                             f'text-anchor="end">mean: {mean:.3f}</text>')
+    line_list.append('</svg>')
+
+    return '\n'.join(line_list)
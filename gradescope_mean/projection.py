@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+
+from .assign_list import normalize
+from .get_mean_drop_low import get_cat_mean
+from .perc_to_letter import GRADE_THRESH
+
+SOURCE_LIST = ['student', 'class']
+
+
+def _sample(perc, pool, n_sample, n_rem, source, rng):
+    """ samples percentages of remaining assignments
+
+    Args:
+        perc (np.array): (n_student, n_ass) observed percentages, nan skipped
+        pool (np.array): observed percentages of whole class (or prior)
+        n_sample (int): samples per student
+        n_rem (int): remaining assignments
+        source (str): 'student' samples each student's own percentages
+            (class if student has none), 'class' samples pool
+        rng (np.random.Generator): random generator
+
+    Returns:
+        perc_rem (np.array): (n_student, n_sample, n_rem)
+    """
+    shape = perc.shape[0], n_sample, n_rem
+    if pool.size:
+        perc_rem = rng.choice(pool, size=shape)
+    else:
+        perc_rem = np.full(shape, np.nan)
+
+    if source == 'student':
+        # nan last, draw uniformly among each student's first count
+        perc_sort = np.sort(perc, axis=1)
+        count = (~np.isnan(perc)).sum(axis=1)
+        idx = (rng.random(shape) * count[:, None, None]).astype(int)
+        has_obs = count > 0
+        perc_rem[has_obs] = perc_sort[has_obs][
+            np.arange(has_obs.sum())[:, None, None], idx[has_obs]]
+
+    return perc_rem
+
+
+def _get_remaining(remaining, partition, points):
+    """ points of each remaining assignment, per category
+
+    Returns:
+        cat_rem_dict (dict): keys are categories, values are arrays of points
+    """
+    cat_rem_dict = {cat: np.empty(0) for cat in partition.cat_list}
+    for cat, rem in (remaining or dict()).items():
+        cat = normalize(cat)
+        if cat not in cat_rem_dict:
+            raise ValueError(f'remaining category not in category weights: '
+                             f'{cat}')
+        if np.isscalar(rem):
+            # as many as given, each worth the category's mean points
+            cat_points = points[cat]
+            pts = cat_points.mean() if cat_points.size else 1.
+            rem = [pts] * int(rem)
+        cat_rem_dict[cat] = np.asarray(rem, dtype=float)
+    return cat_rem_dict
+
+
+def _get_pool(perc, prior, cat_list):
+    """ percentages sampled for categories which have none graded
+
+    Returns:
+        pool_dict (dict): keys are categories of prior, values are arrays.
+            key None is every graded percentage of the class
+    """
+    pool_dict = {None: perc[~np.isnan(perc)]}
+    for cat, pool in (prior or dict()).items():
+        cat = normalize(cat)
+        if cat not in cat_list:
+            raise ValueError(f'prior category not in category weights: '
+                             f'{cat}')
+        pool_dict[cat] = np.atleast_1d(np.asarray(pool, dtype=float))
+    return pool_dict
+
+
+def project(gradebook, bound_config, remaining=None, ungraded=None,
+            n_sample=1000, source='student', max_bytes=2 ** 28, seed=None,
+            prior=None):
+    """ projected letter grade probabilities, given assignments to come
+
+    Scores of remaining assignments are sampled n_sample times per student
+    and each sample is averaged as Gradebook.average() does (weights, drop
+    lowest and late penalty of assignments so far, remaining ones are
+    assumed on time).  Students are processed in chunks so that each
+    (student, sample, assignment) array stays below about max_bytes.
+
+    Args:
+        gradebook (Gradebook): gradebook, after bound_config.prepare()
+        bound_config (BoundConfig): see Config.prepare()
+        remaining (dict): keys are categories, values are either the number
+            of assignments to come (each worth the category's mean points)
+            or a list of their points
+        ungraded (list): assignments in gradebook which are yet to be
+            graded, their scores are sampled too
+        n_sample (int): samples per student
+        source (str): one of SOURCE_LIST.  'student' samples each student's
+            own percentages in the category, 'class' everyone's
+        max_bytes (int): approximate memory bound per chunk
+        seed (int): seed of random generator
+        prior (dict): keys are categories, values are percentages sampled
+            for the category while none of its assignments are graded
+            (default: every graded percentage of the class)
+
+    Returns:
+        df_project (pd.DataFrame): index is email, columns are mean
+            (expected final mean), letter (most probable) and probability of
+            each letter
+    """
+    if source not in SOURCE_LIST:
+        raise ValueError(f'source must be one of {", ".join(SOURCE_LIST)}')
+    config = bound_config.config
+    cat_weight_dict = config.cat_weight_dict
+    if not cat_weight_dict:
+        # all assignments contain ''
+        cat_weight_dict = {'': 1}
+    partition = gradebook.partition(cat_weight_dict.keys())
+
+    perc_all = gradebook.df_perc.to_numpy(dtype=float)
+    ungraded_idx = [gradebook.ass_list.index(gradebook.ass_list.lookup(ass))
+                    for ass in (ungraded or list())]
+    is_ungraded = np.zeros(perc_all.shape[1], dtype=bool)
+    is_ungraded[ungraded_idx] = True
+
+    # late penalty of assignments so far (see BoundConfig.average())
+    late_waive_dict = bound_config.get_average_kwargs(gradebook)[
+        'late_waive_dict']
+    cat_late_dict = {
+        cat: gradebook.category_late(cat=cat, partition=partition,
+                                     waive_dict=late_waive_dict,
+                                     **bound_config.cat_late_dict[cat])
+        for cat in partition.cat_list if cat in bound_config.cat_late_dict}
+
+    # per category: graded percentages, weights of graded and to come
+    cat_dict = dict()
+    points = {cat: partition.cat_points_dict[cat][
+        ~is_ungraded[partition.cat_idx_dict[cat]]]
+              for cat in partition.cat_list}
+    cat_rem_dict = _get_remaining(remaining, partition, points)
+    pool_dict = _get_pool(perc_all[:, ~is_ungraded], prior,
+                          cat_list=partition.cat_list)
+    for cat, cat_idx in partition.cat_idx_dict.items():
+        graded = ~is_ungraded[cat_idx]
+        perc = perc_all[:, cat_idx[graded]]
+        weight_rem = np.concatenate([partition.cat_points_dict[cat][~graded],
+                                     cat_rem_dict[cat]])
+        pool = perc[~np.isnan(perc)]
+        if not pool.size:
+            # nothing graded yet (e.g. a weighted category with no
+            # assignments), sample its prior
+            pool = pool_dict.get(cat, pool_dict[None])
+        cat_dict[cat] = perc, points[cat], weight_rem, pool
+
+    # letters, highest first (see perc_to_letter())
+    grade_thresh = config.grade_thresh or GRADE_THRESH
+    thresh, letter = zip(*sorted(grade_thresh.items()))
+    thresh = np.array(thresh, dtype=float)
+    letter_list = list(letter[::-1]) + ['no-grade']
+    n_letter = len(letter_list)
+
+    n_student = perc_all.shape[0]
+    n_col = max(len(w) + len(w_rem) for _, w, w_rem, _ in cat_dict.values())
+    # a few float64 working arrays of (student, sample, assignment) each
+    chunk = max(1, int(max_bytes // (32 * n_sample * max(n_col, 1))))
+    rng = np.random.default_rng(seed)
+
+    count = np.zeros((n_student, n_letter), dtype=int)
+    mean_exp = np.full(n_student, np.nan)
+    for start in range(0, n_student, chunk):
+        sl = slice(start, start + chunk)
+        n = len(range(*sl.indices(n_student)))
+        total = np.zeros((n, n_sample))
+        weight_total = np.zeros((n, n_sample))
+        for cat, (perc, weight, weight_rem, pool) in cat_dict.items():
+            perc_cat = np.broadcast_to(perc[sl, None, :],
+                                       (n, n_sample, perc.shape[1]))
+            if weight_rem.size:
+                perc_rem = _sample(perc[sl], pool, n_sample=n_sample,
+                                   n_rem=weight_rem.size, source=source,
+                                   rng=rng)
+                perc_cat = np.concatenate([perc_cat, perc_rem], axis=2)
+            deduct, penalty = None, None
+            if cat in cat_late_dict:
+                cat_late = cat_late_dict[cat]
+                penalty = cat_late['penalty'][sl, None]
+                if cat_late['deduct'] is not None:
+                    # remaining assignments are assumed on time
+                    graded = ~is_ungraded[partition.cat_idx_dict[cat]]
+                    deduct = np.zeros((n, 1, perc_cat.shape[2]))
+                    deduct[:, 0, :perc.shape[1]] = \
+                        cat_late['deduct'][sl][:, graded]
+            mean = get_cat_mean(perc_cat, np.concatenate([weight, weight_rem]),
+                                drop_n=config.cat_drop_dict.get(cat, 0),
+                                deduct=deduct, penalty=penalty)
+            del perc_cat
+
+            # categories without assignments are ignored in final mean
+            valid = ~np.isnan(mean)
+            total += np.where(valid, mean, 0) * cat_weight_dict[cat]
+            weight_total += valid * cat_weight_dict[cat]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / weight_total
+
+        # letter index (highest first), no-grade if nan / below all
+        idx = np.searchsorted(thresh, mean + 1e-8, side='right') - 1
+        idx = np.where((idx < 0) | np.isnan(mean), n_letter - 1,
+                       len(thresh) - 1 - idx)
+        idx += np.arange(n)[:, None] * n_letter
+        count[sl] = np.bincount(idx.ravel(), minlength=n * n_letter).reshape(
+            n, n_letter)
+
+        valid = ~np.isnan(mean)
+        n_valid = valid.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_exp[sl] = np.where(valid, mean, 0).sum(axis=1) / n_valid
+
+    df_project = pd.DataFrame(count / n_sample, index=gradebook.df_perc.index,
+                              columns=letter_list)
+    if not df_project['no-grade'].any():
+        del df_project['no-grade']
+    df_project.insert(0, 'letter', df_project.idxmax(axis=1))
+    df_project.insert(0, 'mean', mean_exp)
+    return df_project
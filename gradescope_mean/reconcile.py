@@ -0,0 +1,175 @@
+import re
+from collections import defaultdict
+
+import pandas as pd
+
+# columns of a mapping file (see save_mapping())
+MAPPING_COL_LIST = ['left', 'right', 'score']
+
+
+def email_key(email):
+    """ comparable part of an email: prefix (before @), lowercase, alnum only
+    """
+    return re.sub(r'[^a-z0-9]', '', str(email).split('@')[0].lower())
+
+
+def name_key(name):
+    """ comparable name, tokens sorted (so 'Doe, Jane' matches 'jane doe') """
+    return ' '.join(sorted(re.findall(r'[a-z0-9]+', str(name).lower())))
+
+
+def ngram_set(s, n=3):
+    """ set of n-grams of s, padded so short strings have some """
+    s = f'^{s}$'
+    return {s[idx:idx + n] for idx in range(max(len(s) - n + 1, 1))}
+
+
+def dice(set0, set1):
+    """ dice coefficient of two sets, 0 (disjoint) to 1 (equal) """
+    if not set0 or not set1:
+        return 0.
+    return 2 * len(set0 & set1) / (len(set0) + len(set1))
+
+
+class NgramIndex:
+    """ inverted index from n-gram to the keys which contain it
+
+    Candidates of a query are the keys which share the most n-grams with it
+    (n-grams in more than max_posting keys are too common to block on and
+    are skipped), so a query never compares against every key.
+
+    Attributes:
+        key_list (list): indexed keys
+        gram_list (list): n-gram set per key
+        posting_dict (dict): keys are n-grams, values are lists of indices
+            into key_list
+    """
+
+    def __init__(self, key_list, n=3, max_posting=1000):
+        self.n = n
+        self.max_posting = max_posting
+        self.key_list = list(key_list)
+        self.gram_list = [ngram_set(key, n=n) for key in self.key_list]
+
+        self.posting_dict = defaultdict(list)
+        for idx, gram_set in enumerate(self.gram_list):
+            for gram in gram_set:
+                self.posting_dict[gram].append(idx)
+
+    def candidate(self, key, n_block=20):
+        """ indices of (at most n_block) keys sharing most n-grams with key
+
+        Returns:
+            idx_list (list): indices into key_list
+            gram_set (set): n-grams of key
+        """
+        gram_set = ngram_set(key, n=self.n)
+        count_dict = defaultdict(int)
+        for gram in gram_set:
+            posting = self.posting_dict.get(gram, ())
+            if len(posting) > self.max_posting:
+                continue
+            for idx in posting:
+                count_dict[idx] += 1
+        idx_list = sorted(count_dict, key=count_dict.get, reverse=True)
+        return idx_list[:n_block], gram_set
+
+
+def reconcile(email_left, email_right, name_left=None, name_right=None,
+              id_left=None, id_right=None, n_candidate=3, min_score=.3,
+              n_block=20):
+    """ ranked candidate matches of each left student among right students
+
+    Emails are compared by their prefix (see email_key()), names (if given)
+    regardless of token order (see name_key()).  Candidates come from n-gram
+    indices of the right roster (see NgramIndex), each is scored by the
+    dice coefficient of n-grams (the larger of email and name scores when
+    names are given, so either a renamed email or a renamed student still
+    matches).
+
+    Args:
+        email_left (list): emails of left roster
+        email_right (list): emails of right roster
+        name_left (list): names of left roster (optional)
+        name_right (list): names of right roster (optional)
+        id_left (list): identifies left students in output (default: email)
+        id_right (list): identifies right students in output (default:
+            email)
+        n_candidate (int): candidates kept per left student
+        min_score (float): candidates below this score are discarded
+        n_block (int): candidates scored per left student, per index
+
+    Returns:
+        df_candidate (pd.DataFrame): columns are left, right (see id_left,
+            id_right), score and rank (0 is best), in order of left roster
+    """
+    if id_left is None:
+        id_left = email_left
+    if id_right is None:
+        id_right = email_right
+    use_name = name_left is not None and name_right is not None
+    email_index = NgramIndex([email_key(e) for e in email_right])
+    if use_name:
+        name_index = NgramIndex([name_key(x) for x in name_right])
+
+    row_list = list()
+    for idx_left, email in enumerate(email_left):
+        idx_set, gram_email = email_index.candidate(email_key(email),
+                                                    n_block=n_block)
+        idx_set = set(idx_set)
+        if use_name:
+            idx_name, gram_name = name_index.candidate(
+                name_key(name_left[idx_left]), n_block=n_block)
+            idx_set.update(idx_name)
+
+        score_list = list()
+        for idx in idx_set:
+            score = dice(gram_email, email_index.gram_list[idx])
+            if use_name:
+                score = max(score, dice(gram_name, name_index.gram_list[idx]))
+            if score >= min_score:
+                score_list.append((score, id_right[idx]))
+
+        score_list = sorted(score_list, key=lambda x: (-x[0], str(x[1])))
+        for rank, (score, right) in enumerate(score_list[:n_candidate]):
+            row_list.append({'left': id_left[idx_left], 'right': right,
+                             'score': score, 'rank': rank})
+
+    return pd.DataFrame(row_list, columns=['left', 'right', 'score', 'rank'])
+
+
+def match_best(df_candidate):
+    """ one to one mapping, greedily taking highest scoring pairs
+
+    Args:
+        df_candidate (pd.DataFrame): see reconcile()
+
+    Returns:
+        df_mapping (pd.DataFrame): columns are MAPPING_COL_LIST
+    """
+    df = df_candidate.sort_values(['score', 'left', 'right'],
+                                  ascending=[False, True, True])
+    left_set, right_set = set(), set()
+    row_list = list()
+    for left, right, score in zip(df['left'], df['right'], df['score']):
+        if left in left_set or right in right_set:
+            continue
+        left_set.add(left)
+        right_set.add(right)
+        row_list.append((left, right, score))
+    return pd.DataFrame(row_list, columns=MAPPING_COL_LIST)
+
+
+def save_mapping(df_mapping, f_mapping):
+    """ writes mapping csv (edit by hand as needed, rows may be deleted) """
+    df_mapping.loc[:, MAPPING_COL_LIST].to_csv(f_mapping, index=False)
+
+
+def load_mapping(f_mapping):
+    """ reads mapping csv
+
+    Returns:
+        mapping (dict): keys are left, values are right
+    """
+    df = pd.read_csv(f_mapping, dtype={'left': str, 'right': str})
+    return dict(zip(df['left'], df['right']))
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+from .perc_to_letter import GRADE_THRESH
+
+# metadata columns which aren't groups (see get_meta_col())
+META_ID_LIST = ['firstname', 'lastname', 'sid']
+
+
+def get_meta_col(df_meta, by):
+    """ metadata column to group by
+
+    Args:
+        df_meta (pd.DataFrame): see Gradebook.df_meta
+        by (str): column of df_meta, or 'section' / 'sections' for the
+            section column (the metadata which isn't a name or sid, as in
+            GradeStore)
+
+    Returns:
+        col (str): column of df_meta
+    """
+    if by in df_meta.columns:
+        return by
+    if by in ('section', 'sections'):
+        col_list = [c for c in df_meta.columns if c not in META_ID_LIST]
+        if col_list:
+            return col_list[0]
+    raise ValueError(f'no metadata column "{by}", expected one of: '
+                     f'{", ".join(df_meta.columns)}')
+
+
+def group_mean(codes, x, n_group):
+    """ mean of each column of x per group, ignoring nan
+
+    A single bincount over (group, column) pairs, rather than one pass (or
+    one filter) per group.
+
+    Args:
+        codes (np.array): group (0 to n_group - 1) per row of x
+        x (np.array): (n_row, n_col) values
+        n_group (int): number of groups
+
+    Returns:
+        mean (np.array): (n_group, n_col), nan if a group has no values
+        count (np.array): (n_group, n_col), number of values (not nan)
+    """
+    x = np.asarray(x, dtype=float)
+    n_col = x.shape[1]
+    valid = ~np.isnan(x)
+    idx = (codes[:, None] * n_col + np.arange(n_col)).ravel()
+    size = n_group * n_col
+    total = np.bincount(idx, weights=np.where(valid, x, 0).ravel(),
+                        minlength=size).reshape(n_group, n_col)
+    count = np.bincount(idx, weights=valid.ravel(),
+                        minlength=size).reshape(n_group, n_col)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count, count.astype(int)
+
+
+def report_by(gradebook, df_grade, by='section', grade_thresh=None):
+    """ aggregates of grades, late days and completion per group of students
+
+    Every aggregate is computed in one grouped pass: students are coded by
+    group (pd.factorize()) and every per-student column is reduced at once
+    (see group_mean()).
+
+    Args:
+        gradebook (Gradebook): processed gradebook (see Config.prepare())
+        df_grade (pd.DataFrame): output of Gradebook.average()
+        by (str): metadata column to group by (see get_meta_col())
+        grade_thresh (dict): letters to count (default: GRADE_THRESH), in
+            order of threshold
+
+    Returns:
+        df_report (pd.DataFrame): index is group, columns are:
+            n_student: number of students
+            mean, mean_{cat}, late days remain ({cat}): mean of df_grade
+                column
+            late_day: mean late days per student (sum over assignments,
+                default 60 minute grace period)
+            complete: mean fraction of (unwaived) assignments submitted
+            n_{letter}: number of students per letter
+            complete ({ass}): fraction of students who submitted assignment
+    """
+    col = get_meta_col(gradebook.df_meta, by)
+    index = gradebook.df_perc.index
+    df_grade = df_grade.reindex(index)
+    codes, group = pd.factorize(
+        gradebook.df_meta.loc[index, col].astype(str), sort=True)
+    n_group = len(group)
+
+    # per student columns, reduced all at once
+    col_grade = [c for c in df_grade.columns
+                 if pd.api.types.is_numeric_dtype(df_grade[c])]
+    perc = gradebook.df_perc.to_numpy(dtype=float)
+    waived = np.isnan(perc)
+    submit = np.where(waived, np.nan, perc > 0)
+    lateday = gradebook.df_lateday.reindex(
+        index=index, columns=gradebook.df_perc.columns).to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        complete = (perc > 0).sum(axis=1) / (~waived).sum(axis=1)
+    x = np.column_stack([df_grade[col_grade].to_numpy(dtype=float),
+                         np.nansum(lateday, axis=1),
+                         complete,
+                         submit])
+    mean, _ = group_mean(codes, x, n_group)
+
+    # letter counts, one bincount over (group, letter) pairs
+    if grade_thresh is None:
+        grade_thresh = GRADE_THRESH
+    letter_list = [letter for _, letter in
+                   sorted(grade_thresh.items(), reverse=True)]
+    letter_list = list(dict.fromkeys(letter_list))
+    letter = df_grade['letter'].astype(str)
+    letter_list += sorted(set(letter) - set(letter_list))
+    letter_codes = pd.Categorical(letter, categories=letter_list).codes
+    n_letter = np.bincount(codes * len(letter_list) + letter_codes,
+                           minlength=n_group * len(letter_list)).reshape(
+        n_group, len(letter_list))
+
+    col_list = col_grade + ['late_day', 'complete'] + \
+        [f'complete ({ass})' for ass in gradebook.df_perc.columns]
+    df_report = pd.DataFrame(mean, index=pd.Index(group, name=col),
+                             columns=col_list)
+    df_report.insert(0, 'n_student', np.bincount(codes, minlength=n_group))
+    n_col = len(col_grade) + 3
+    for idx, letter in enumerate(letter_list):
+        df_report.insert(n_col + idx, f'n_{letter}', n_letter[:, idx])
+
+    return df_report
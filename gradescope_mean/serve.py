@@ -0,0 +1,435 @@
+import copy
+import json
+import logging
+import pathlib
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from .assign_list import AssignmentNotFoundError, normalize
+from .bound_config import ConfigBindError
+from .config import Config
+from .grade_io import GRADE_FORMAT_LIST
+from .gradebook import Gradebook
+
+logger = logging.getLogger('gradescope_mean')
+
+CONTENT_TYPE_DICT = {'csv': 'text/csv',
+                     'parquet': 'application/vnd.apache.parquet',
+                     'feather': 'application/vnd.apache.arrow.file'}
+
+
+def _to_json(x):
+    """ numpy / pandas scalar to json serializable (nan to None) """
+    if isinstance(x, np.generic):
+        x = x.item()
+    if isinstance(x, float) and np.isnan(x):
+        return None
+    if x is pd.NA or x is pd.NaT:
+        return None
+    return x
+
+
+def _series_to_json(s):
+    return {str(k): _to_json(v) for k, v in s.items()}
+
+
+class Course:
+    """ one course (gradescope csv & config) resident in memory
+
+    The gradebook is parsed (and emails pruned) and the config bound once.
+    Each regrade processes a copy of the gradebook, so waivers may be added
+    without re-parsing.  The csv / config are reloaded if they change on
+    disk, waivers whose assignment no longer resolves are then dropped.  All
+    methods must be called with lock held.
+
+    Attributes:
+        f_scope (pathlib.Path): gradescope csv
+        f_config (pathlib.Path): yaml config (None for default config)
+        lock (threading.Lock): held while course is loaded / processed
+        config (Config): configuration, including waivers added via waive()
+        gradebook (Gradebook): parsed & pruned, never processed
+        bound_config (BoundConfig): config bound to gradebook
+        waive_dict (dict): waivers added via waive() (not saved to config)
+        result (GradeResult): output of last regrade()
+        gradebook_processed (Gradebook): gradebook of last regrade()
+    """
+
+    def __init__(self, f_scope, f_config=None):
+        self.f_scope = pathlib.Path(f_scope).resolve()
+        if f_config is None:
+            f_config = self.f_scope.parent / 'config.yaml'
+            if not f_config.exists():
+                f_config = None
+        self.f_config = None if f_config is None else \
+            pathlib.Path(f_config).resolve()
+
+        self.lock = threading.Lock()
+        self.waive_dict = dict()
+        self._mtime = None
+        self.config = None
+        self.gradebook = None
+        self.bound_config = None
+        self.result = None
+        self.gradebook_processed = None
+
+    def _get_mtime(self):
+        f_list = [self.f_scope]
+        if self.f_config is not None:
+            f_list.append(self.f_config)
+        if self.config is not None and \
+                self.config.get_f_email_mapping() is not None:
+            # mapping csv of the config as last loaded (moving it edits
+            # the config, which changes its mtime too)
+            f_list.append(self.config.get_f_email_mapping())
+        return tuple(f.stat().st_mtime_ns for f in f_list)
+
+    def load(self):
+        """ (re)loads csv & config if they changed on disk since last load """
+        mtime = self._get_mtime()
+        if mtime == self._mtime:
+            return
+
+        if self.f_config is None:
+            config = Config()
+        else:
+            config = Config.from_file_cached(self.f_config)
+        gradebook = Gradebook(str(self.f_scope),
+                              dtype_policy=config.dtype_policy)
+        # pruned once, bound again whenever waivers are added (see _bind())
+        config.prune(gradebook)
+
+        self.config = config
+        self.gradebook = gradebook
+        self.waive_dict = self._check_waive(self.waive_dict)
+        self.bound_config = self._bind(self.waive_dict)
+        self.result = None
+        # includes the mapping csv of the config just loaded
+        self._mtime = self._get_mtime()
+        logger.info(f'loaded {self.f_scope}')
+
+    def _check_waive(self, waive_dict):
+        """ drops (with a warning) waivers which don't resolve in gradebook
+
+        Args:
+            waive_dict (dict): keys are emails, values are lists of
+                assignments (see waive())
+
+        Returns:
+            waive_dict (dict): waivers whose assignment resolves
+        """
+        waive_dict_out = dict()
+        for email, ass_list in waive_dict.items():
+            for ass in ass_list:
+                try:
+                    self.gradebook.ass_list.lookup(ass)
+                except AssignmentNotFoundError:
+                    logger.warning(f'waive ({email}): no unique assignment '
+                                   f'"{ass}" after reload (dropped)')
+                    continue
+                waive_dict_out.setdefault(email, []).append(ass)
+        return waive_dict_out
+
+    def _bind(self, waive_dict):
+        """ binds config, with added waivers, to gradebook """
+        config = self.config
+        if waive_dict:
+            config = copy.copy(config)
+            # resolutions of the cache don't include added waivers
+            config._cache = None
+            config.waive_dict = dict(config.waive_dict)
+            for email, ass_list in waive_dict.items():
+                config.waive_dict[email] = \
+                    config.waive_dict.get(email, []) + ass_list
+        return config.bind(self.gradebook)
+
+    def regrade(self):
+        """ processes a copy of gradebook
+
+        Returns:
+            result (GradeResult): see Gradebook.average_result()
+        """
+        self.load()
+        gradebook = self.gradebook.copy()
+        self.result = self.bound_config(gradebook)
+        self.gradebook_processed = gradebook
+        return self.result
+
+    def get_result(self):
+        """ result of last regrade (regrades if needed) """
+        self.load()
+        if self.result is None:
+            self.regrade()
+        return self.result
+
+    def waive(self, email, ass):
+        """ waives an assignment for a student and regrades
+
+        Args:
+            email (str): student email
+            ass (str): assignment name
+
+        Raises:
+            ConfigBindError: if ass doesn't resolve (waiver isn't added)
+        """
+        self.load()
+        email = email.lower()
+        try:
+            self.gradebook.ass_list.lookup(ass)
+        except AssignmentNotFoundError:
+            # binding only warns of a missing assignment
+            raise ConfigBindError(
+                [f'waive ({email}): no unique assignment "{ass}"'])
+        waive_dict = copy.deepcopy(self.waive_dict)
+        waive_dict.setdefault(email, []).append(normalize(ass))
+
+        self.bound_config = self._bind(waive_dict)
+        self.waive_dict = waive_dict
+        self.regrade()
+
+    def student(self, email):
+        """ one student's metadata, grades and percentages
+
+        Args:
+            email (str): student email (matched as in Gradebook.waive())
+
+        Returns:
+            d (dict): keys are 'email', 'meta', 'grade' and 'perc'
+        """
+        result = self.get_result()
+        email = self.gradebook_processed._resolve_email(email.lower())
+        if email not in result.index:
+            raise KeyError(f'student not found: {email}')
+
+        return {'email': email,
+                'meta': _series_to_json(result.df_meta.loc[email]),
+                'grade': _series_to_json(result.df_grade.loc[email]),
+                'perc': _series_to_json(result.df_perc.loc[email])}
+
+    def summary(self):
+        """ number of students, mean grade and count per letter """
+        df_grade = self.get_result().df_grade
+        return {'f_scope': str(self.f_scope),
+                'f_config': None if self.f_config is None else str(
+                    self.f_config),
+                'n_student': len(df_grade),
+                'mean': _to_json(df_grade['mean'].mean()),
+                'letter': _series_to_json(df_grade['letter'].value_counts()),
+                'waive': self.waive_dict}
+
+    def download(self, fmt='csv', columns=None):
+        """ full grade output as bytes, see GradeResult.write() """
+        result = self.get_result()
+        with tempfile.TemporaryDirectory() as folder:
+            f = pathlib.Path(folder) / f'grade_full.{fmt}'
+            result.write(f, fmt=fmt, columns=columns)
+            return f.read_bytes()
+
+
+class CourseCache:
+    """ least recently used courses, at most max_course in memory
+
+    Courses unused for more than max_idle seconds are evicted too, so a
+    large course which is rarely used doesn't stay resident.
+
+    Attributes:
+        max_course (int): number of courses kept in memory
+        max_idle (float): seconds a course is kept in memory without being
+            used (None keeps it until evicted by max_course)
+        course_dict (OrderedDict): keys are (f_scope, f_config), values are
+            Course.  least recently used first
+        t_used_dict (dict): keys are those of course_dict, values are time
+            (time.monotonic()) of last use
+        lock (threading.Lock): guards course_dict & t_used_dict
+    """
+
+    def __init__(self, max_course=8, max_idle=None):
+        self.max_course = max_course
+        self.max_idle = max_idle
+        self.course_dict = OrderedDict()
+        self.t_used_dict = dict()
+        self.lock = threading.Lock()
+
+    def get(self, f_scope, f_config=None):
+        """ gets course (added if absent), evicts least recently used
+
+        Returns:
+            course (Course): course, hold course.lock to use it
+        """
+        course = Course(f_scope, f_config)
+        key = course.f_scope, course.f_config
+        t = time.monotonic()
+        with self.lock:
+            self._evict_idle(t)
+            self.t_used_dict[key] = t
+            if key in self.course_dict:
+                self.course_dict.move_to_end(key)
+                return self.course_dict[key]
+
+            self.course_dict[key] = course
+            while len(self.course_dict) > self.max_course:
+                key_lru, _ = self.course_dict.popitem(last=False)
+                self._pop(key_lru)
+            return course
+
+    def evict_idle(self):
+        """ evicts courses unused for more than max_idle seconds """
+        t = time.monotonic()
+        with self.lock:
+            self._evict_idle(t)
+
+    def _evict_idle(self, t):
+        if self.max_idle is None:
+            return
+        # least recently used first, stop at first course used recently
+        for key in list(self.course_dict):
+            if t - self.t_used_dict[key] <= self.max_idle:
+                break
+            del self.course_dict[key]
+            self._pop(key, msg='idle')
+
+    def _pop(self, key, msg=None):
+        del self.t_used_dict[key]
+        msg = '' if msg is None else f' ({msg})'
+        logger.info(f'evicted {key[0]}{msg}')
+
+
+class GradeRequestHandler(BaseHTTPRequestHandler):
+    """ json api, see README.md (server.course_cache is a CourseCache)
+
+    GET /courses
+    GET /student?scope=...&email=...[&config=...]
+    GET /download?scope=...[&format=csv][&columns=...][&config=...]
+    POST /regrade {"scope": ..., ["config": ...]}
+    POST /waive {"scope": ..., "email": ..., "assignment": ...,
+                 ["config": ...]}
+    """
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send(self, status, body, content_type='application/json'):
+        if content_type == 'application/json':
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _get_param(self):
+        url = urlparse(self.path)
+        param = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if self.command == 'POST':
+            n = int(self.headers.get('Content-Length', 0))
+            if n:
+                param.update(json.loads(self.rfile.read(n)))
+        return url.path.rstrip('/'), param
+
+    def _handle(self):
+        try:
+            path, param = self._get_param()
+            handle_dict = {('GET', '/courses'): self._courses,
+                           ('GET', '/student'): self._student,
+                           ('GET', '/download'): self._download,
+                           ('POST', '/regrade'): self._regrade,
+                           ('POST', '/waive'): self._waive}
+            fnc = handle_dict.get((self.command, path))
+            if fnc is None:
+                self._send(404, {'error': f'not found: {self.command} '
+                                          f'{path}'})
+                return
+            fnc(param)
+        except ConfigBindError as e:
+            self._send(400, {'error': 'config does not match gradebook',
+                             'error_list': e.error_list})
+        except (KeyError, ValueError, FileNotFoundError,
+                AssignmentNotFoundError) as e:
+            self._send(400, {'error': str(e).strip('"\'')})
+        except Exception as e:
+            # the client always gets a response
+            logger.exception(f'{self.command} {self.path}')
+            self._send(500, {'error': f'{type(e).__name__}: {e}'})
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def _get_course(self, param):
+        if 'scope' not in param:
+            raise KeyError('scope required')
+        return self.server.course_cache.get(param['scope'],
+                                            param.get('config'))
+
+    def _courses(self, param):
+        cache = self.server.course_cache
+        with cache.lock:
+            key_list = list(cache.course_dict)
+        self._send(200, {'courses': [
+            {'f_scope': str(f_scope),
+             'f_config': None if f_config is None else str(f_config)}
+            for f_scope, f_config in key_list]})
+
+    def _regrade(self, param):
+        course = self._get_course(param)
+        with course.lock:
+            course.regrade()
+            self._send(200, course.summary())
+
+    def _student(self, param):
+        course = self._get_course(param)
+        if 'email' not in param:
+            raise KeyError('email required')
+        with course.lock:
+            self._send(200, course.student(param['email']))
+
+    def _waive(self, param):
+        course = self._get_course(param)
+        for key in ('email', 'assignment'):
+            if key not in param:
+                raise KeyError(f'{key} required')
+        with course.lock:
+            course.waive(param['email'], param['assignment'])
+            self._send(200, course.student(param['email']))
+
+    def _download(self, param):
+        course = self._get_course(param)
+        fmt = param.get('format', 'csv')
+        if fmt not in GRADE_FORMAT_LIST:
+            raise ValueError(f'format must be one of '
+                             f'{", ".join(GRADE_FORMAT_LIST)}')
+        with course.lock:
+            body = course.download(fmt=fmt, columns=param.get('columns'))
+        self._send(200, body, content_type=CONTENT_TYPE_DICT[fmt])
+
+
+class GradeServer(ThreadingHTTPServer):
+    """ evicts idle courses between requests (see CourseCache) """
+
+    def service_actions(self):
+        # called by serve_forever() every poll interval
+        self.course_cache.evict_idle()
+
+
+def make_server(host='127.0.0.1', port=8765, max_course=8, max_idle=3600):
+    """ local http server, keeps courses in memory between requests
+
+    Args:
+        host (str): host to bind (default: local only)
+        port (int): port (0 picks a free one)
+        max_course (int): courses kept in memory (see CourseCache)
+        max_idle (float): seconds an unused course is kept in memory (see
+            CourseCache)
+
+    Returns:
+        server (GradeServer): call serve_forever() to serve
+    """
+    server = GradeServer((host, port), GradeRequestHandler)
+    server.course_cache = CourseCache(max_course=max_course,
+                                      max_idle=max_idle)
+    return server
@@ -0,0 +1,70 @@
+import pathlib
+import pickle
+
+from .config_cache import get_file_key
+
+# bump whenever pickled Gradebook / Config state or processing changes, so
+# older snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+
+def get_f_snapshot(f_scope):
+    """ default snapshot file, hidden file beside f_scope """
+    f_scope = pathlib.Path(f_scope)
+    return f_scope.with_name(f'.{f_scope.name}.snapshot')
+
+
+def save_snapshot(gradebook, config, f_scope, f_snapshot=None):
+    """ pickles a gradebook processed by config (see Config.prepare())
+
+    Args:
+        gradebook (Gradebook): processed gradebook
+        config (Config): config which processed gradebook
+        f_scope (str): raw gradescope csv of gradebook
+        f_snapshot (str): snapshot file (default: see get_f_snapshot())
+    """
+    if f_snapshot is None:
+        f_snapshot = get_f_snapshot(f_scope)
+
+    d = {'version': SNAPSHOT_VERSION,
+         'scope': get_file_key(pathlib.Path(f_scope)),
+         'config': config.get_key(),
+         'gradebook': gradebook}
+    try:
+        with open(f_snapshot, 'wb') as f:
+            pickle.dump(d, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+
+
+def load_snapshot(f_scope, config, f_snapshot=None):
+    """ loads gradebook snapshot, if f_scope and config are unchanged
+
+    Args:
+        f_scope (str): raw gradescope csv
+        config (Config): config
+        f_snapshot (str): snapshot file (default: see get_f_snapshot())
+
+    Returns:
+        gradebook (Gradebook): processed gradebook (None if there is no
+            valid snapshot)
+    """
+    if f_snapshot is None:
+        f_snapshot = get_f_snapshot(f_scope)
+    f_snapshot = pathlib.Path(f_snapshot)
+    if not f_snapshot.exists():
+        return None
+
+    try:
+        with open(f_snapshot, 'rb') as f:
+            d = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(d, dict) or d.get('version') != SNAPSHOT_VERSION:
+        return None
+
+    key = get_file_key(pathlib.Path(f_scope), key_prev=d['scope'])
+    if key['sha256'] != d['scope']['sha256'] or \
+            config.get_key() != d['config']:
+        return None
+    return d['gradebook']
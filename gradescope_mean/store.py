@@ -0,0 +1,253 @@
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS term (
+    term_id INTEGER PRIMARY KEY,
+    course TEXT NOT NULL,
+    term TEXT NOT NULL,
+    imported TEXT NOT NULL,
+    UNIQUE (course, term));
+CREATE TABLE IF NOT EXISTS student (
+    student_id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    sid TEXT,
+    firstname TEXT,
+    lastname TEXT);
+CREATE INDEX IF NOT EXISTS student_sid ON student (sid);
+CREATE TABLE IF NOT EXISTS assignment (
+    assignment_id INTEGER PRIMARY KEY,
+    term_id INTEGER NOT NULL REFERENCES term,
+    name TEXT NOT NULL,
+    max_pts REAL,
+    UNIQUE (term_id, name));
+CREATE TABLE IF NOT EXISTS score (
+    term_id INTEGER NOT NULL REFERENCES term,
+    student_id INTEGER NOT NULL REFERENCES student,
+    assignment_id INTEGER NOT NULL REFERENCES assignment,
+    perc REAL,
+    PRIMARY KEY (student_id, assignment_id));
+CREATE INDEX IF NOT EXISTS score_assignment ON score (assignment_id);
+CREATE INDEX IF NOT EXISTS score_term ON score (term_id);
+CREATE TABLE IF NOT EXISTS late_day (
+    term_id INTEGER NOT NULL REFERENCES term,
+    student_id INTEGER NOT NULL REFERENCES student,
+    assignment_id INTEGER NOT NULL REFERENCES assignment,
+    late_minutes INTEGER,
+    late_day REAL,
+    PRIMARY KEY (student_id, assignment_id));
+CREATE INDEX IF NOT EXISTS late_day_term ON late_day (term_id);
+CREATE TABLE IF NOT EXISTS grade (
+    term_id INTEGER NOT NULL REFERENCES term,
+    student_id INTEGER NOT NULL REFERENCES student,
+    section TEXT,
+    mean REAL,
+    letter TEXT,
+    PRIMARY KEY (term_id, student_id));
+CREATE INDEX IF NOT EXISTS grade_student ON grade (student_id);
+CREATE INDEX IF NOT EXISTS grade_section ON grade (term_id, section);
+CREATE TABLE IF NOT EXISTS category_grade (
+    term_id INTEGER NOT NULL REFERENCES term,
+    student_id INTEGER NOT NULL REFERENCES student,
+    category TEXT NOT NULL,
+    mean REAL,
+    late_days_remain REAL,
+    PRIMARY KEY (term_id, student_id, category));
+CREATE INDEX IF NOT EXISTS category_grade_student
+    ON category_grade (student_id);
+"""
+
+# canned queries (see GradeStore.query())
+SQL_STUDENT_HISTORY = """
+SELECT term.course, term.term, student.email, grade.section, grade.mean,
+       grade.letter
+FROM grade
+JOIN term USING (term_id)
+JOIN student USING (student_id)
+WHERE student.email = ?
+ORDER BY term.term, term.course"""
+
+SQL_SECTION_MEAN = """
+SELECT term.course, term.term, grade.section, COUNT(*) AS n_student,
+       AVG(grade.mean) AS mean
+FROM grade
+JOIN term USING (term_id)
+WHERE term.course = ?
+GROUP BY term.term_id, grade.section
+ORDER BY term.term, grade.section"""
+
+
+def _none_if_nan(x):
+    """ sqlite stores None as NULL (nan would be stored as a REAL) """
+    if x is None or (isinstance(x, float) and np.isnan(x)):
+        return None
+    return x
+
+
+def _str_or_none(x):
+    """ sids are stored as text (some have a trailing S) """
+    return None if x is None else str(x)
+
+
+class GradeStore:
+    """ sqlite database of grades across courses / terms
+
+    Every table is indexed for the typical cross-term queries (a student's
+    history, section averages per term, ...).  Each import is a single
+    transaction of executemany() bulk inserts; re-importing a course / term
+    replaces it.
+
+    Attributes:
+        f_db (str): sqlite file
+        conn (sqlite3.Connection): connection
+    """
+
+    def __init__(self, f_db):
+        self.f_db = str(f_db)
+        self.conn = sqlite3.connect(self.f_db)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def import_grades(self, gradebook, df_grade, course, term):
+        """ imports processed gradebook and its grades
+
+        Args:
+            gradebook (Gradebook): processed gradebook
+            df_grade (pd.DataFrame): output of Gradebook.average() (or
+                average_full(), only grade columns are used)
+            course (str): course name
+            term (str): term name (e.g. '202310')
+
+        Returns:
+            term_id (int): id of course / term in database
+        """
+        df_meta = gradebook.df_meta
+        col_section = [c for c in df_meta.columns
+                       if c not in ('firstname', 'lastname', 'sid')]
+        email_list = list(gradebook.df_perc.index)
+        df_meta = df_meta.reindex(email_list)
+
+        def get_meta(col):
+            if col not in df_meta.columns:
+                return [None] * len(email_list)
+            return [_none_if_nan(x) for x in df_meta[col].astype(object)]
+
+        cat_list = [c[len('mean_'):] for c in df_grade.columns
+                    if c.startswith('mean_')]
+        df_grade = df_grade.reindex(email_list)
+
+        with self.conn:
+            # replace course / term (cascades by hand, no ON DELETE CASCADE)
+            row = self.conn.execute(
+                'SELECT term_id FROM term WHERE course = ? AND term = ?',
+                (course, term)).fetchone()
+            if row is not None:
+                for table in ('category_grade', 'grade', 'late_day', 'score',
+                              'assignment', 'term'):
+                    self.conn.execute(f'DELETE FROM {table} WHERE term_id = ?',
+                                      row)
+            term_id = self.conn.execute(
+                'INSERT INTO term (course, term, imported) VALUES (?, ?, ?)',
+                (course, term, datetime.now().isoformat())).lastrowid
+
+            # students (upsert on email)
+            self.conn.executemany(
+                'INSERT INTO student (email, sid, firstname, lastname) '
+                'VALUES (?, ?, ?, ?) ON CONFLICT (email) DO UPDATE SET '
+                'sid = excluded.sid, firstname = excluded.firstname, '
+                'lastname = excluded.lastname',
+                zip(email_list, map(_str_or_none, get_meta('sid')),
+                    get_meta('firstname'), get_meta('lastname')))
+            email_id_dict = dict(self.conn.execute(
+                'SELECT email, student_id FROM student'))
+            student_id = np.array([email_id_dict[e] for e in email_list])
+
+            # assignments
+            self.conn.executemany(
+                'INSERT INTO assignment (term_id, name, max_pts) '
+                'VALUES (?, ?, ?)',
+                ((term_id, ass, float(pts)) for ass, pts in
+                 zip(gradebook.ass_list, gradebook.points)))
+            ass_id_dict = dict(self.conn.execute(
+                'SELECT name, assignment_id FROM assignment '
+                'WHERE term_id = ?', (term_id,)))
+            ass_id = np.array([ass_id_dict[a] for a in gradebook.ass_list])
+
+            # scores & late days, one row per student-assignment
+            n_student, n_ass = gradebook.df_perc.shape
+            student_id_all = np.repeat(student_id, n_ass).tolist()
+            ass_id_all = np.tile(ass_id, n_student).tolist()
+            perc = gradebook.df_perc.to_numpy(dtype=float).ravel()
+            self.conn.executemany(
+                'INSERT INTO score VALUES (?, ?, ?, ?)',
+                zip([term_id] * perc.size, student_id_all, ass_id_all,
+                    map(_none_if_nan, perc.tolist())))
+
+            cols = list(gradebook.ass_list)
+            late_minutes = gradebook.df_late_minutes.reindex(
+                index=email_list, columns=cols).to_numpy(dtype=float).ravel()
+            late_day = gradebook.df_lateday.reindex(
+                index=email_list, columns=cols).to_numpy(
+                dtype=float, na_value=np.nan).ravel()
+            self.conn.executemany(
+                'INSERT INTO late_day VALUES (?, ?, ?, ?, ?)',
+                zip([term_id] * perc.size, student_id_all, ass_id_all,
+                    map(_none_if_nan, late_minutes.tolist()),
+                    map(_none_if_nan, late_day.tolist())))
+
+            # final grades
+            section = get_meta(col_section[0]) if col_section else \
+                [None] * len(email_list)
+            self.conn.executemany(
+                'INSERT INTO grade VALUES (?, ?, ?, ?, ?)',
+                zip([term_id] * len(email_list), student_id.tolist(),
+                    section, map(_none_if_nan, df_grade['mean'].tolist()),
+                    df_grade['letter'].tolist()))
+
+            for cat in cat_list:
+                col_late = f'late days remain ({cat})'
+                if col_late in df_grade.columns:
+                    late_remain = df_grade[col_late].astype(float).tolist()
+                else:
+                    late_remain = [None] * len(email_list)
+                self.conn.executemany(
+                    'INSERT INTO category_grade VALUES (?, ?, ?, ?, ?)',
+                    zip([term_id] * len(email_list), student_id.tolist(),
+                        [cat] * len(email_list),
+                        map(_none_if_nan,
+                            df_grade[f'mean_{cat}'].astype(float).tolist()),
+                        map(_none_if_nan, late_remain)))
+
+        return term_id
+
+    def query(self, sql, params=()):
+        """ runs a query
+
+        Args:
+            sql (str): sql query (e.g. SQL_STUDENT_HISTORY)
+            params (tuple): parameters of query
+
+        Returns:
+            df (pd.DataFrame): result
+        """
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def student_history(self, email):
+        """ final grades of one student in every course / term """
+        return self.query(SQL_STUDENT_HISTORY, (email.lower(),))
+
+    def section_mean(self, course):
+        """ mean grade per section per term of a course """
+        return self.query(SQL_SECTION_MEAN, (course,))
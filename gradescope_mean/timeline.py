@@ -0,0 +1,58 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+def submission_timeline(gradebook, quantiles=(.1, .5, .9),
+                        grace_period_minutes=60):
+    """ per-assignment submission time quantiles and late counts
+
+    The deadline of each assignment isn't in the gradescope csv, it is
+    inferred from late submissions (submission time minus lateness).
+    Assignments without any late submission have no deadline (NaT) and nan
+    hours relative to it.
+
+    Args:
+        gradebook (Gradebook): gradebook
+        quantiles (tuple): quantiles of submission time to compute
+        grace_period_minutes (int): lateness within this many minutes isn't
+            counted as late (see Gradebook.get_late_penalty())
+
+    Returns:
+        df_timeline (pd.DataFrame): index is assignment, columns are:
+            n_submit: number of submissions
+            n_late: number of submissions late (beyond grace period)
+            deadline: inferred deadline (UTC)
+            submit_q{q}: quantile of submission time (UTC)
+            hours_q{q}: quantile of hours after deadline (negative before)
+    """
+    df_submit = gradebook.submission_time()
+    t_submit = df_submit.to_numpy(dtype=float, na_value=np.nan)
+    late_minutes = gradebook.df_late_minutes.reindex(
+        index=df_submit.index, columns=df_submit.columns).to_numpy(dtype=float)
+
+    is_submit = ~np.isnan(t_submit)
+    is_late = is_submit & (late_minutes > grace_period_minutes)
+
+    # deadline = submission - lateness (lateness is rounded down to minutes)
+    t_deadline = np.where(is_late, t_submit - late_minutes * 60, np.nan)
+
+    with warnings.catch_warnings():
+        # assignments without any (late) submissions are all nan
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        deadline = np.floor(np.nanmedian(t_deadline, axis=0) / 60) * 60
+        t_quantile = np.nanquantile(t_submit, quantiles, axis=0)
+
+    df_timeline = pd.DataFrame({'n_submit': is_submit.sum(axis=0),
+                                'n_late': is_late.sum(axis=0),
+                                'deadline': pd.to_datetime(deadline, unit='s',
+                                                           utc=True)},
+                               index=df_submit.columns)
+    for q, t in zip(quantiles, t_quantile):
+        df_timeline[f'submit_q{q:g}'] = pd.to_datetime(t, unit='s', utc=True)
+    for q, t in zip(quantiles, t_quantile):
+        df_timeline[f'hours_q{q:g}'] = (t - deadline) / 3600
+    df_timeline.index.name = 'assignment'
+
+    return df_timeline
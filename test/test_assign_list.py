@@ -35,6 +35,17 @@ class TestAssignmentList:
         with pytest.raises(AssignmentNotFoundError):
             ass_list.match('ghost assignment')
 
+    def test_lookup(self):
+        l = [AssignmentList.MAX_PTS + s for s in ('hw1', 'hw10')]
+        with pytest.warns():
+            ass_list = AssignmentList(l)
+
+        # exact name is used even though it prefixes another
+        assert ass_list.lookup('HW 1') == 'hw1'
+        assert ass_list.lookup('w10') == 'hw10'
+        with pytest.raises(AssignmentNotFoundError):
+            ass_list.lookup('hw')
+
     def test_match_iter(self, ass_list):
         s_assign_exp = ['hw1', 'hw2']
         s_assign = sorted(ass_list.match_iter(s_assign='hw'))
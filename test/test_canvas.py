@@ -4,7 +4,7 @@ import pandas as pd
 import pytest
 
 import gradescope_mean
-from gradescope_mean.canvas.canvas import canvas_merge
+from gradescope_mean.canvas.canvas import *
 from gradescope_mean.config import Config
 
 test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
@@ -27,6 +27,26 @@ def canvas_csv(tmp_path):
     return str(f)
 
 
+@pytest.fixture
+def canvas_csv_list(tmp_path):
+    """Two canvas sections, one student isn't in gradescope"""
+    f_list = list()
+    for sec, sid_list in (('sec01', ['0123456789S', '0023456789S']),
+                          ('sec02', ['0003456789S', '9999999999S'])):
+        df = pd.DataFrame({
+            'Student': [f'Student, {sid}' for sid in sid_list],
+            'ID': [100, 101],
+            'SIS User ID': sid_list,
+            'SIS Login ID': ['a@nu.edu', 'b@nu.edu'],
+            'Section': [sec, sec],
+            'HW (placeholder)': [0, 0],
+        })
+        f = tmp_path / f'canvas_{sec}.csv'
+        df.to_csv(f, index=False)
+        f_list.append(str(f))
+    return f_list
+
+
 @pytest.fixture
 def df_grade():
     """Process test scope.csv and return grade dataframe"""
@@ -68,3 +88,80 @@ class TestCanvasMerge:
                               scale100=False)
         # firstname/lastname should still be present
         assert 'firstname' in df_out.columns
+
+
+class TestCanvasMergeMany:
+    def test_merge_many(self, canvas_csv_list, df_grade):
+        df_out_dict, df_coverage = canvas_merge_many(
+            f_canvas_list=canvas_csv_list,
+            df_grade=df_grade,
+            rm_gradescope_meta=False,
+            scale100=False)
+
+        # same as merging one at a time
+        for f_canvas in canvas_csv_list:
+            df_out = canvas_merge(f_canvas=f_canvas,
+                                  df_grade=df_grade.copy(),
+                                  rm_gradescope_meta=False,
+                                  scale100=False)
+            pd.testing.assert_frame_equal(df_out_dict[f_canvas], df_out)
+
+        # df_grade isn't modified
+        assert 'sid' in df_grade.columns
+
+        df = df_coverage.set_index('sid')
+        assert df.loc['9999999999S', 'missing_from'] == 'gradescope'
+        assert df.loc['9999999999S', 'f_canvas'] == canvas_csv_list[1]
+        assert sorted(df.index[df['missing_from'] == 'canvas']) == \
+               ['0000056789S', '0000456789S']
+
+
+class TestCanvasReconcile:
+    def test_reconcile(self, canvas_csv_list, df_grade):
+        """ canvas student not in gradescope is proposed a gradescope sid """
+        df_canvas = pd.concat([read_canvas(f) for f in canvas_csv_list])
+        df_canvas.loc['9999999999S', 'SIS Login ID'] = 'last4@nu.edu'
+        df_mapping = canvas_reconcile(df_canvas, df_grade)
+        assert df_mapping['left'].tolist() == ['9999999999S']
+        assert df_mapping['right'].tolist() == ['0000056789S']
+
+    def test_return_mapping(self, canvas_csv_list, df_grade, capsys):
+        """ mapping is returned (not printed) by both merge functions """
+        df_grade = df_grade.copy()
+        df_grade['firstname'] = df_grade['sid']
+        df_grade['lastname'] = 'Student'
+        _, df_coverage, df_mapping = canvas_merge_many(
+            f_canvas_list=canvas_csv_list, df_grade=df_grade,
+            return_mapping=True)
+        df_expected = canvas_reconcile(
+            pd.concat([read_canvas(f) for f in canvas_csv_list]),
+            index_sid(df_grade))
+        pd.testing.assert_frame_equal(df_mapping, df_expected)
+        assert df_mapping['left'].tolist() == ['9999999999S']
+
+        _, df_mapping = canvas_merge(f_canvas=canvas_csv_list[1],
+                                     df_grade=df_grade,
+                                     return_mapping=True)
+        assert df_mapping['left'].tolist() == ['9999999999S']
+        assert 'maybe these are the same' not in capsys.readouterr().out
+
+    def test_coverage_candidate(self, canvas_csv_list, df_grade):
+        df_grade = df_grade.copy()
+        df_grade['firstname'] = df_grade['sid']
+        df_grade['lastname'] = 'Student'
+        _, df_coverage = canvas_merge_many(f_canvas_list=canvas_csv_list,
+                                           df_grade=df_grade)
+        df = df_coverage.set_index('sid')
+        assert df.loc['9999999999S', 'candidate_sid'] in \
+               ('0000456789S', '0000056789S')
+        assert df.loc['9999999999S', 'score'] > 0
+
+    def test_sid_mapping(self, canvas_csv_list, df_grade):
+        sid_mapping = {'9999999999S': '0000056789S'}
+        df_out_dict, df_coverage = canvas_merge_many(
+            f_canvas_list=canvas_csv_list, df_grade=df_grade,
+            rm_gradescope_meta=False, sid_mapping=sid_mapping)
+        df_out = df_out_dict[canvas_csv_list[1]].set_index('sid')
+        assert df_out.loc['9999999999S', 'mean'] == \
+               df_grade.set_index('sid').loc['0000056789S', 'mean'] * 100
+        assert df_coverage['sid'].tolist() == ['0000456789S']
@@ -0,0 +1,50 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+import gradescope_mean
+from gradescope_mean.category_partition import CategoryPartition
+from gradescope_mean.gradebook import Gradebook
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def gradebook():
+    return Gradebook(str(test_folder / 'scope.csv'))
+
+
+class TestCategoryPartition:
+    def test_init(self):
+        partition = CategoryPartition(ass_list=['hw1', 'hw2', 'quiz1'],
+                                      points=[1, 2, 4],
+                                      cat_list=['hw', 'quiz'])
+        np.testing.assert_array_equal([0, 1], partition.cat_idx_dict['hw'])
+        np.testing.assert_array_equal([2], partition.cat_idx_dict['quiz'])
+        np.testing.assert_allclose([1, 2], partition.cat_points_dict['hw'])
+        assert partition.cat_ass_dict['hw'] == ['hw1', 'hw2']
+        assert partition.is_partition
+
+    def test_not_partition_warns(self):
+        partition = CategoryPartition(ass_list=['hw1', 'hw2', 'quiz1'],
+                                      points=[1, 2, 4],
+                                      cat_list=['hw', 'hw1'])
+        assert partition.ass_not_include == ['quiz1']
+        assert partition.ass_over_include == ['hw1']
+        assert not partition.is_partition
+        with pytest.warns(UserWarning, match='not in any category'):
+            partition.warn()
+
+    def test_cached(self, gradebook):
+        partition = gradebook.partition(['hw', 'quiz'])
+        assert partition is gradebook.partition(('hw', 'quiz'))
+        assert partition is not gradebook.partition(['hw'])
+
+    def test_invalidate_on_remove(self, gradebook):
+        partition = gradebook.partition(['hw', 'quiz'])
+        gradebook.remove('hw1')
+        _partition = gradebook.partition(['hw', 'quiz'])
+        assert _partition is not partition
+        assert _partition.cat_ass_dict['hw'] == ['hw2', 'hw3']
+        np.testing.assert_allclose([2, 3], _partition.cat_points_dict['hw'])
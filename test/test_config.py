@@ -2,6 +2,7 @@ import pathlib
 import tempfile
 
 import numpy as np
+import pandas as pd
 import pytest
 
 import gradescope_mean
@@ -169,6 +170,18 @@ class TestConfigValidation:
         with pytest.raises(ValueError, match='exclude_complete_thresh'):
             Config(exclude_complete_thresh=1.5)
 
+    def test_unknown_late_policy_raises(self):
+        """Unknown late policy should raise ValueError"""
+        with pytest.raises(ValueError, match='unknown policy'):
+            Config(cat_late_dict={'hw': {'penalty_per_day': .1,
+                                         'policy': 'quadratic'}})
+
+    def test_late_cutoff_without_policy_raises(self):
+        """cutoff_day without a policy should raise ValueError"""
+        with pytest.raises(ValueError, match='require a policy'):
+            Config(cat_late_dict={'hw': {'penalty_per_day': .1,
+                                         'cutoff_day': 3}})
+
     def test_null_values_in_yaml(self, tmp_path):
         """Config with all nulls (as in default) should load cleanly"""
         config_content = """\
@@ -235,6 +248,26 @@ class TestConfigEmailPrefix:
         config = Config(email_list=['FOO@BAR.EDU', 'Baz@Qux.Edu'])
         assert config.email_list == ['foo@bar.edu', 'baz@qux.edu']
 
+    def test_email_mapping(self, tmp_path):
+        """email_mapping csv is relative to config, applied to email_list"""
+        f_config = tmp_path / 'config.yaml'
+        f_config.write_text('email_list:\n  - lst0@nu.edu\n'
+                            'email_mapping: email_mapping.csv\n')
+        pd.DataFrame({'left': ['LST0@nu.edu'], 'right': ['last0@nu.edu'],
+                      'score': [.4]}).to_csv(tmp_path / 'email_mapping.csv',
+                                            index=False)
+        config = Config.from_file(f_config)
+        assert config.get_email_mapping() == {'lst0@nu.edu': 'last0@nu.edu'}
+
+        gradebook, _ = config(test_folder / 'scope.csv')
+        assert list(gradebook.df_perc.index) == ['last0@nu.edu']
+
+        # key follows the contents of the mapping csv, not only its path
+        key = config.get_key()
+        pd.DataFrame({'left': ['lst0@nu.edu'], 'right': ['last1@nu.edu']}
+                     ).to_csv(tmp_path / 'email_mapping.csv', index=False)
+        assert config.get_key() != key
+
     def test_waive_dict_keys_lowercased(self):
         """waive_dict email keys should be lowercased"""
         config = Config(waive_dict={'FOO@bar.edu': 'hw1'})
@@ -252,3 +285,212 @@ class TestConfigEmailPrefix:
                    'excuse_day_offset': {'FOO@bar.edu': 2}}})
         offset = config.cat_late_dict['hw']['excuse_day_offset']
         assert 'foo@bar.edu' in offset
+
+
+CONFIG_CACHE_CONTENT = """\
+category:
+  weight:
+    hw: 1
+    quiz: 1
+  late_penalty:
+    hw:
+      penalty_per_day: 0.1
+      excuse_day: 1
+      excuse_day_offset:
+        LAST3@other.edu: 1
+
+waive:
+  last0@other.edu: hw2, quiz
+
+waive_late:
+  last4: hw1
+"""
+
+
+class TestConfigCache:
+    def test_cache_hit(self, tmp_path, monkeypatch):
+        f_config = tmp_path / 'config.yaml'
+        f_config.write_text(CONFIG_CACHE_CONTENT)
+
+        config = Config.from_file_cached(f_config)
+        assert ConfigCache.get_f_cache(f_config).exists()
+
+        # second load doesn't parse yaml
+        def fail(*args, **kwargs):
+            raise AssertionError('yaml parsed')
+
+        monkeypatch.setattr(yaml, 'load', fail)
+        config_cached = Config.from_file_cached(f_config)
+        assert config_cached._get_state() == config._get_state()
+
+    def test_cache_invalid(self, tmp_path):
+        """ editing the yaml invalidates the cache """
+        f_config = tmp_path / 'config.yaml'
+        f_config.write_text(CONFIG_CACHE_CONTENT)
+        Config.from_file_cached(f_config)
+
+        f_config.write_text(CONFIG_CACHE_CONTENT.replace('quiz: 1', 'quiz: 2'))
+        config = Config.from_file_cached(f_config)
+        assert config.cat_weight_dict['quiz'] == 2
+
+    def test_email_mapping(self, tmp_path, monkeypatch):
+        """ mapping csv is found from any directory, editing it invalidates """
+        folder = tmp_path / 'course'
+        folder.mkdir()
+        f_config = folder / 'config.yaml'
+        f_config.write_text('email_list:\n  - lst0@nu.edu\n'
+                            'email_mapping: email_mapping.csv\n')
+        f_mapping = folder / 'email_mapping.csv'
+        pd.DataFrame({'left': ['lst0@nu.edu'], 'right': ['last0@nu.edu']}
+                     ).to_csv(f_mapping, index=False)
+        monkeypatch.chdir(tmp_path)
+        Config.from_file_cached('course/config.yaml')
+
+        monkeypatch.chdir(folder)
+        config = Config.from_file_cached('config.yaml')
+        gradebook, _ = config(test_folder / 'scope.csv')
+        assert list(gradebook.df_perc.index) == ['last0@nu.edu']
+        assert ConfigCache(f_config).state is not None
+
+        pd.DataFrame({'left': ['lst0@nu.edu'], 'right': ['last1@nu.edu']}
+                     ).to_csv(f_mapping, index=False)
+        assert ConfigCache(f_config).state is None
+
+    def test_resolve(self, tmp_path):
+        """ cached resolutions give the same grades as the uncached config """
+        f_scope = test_folder / 'scope.csv'
+        f_config = tmp_path / 'config.yaml'
+        f_config.write_text(CONFIG_CACHE_CONTENT)
+        _, df_grade_exp = Config.from_file(f_config)(f_scope)
+
+        for _ in range(2):
+            config = Config.from_file_cached(f_config)
+            gradebook, df_grade = config(f_scope)
+            pd.testing.assert_frame_equal(df_grade, df_grade_exp)
+
+        resolve = config._cache.get_resolve(gradebook.fingerprint())
+        assert resolve['email']['last0@other.edu'] == 'last0@nu.edu'
+        assert resolve['ass']['hw2'] == 'hw2'
+        assert resolve['ass']['quiz'] == 'quiz1'
+
+
+class TestConfigBind:
+    def test_bind(self):
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        config = Config(remove_list=['quiz'],
+                        sub_dict={'hw3': ['hw2']},
+                        waive_dict={'last1@other.edu': 'hw1, hw3'},
+                        late_waive_dict={'last2@nu.edu': 'hw1'})
+        bound = config.bind(gradebook)
+
+        assert list(bound.remove_idx) == [3]
+        assert list(bound.sub_idx_dict[2]) == [1, 2]
+        np.testing.assert_array_equal(bound.waive_idx[0], [1, 1])
+        np.testing.assert_array_equal(bound.waive_idx[1], [0, 2])
+        assert bound.late_waive_dict == {'last2@nu.edu': ['hw1']}
+
+        result = bound(gradebook)
+        assert 'quiz1' not in gradebook.ass_list
+        assert gradebook.df_perc.loc['last1@nu.edu', ['hw1', 'hw3']].isna(
+        ).all()
+        assert result.df_grade.shape[0] == 5
+
+    def test_bind_errors(self):
+        """ contradictions are errors, unresolved references warnings """
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        config = Config(cat_weight_dict={'hw': 1, 'exam': 1},
+                        cat_drop_dict={'quiz': 1},
+                        cat_late_dict={'lab': {'penalty_per_day': .1}},
+                        remove_list=['project'])
+        with pytest.raises(ConfigBindError) as exc_info:
+            config.bind(gradebook)
+        assert exc_info.value.error_list == [
+            'drop_low: category "quiz" has no weight',
+            'late_penalty: category "lab" has no weight']
+
+    def test_bind_unresolved(self):
+        """ references which don't resolve are ignored, warned at once """
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        config = Config(cat_weight_dict={'hw': 1, 'quiz': 1, 'exam': 1},
+                        remove_list=['practice'],
+                        sub_dict={'hw3': ['hw2', 'hw4']},
+                        waive_dict={'last0@nu.edu': 'hw999'},
+                        late_waive_dict={'last1@nu.edu': 'exam'},
+                        curve_dict={'exam': {'mean': .5}})
+        with pytest.warns(UserWarning) as record:
+            bound = config.bind(gradebook)
+        assert len(record) == 1
+        msg = str(record[0].message)
+        for s in ['weight: category "exam" matches no assignment',
+                  'exclude: no assignment "practice"',
+                  'substitute (hw3): no unique assignment "hw4"',
+                  'waive (last0@nu.edu): no unique assignment "hw999"',
+                  'waive_late (last1@nu.edu): no unique assignment "exam"',
+                  'curve: no unique assignment "exam"']:
+            assert s in msg
+        assert list(bound.sub_idx_dict[2]) == [1, 2]
+
+        # exam has no assignments yet, ignored in final mean
+        result = bound(gradebook)
+        assert result.df_grade['mean_exam'].isna().all()
+        assert result.df_grade['mean'].notna().all()
+
+    def test_bind_max_penalty(self):
+        """ per assignment max_penalty is bound to exact names """
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        config = Config(cat_weight_dict={'hw': 1, 'quiz': 1},
+                        cat_late_dict={'hw': {'penalty_per_day': .1,
+                                              'policy': 'linear',
+                                              'max_penalty': {'HW 1': .15}}})
+        bound = config.bind(gradebook)
+        assert bound.cat_late_dict['hw']['max_penalty'] == {'hw1': .15}
+
+        with pytest.warns(UserWarning, match='max_penalty'):
+            Config(cat_weight_dict={'hw': 1},
+                   cat_late_dict={'hw': {'penalty_per_day': .1,
+                                         'policy': 'linear',
+                                         'max_penalty': {'hw9': .1}}}
+                   ).bind(gradebook)
+
+    def test_bind_missing_email(self):
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        config = Config(waive_dict={'ghost@nu.edu': 'hw1'})
+        with pytest.warns(UserWarning, match='ghost@nu.edu'):
+            bound = config.bind(gradebook)
+        assert bound.waive_idx[0].size == 0
+
+        # no row is added for the missing student
+        bound(gradebook)
+        assert 'ghost@nu.edu' not in gradebook.df_perc.index
+
+    def test_bind_changed(self):
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        bound = Config().bind(gradebook)
+        gradebook.remove('quiz1')
+        with pytest.raises(ValueError, match='bound'):
+            bound(gradebook)
+
+    def test_curve(self):
+        """ curves follow waivers, curves of excluded assignments ignored """
+        f_scope = test_folder / 'scope.csv'
+        config = Config(remove_list=['quiz'],
+                        waive_dict={'last0@nu.edu': 'hw1'},
+                        curve_dict={'HW 1': {'mean': .5},
+                                    'quiz1': {'mean': .1}})
+        assert config.curve_dict['hw1']['raise_only']
+
+        gradebook, df_grade_full = config(f_scope)
+        perc = gradebook.df_perc['hw1']
+        assert np.isnan(perc['last0@nu.edu'])
+        np.testing.assert_allclose(perc.iloc[1:], .5)
+
+        with pytest.warns(UserWarning, match='curve'):
+            Config(curve_dict={'exam': {'mean': .5}}).bind(gradebook)
+        with pytest.raises(ValueError, match='curve'):
+            Config(curve_dict={'hw1': {'mean': .5, 'percentile': 50}})
+
+    def test_sub_exclude(self):
+        f_scope = test_folder / 'scope.csv'
+        config = Config(sub_dict={'hw3': ['hw2']}, sub_exclude=True)
+        gradebook, df_grade_full = config(f_scope)
+        assert gradebook.ass_list == ['hw1', 'hw3', 'quiz1']
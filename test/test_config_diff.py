@@ -0,0 +1,74 @@
+import pathlib
+
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.config_diff import *
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+f_scope = test_folder / 'scope.csv'
+
+
+def get_config(weight=60, penalty=.1, drop=1, **kwargs):
+    kwargs.setdefault('cat_late_dict', {'hw': {'penalty_per_day': penalty,
+                                               'excuse_day': 1}})
+    return Config(cat_weight_dict={'hw': weight, 'quiz': 100 - weight},
+                  cat_drop_dict={'hw': drop}, **kwargs)
+
+
+class TestAverageMemo:
+    @pytest.mark.parametrize('config', [Config(), get_config(),
+                                        get_config(waive_dict={
+                                            'last1@nu.edu': 'hw2'}),
+                                        get_config(cat_late_dict={'hw': {
+                                            'penalty_per_day': .1,
+                                            'policy': 'decay',
+                                            'cutoff_day': 2}})])
+    def test_average(self, config):
+        """ same as Gradebook.average() """
+        _, df_grade_exp = config(f_scope=f_scope)
+        df_grade_exp = df_grade_exp.loc[:, ['mean'] + [
+            c for c in df_grade_exp.columns
+            if c.startswith('mean_') or c.startswith('late')] + ['letter']]
+
+        gradebook = gradescope_mean.Gradebook(str(f_scope))
+        bound_config = config.prepare(gradebook)
+        df_grade = AverageMemo().average(gradebook, bound_config, key='')
+        pd.testing.assert_frame_equal(df_grade, df_grade_exp,
+                                      check_dtype=False)
+
+
+class TestDiffConfig:
+    def test_weight(self):
+        """ only weights differ, category means are shared """
+        memo = AverageMemo()
+        df_diff = diff_config(f_scope, get_config(weight=60),
+                              get_config(weight=50), memo=memo)
+        assert list(df_diff.index) == ['last1@nu.edu', 'last4@nu.edu']
+        assert df_diff.loc['last1@nu.edu', ('a', 'letter')] == 'B'
+        assert df_diff.loc['last1@nu.edu', ('b', 'letter')] == 'B+'
+        assert df_diff.loc['last1@nu.edu', ('meta', 'firstname')] == 'first1'
+        assert memo.n_compute == {'mean': 2, 'lateday': 1, 'late': 1}
+
+    def test_penalty(self):
+        """ only penalties differ, late days & unpenalized means are shared """
+        memo = AverageMemo()
+        df_diff = diff_config(f_scope, get_config(penalty=.1),
+                              get_config(penalty=2), memo=memo)
+        assert memo.n_compute == {'mean': 3, 'lateday': 1, 'late': 2}
+        assert len(df_diff)
+
+        # letters which don't change aren't output
+        df_diff = diff_config(f_scope, get_config(), get_config())
+        assert df_diff.empty
+
+    def test_waive(self):
+        """ configs which prepare differently are each prepared """
+        df_diff = diff_config(
+            f_scope, Config(),
+            Config(waive_dict={'last1@nu.edu': 'hw1, hw2'}),
+            name=('before', 'after'))
+        assert list(df_diff.index) == ['last1@nu.edu']
+        assert df_diff.loc['last1@nu.edu', ('after', 'mean')] == 1
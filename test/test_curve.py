@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gradescope_mean.curve import *
+
+
+@pytest.fixture
+def perc():
+    rng = np.random.default_rng(0)
+    perc = rng.uniform(.3, 1, size=(50, 4))
+    perc[[0, 3, 7], 1] = np.nan
+    perc[:, 3] = np.nan
+    return perc
+
+
+class TestCurve:
+    def test_check_curve(self):
+        curve = check_curve({'mean': .8})
+        assert curve['std'] is None
+        assert curve['raise_only']
+
+        for bad in ({}, {'mean': .8, 'percentile': 90}, {'std': .1},
+                    {'percentile': 110}, {'mean': .8, 'shift': 1}, .8):
+            with pytest.raises(ValueError, match='curve'):
+                check_curve(bad)
+
+    def test_ass_stats(self, perc):
+        stats = get_ass_stats(perc, q=(.1, .9))
+        df = pd.DataFrame(perc)
+        np.testing.assert_allclose(stats['mean'], df.mean())
+        np.testing.assert_allclose(stats['std'], df.std(ddof=0))
+        np.testing.assert_allclose(stats['quantile'],
+                                   df.quantile([.1, .9]).to_numpy())
+        np.testing.assert_array_equal(stats['count'], [50, 47, 50, 0])
+
+    def test_target(self, perc):
+        curve_list = [check_curve({'mean': .9, 'std': .05,
+                                   'raise_only': False}),
+                      check_curve({'mean': .9, 'raise_only': False}),
+                      check_curve({'mean': .9}),
+                      check_curve({'mean': .9})]
+        perc_curve = apply_curve(perc, curve_list)
+
+        np.testing.assert_allclose(np.nanmean(perc_curve[:, :2], axis=0),
+                                   .9)
+        np.testing.assert_allclose(np.nanstd(perc_curve[:, 0]), .05)
+        # shift only
+        np.testing.assert_allclose(np.nanstd(perc_curve[:, 1]),
+                                   np.nanstd(perc[:, 1]))
+        # waived stay waived, none lowered
+        np.testing.assert_array_equal(np.isnan(perc_curve), np.isnan(perc))
+        assert (perc_curve[:, 2] >= perc[:, 2]).all()
+
+    def test_percentile(self, perc):
+        curve_list = [check_curve({'percentile': 90}),
+                      check_curve({'percentile': 50, 'to': .9, 'max': 1})]
+        perc_curve = apply_curve(perc[:, :2], curve_list)
+
+        np.testing.assert_allclose(np.quantile(perc_curve[:, 0], .9), 1)
+        np.testing.assert_allclose(perc_curve[:, 0] / perc[:, 0],
+                                   1 / np.quantile(perc[:, 0], .9))
+        assert np.nanmax(perc_curve[:, 1]) <= 1
@@ -0,0 +1,76 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.dtype_policy import *
+from gradescope_mean.gradebook import Gradebook
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+kwargs = dict(cat_weight_dict={'hw': 3, 'quiz': 1},
+              cat_drop_dict={'hw': 1},
+              cat_late_dict={'hw': {'penalty_per_day': .1}})
+
+
+@pytest.fixture
+def gradebook_compact():
+    return Gradebook(str(test_folder / 'scope.csv'), dtype_policy='compact')
+
+
+class TestDtypePolicy:
+    def test_get_dtype_policy(self):
+        assert get_dtype_policy() == DTYPE_DEFAULT
+        assert get_dtype_policy('compact') == DTYPE_COMPACT
+        assert get_dtype_policy({'perc': 'float32'})['perc'] == 'float32'
+
+        with pytest.raises(ValueError, match='unknown dtype_policy'):
+            get_dtype_policy('tiny')
+        with pytest.raises(ValueError, match='unknown dtype_policy keys'):
+            get_dtype_policy({'not_a_key': 'int8'})
+
+    def test_compact(self, gradebook_compact):
+        assert (gradebook_compact.df_perc.dtypes == np.float32).all()
+        assert (gradebook_compact.df_late_minutes.dtypes == np.int32).all()
+        assert (gradebook_compact.df_lateday.dtypes == 'Int16').all()
+
+        # every student in the same section, names are unique
+        df_meta = gradebook_compact.df_meta
+        assert isinstance(df_meta['section_name'].dtype, pd.CategoricalDtype)
+        assert df_meta['firstname'].dtype == object
+
+    def test_compact_memory(self, gradebook_compact):
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        assert (gradebook_compact.memory_usage().sum() <
+                gradebook.memory_usage().sum())
+
+    def test_compact_grade_close(self, gradebook_compact):
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        gradebook.waive({'last0@nu.edu': ['hw1']})
+        gradebook_compact.waive({'last0@nu.edu': ['hw1']})
+        assert_grade_close(gradebook_compact.average(**kwargs),
+                           gradebook.average(**kwargs))
+
+    def test_assert_grade_close_raises(self):
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        df_grade = gradebook.average(**kwargs)
+        _df_grade = df_grade.copy()
+        _df_grade.iloc[0, 0] += 1e-3
+        with pytest.raises(AssertionError, match='grades not close'):
+            assert_grade_close(_df_grade, df_grade)
+
+    def test_cast_int_overflow(self):
+        df = pd.DataFrame({'hw1': [0, 40000]})
+        with pytest.raises(OverflowError):
+            cast_int(df, 'int16')
+
+    def test_config(self):
+        config = Config(dtype_policy='compact')
+        gradebook, _ = config(f_scope=test_folder / 'scope.csv')
+        assert (gradebook.df_perc.dtypes == np.float32).all()
+
+        with pytest.raises(ValueError, match='unknown dtype_policy'):
+            Config(dtype_policy='tiny')
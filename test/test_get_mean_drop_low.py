@@ -56,3 +56,36 @@ class TestGetMeanDropLow:
 
     def test_zero_scores(self):
         assert isclose(get_mean_drop_low([0, 0, 0], [1, 1, 1]), 0.0)
+
+    def test_return_drop(self):
+        # indices are into the input, nan entries are never dropped
+        mean, idx_drop = get_mean_drop_low([np.nan, 1, .8, .5], [1, 1, 1, 1],
+                                           drop_n=2, return_drop=True)
+        assert isclose(mean, 1)
+        assert list(idx_drop) == [3, 2]
+
+
+class TestMeanDropLow:
+    def test_same_as_get_mean_drop_low(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            n = rng.integers(1, 6)
+            perc = rng.choice([np.nan, 0, .3, .5, 1], size=n)
+            weight = rng.choice([1., 2., 3.], size=n)
+            drop_n = int(rng.integers(0, 4))
+
+            mean_exp, idx_exp = get_mean_drop_low(perc, weight, drop_n=drop_n,
+                                                  return_drop=True)
+            mean, drop = mean_drop_low(perc[None, :], weight, drop_n=drop_n,
+                                       return_drop=True)
+            np.testing.assert_allclose(mean[0], mean_exp)
+            assert set(np.flatnonzero(drop[0])) == set(idx_exp)
+
+
+class TestGetCatMean:
+    def test_penalty(self):
+        # penalty is added after dropping, means are floored at 0
+        perc = np.array([[1, .5, np.nan], [.2, .2, .2], [np.nan] * 3])
+        mean = get_cat_mean(perc, [1, 1, 1], drop_n=1,
+                            penalty=np.array([-.1, -.5, -.1]))
+        np.testing.assert_allclose(mean, [.9, 0, np.nan])
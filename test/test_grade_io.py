@@ -0,0 +1,57 @@
+import pathlib
+
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.grade_io import *
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def result():
+    config = Config(cat_weight_dict={'hw': 3, 'quiz': 1})
+    _, result = config(f_scope=test_folder / 'scope.csv', as_result=True)
+    return result
+
+
+@pytest.fixture
+def df_grade_full(result):
+    return result.to_frame()
+
+
+class TestGradeIO:
+    def test_get_format(self):
+        assert get_format('grade_full.parquet') == 'parquet'
+        assert get_format('grade_full', fmt='feather') == 'feather'
+        assert get_format('grade_full') == 'csv'
+        assert get_format('grade_full.txt') == 'csv'
+        with pytest.raises(ValueError, match='unknown grade format'):
+            get_format('grade_full', fmt='xlsx')
+        with pytest.raises(ValueError, match="doesn't match"):
+            get_format('grade_full.csv', fmt='parquet')
+
+    def test_select_columns(self, df_grade_full):
+        group_dict = {'meta': ['firstname', 'lastname']}
+        df = select_columns(df_grade_full, 'meta, mean, letter',
+                            group_dict=group_dict)
+        assert list(df.columns) == ['firstname', 'lastname', 'mean', 'letter']
+
+        with pytest.raises(KeyError, match='column not found'):
+            select_columns(df_grade_full, ['not a column'])
+
+    @pytest.mark.parametrize('fmt', GRADE_FORMAT_LIST)
+    def test_round_trip(self, result, df_grade_full, tmp_path, fmt):
+        if fmt != 'csv':
+            pytest.importorskip('pyarrow')
+        f = tmp_path / f'grade_full.{fmt}'
+        result.write(f)
+        df = read_grade(f)
+
+        # all formats match pd.read_csv of the csv output
+        df_exp = df_grade_full.reset_index()
+        assert list(df.columns) == list(df_exp.columns)
+        pd.testing.assert_series_equal(df['mean'], df_exp['mean'])
+        assert df['letter'].tolist() == df_exp['letter'].tolist()
@@ -0,0 +1,58 @@
+import pathlib
+
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.grade_io import read_grade
+from gradescope_mean.gradebook import Gradebook
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+kwargs = dict(cat_weight_dict={'hw': 3, 'quiz': 1},
+              cat_late_dict={'hw': {'penalty_per_day': .1}})
+
+
+@pytest.fixture
+def gradebook():
+    return Gradebook(str(test_folder / 'scope.csv'))
+
+
+class TestGradeResult:
+    def test_to_frame(self, gradebook):
+        result = gradebook.average_result(**kwargs)
+        df_exp = pd.concat((gradebook.df_meta, gradebook.average(**kwargs),
+                            gradebook.df_perc), axis=1)
+        pd.testing.assert_frame_equal(df_exp, result.to_frame())
+        assert result.shape == df_exp.shape
+
+        # no copy of the components
+        assert result.df_perc is gradebook.df_perc
+
+    def test_select(self, gradebook):
+        result = gradebook.average_result(**kwargs)
+        df = result.to_frame(columns='letter, meta, hw1')
+        assert list(df.columns) == ['letter', 'firstname', 'lastname', 'sid',
+                                    'section_name', 'hw1']
+
+        with pytest.raises(KeyError, match='column not found'):
+            result.select(['not a column'])
+
+    def test_to_csv_blocks(self, gradebook, tmp_path):
+        result = gradebook.average_result(**kwargs)
+        f_exp = tmp_path / 'exp.csv'
+        f = tmp_path / 'grade_full.csv'
+        result.to_frame().to_csv(f_exp)
+        result.to_csv(f, chunksize=2)
+        assert f.read_text() == f_exp.read_text()
+
+    @pytest.mark.parametrize('fmt', ['parquet', 'feather'])
+    def test_to_columnar_blocks(self, gradebook, tmp_path, fmt):
+        pytest.importorskip('pyarrow')
+        result = gradebook.average_result(**kwargs)
+        f = tmp_path / f'grade_full.{fmt}'
+        result.write(f, chunksize=2)
+
+        df_exp = result.to_frame().reset_index()
+        pd.testing.assert_frame_equal(df_exp, read_grade(f),
+                                      check_dtype=False)
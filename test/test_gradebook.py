@@ -48,6 +48,62 @@ class TestGradebook:
         np.testing.assert_allclose([1, 1, 1, 1, 1], gradebook.df_perc['hw2'])
         np.testing.assert_allclose([1, 0, 0, .5, .5], gradebook.df_perc['hw1'])
 
+    def test_substitute_nan(self, gradebook):
+        """ nan is ignored unless every source is nan """
+        gradebook.waive({'last0@nu.edu': ['hw1', 'hw2'],
+                         'last1@nu.edu': ['hw2']})
+        perc_exp = gradebook.df_perc.loc[:, ['hw1', 'hw2']].max(axis=1)
+        gradebook.substitute({'hw1': ['HW 2']})
+
+        pd.testing.assert_series_equal(gradebook.df_perc['hw1'], perc_exp,
+                                       check_names=False)
+        assert np.isnan(gradebook.df_perc.loc['last0@nu.edu', 'hw1'])
+
+    def test_substitute_exclude_source(self, gradebook):
+        sub_dict = {'hw2': ['hw3'],
+                    'hw1': ['hw1', 'hw2']}
+        gradebook.substitute(sub_dict, exclude_source=True)
+
+        # hw2 is a source, but also a target
+        assert gradebook.ass_list == ['hw1', 'hw2', 'quiz1']
+        np.testing.assert_allclose([1, 1, 1, 1, 1], gradebook.df_perc['hw2'])
+
+    def test_curve(self, gradebook):
+        """ waived percentages are ignored and stay waived """
+        gradebook.waive({'last0@nu.edu': ['hw1']})
+        gradebook.curve({'HW 1': {'mean': .5, 'raise_only': False},
+                         'hw2': {'percentile': 100}})
+
+        assert np.isnan(gradebook.df_perc.loc['last0@nu.edu', 'hw1'])
+        np.testing.assert_allclose(gradebook.df_perc['hw1'].iloc[1:], .5)
+        np.testing.assert_allclose([0, 0, 0, 1, 1], gradebook.df_perc['hw2'])
+        np.testing.assert_allclose(1, gradebook.df_perc['hw3'])
+
+    def test_assignment_stats(self, gradebook):
+        gradebook.waive({'last0@nu.edu': ['hw3'], 'last3@nu.edu': ['hw1']})
+        df_stats = gradebook.assignment_stats()
+
+        np.testing.assert_allclose(df_stats['complete'], [.2, .4, .8, 1])
+        np.testing.assert_allclose(df_stats['waived'], [.2, 0, .2, 0])
+        np.testing.assert_allclose(df_stats['mean'],
+                                   gradebook.df_perc.mean())
+        # late beyond 60 minute grace: hw1 of last1, last2 & last4
+        np.testing.assert_allclose(df_stats['late'], [.75, 0, 0, 0])
+
+        # discrimination, one assignment at a time
+        perc = gradebook.df_perc
+        for ass in ('hw1', 'hw2'):
+            other = perc.drop(columns=ass)
+            points = pd.DataFrame(np.broadcast_to(
+                gradebook.points[gradebook.df_perc.columns != ass],
+                other.shape), index=other.index, columns=other.columns)
+            points = points.where(other.notna())
+            rest = (other * points).sum(axis=1) / points.sum(axis=1)
+            assert np.isclose(df_stats.loc[ass, 'discrimination'],
+                              perc[ass].corr(rest))
+        # constant assignment
+        assert np.isnan(df_stats.loc['quiz1', 'discrimination'])
+
     def test_remove0(self, gradebook):
         ass = 'hw1'
         gradebook.remove(ass)
@@ -63,6 +119,85 @@ class TestGradebook:
 
         np.testing.assert_allclose([4], gradebook.points)
 
+    def test_late_penalty_per_assignment(self, gradebook):
+        # hw1 is 1 of the 6 points of hw, so late days cost 1/6 (not 1/3)
+        _, s_penalty = gradebook.get_late_penalty(
+            cat='hw', penalty_per_day=.1, excuse_day=1,
+            excuse_day_offset={'last4@nu.edu': -2}, per_assignment=True)
+        np.testing.assert_allclose([0, 0, -.1 / 6, -.2 / 6, -.4 / 6 - .1 / 3],
+                                   s_penalty)
+
+        # equal points: same as default
+        gradebook.points[:] = 1
+        gradebook._invalidate_partition()
+        kwargs = dict(cat='hw', penalty_per_day=.1, excuse_day=1)
+        pd.testing.assert_series_equal(
+            gradebook.get_late_penalty(**kwargs)[1],
+            gradebook.get_late_penalty(per_assignment=True, **kwargs)[1])
+
+    def test_late_penalty_policy(self, gradebook):
+        # only hw1 (1 of the 6 points of hw) is late, days: 0, 1, 2, 3, 4
+        gradebook.df_perc['hw1'] = 1.
+        kwargs = dict(cat='hw', penalty_per_day=.1, excuse_day=1)
+        _, s_penalty = gradebook.get_late_penalty(per_assignment=True,
+                                                  **kwargs)
+        _, s_penalty_policy, df_deduct = gradebook.get_late_penalty(
+            policy='linear', return_deduct=True, **kwargs)
+        np.testing.assert_allclose(df_deduct['hw1'] / 6, -s_penalty)
+
+        # deductions are per assignment, not in the category's penalty
+        assert (s_penalty_policy == 0).all()
+        _, _, df_deduct = gradebook.get_late_penalty(
+            cat='hw', penalty_per_day=.5, policy='decay', return_deduct=True)
+        np.testing.assert_allclose(df_deduct['hw1'],
+                                   [0, .5, .75, .875, .9375])
+
+        _, _, df_deduct = gradebook.get_late_penalty(
+            cat='hw', penalty_per_day=.1, policy='linear', cutoff_day=2,
+            return_deduct=True)
+        np.testing.assert_allclose(df_deduct['hw1'], [0, .1, .2, 1, 1])
+
+        df_ledger = gradebook.late_ledger(
+            cat='hw', penalty_per_day=.1, policy='linear', max_penalty=.25)
+        np.testing.assert_allclose(df_ledger['penalty'], [.1, .2, .25, .25])
+
+        # per assignment caps, other assignments uncapped
+        df_ledger = gradebook.late_ledger(
+            cat='hw', penalty_per_day=.1, policy='linear',
+            max_penalty={'hw1': .15, 'hw2': 0})
+        np.testing.assert_allclose(df_ledger['penalty'], [.1, .15, .15, .15])
+
+    def test_late_policy_drop(self, gradebook):
+        """ late deductions count before the lowest assignment is dropped """
+        # only hw1 is late (days: 0, 1, 2, 3, 4), past cutoff_day for last3/4
+        gradebook.df_perc.loc[:, ['hw1', 'hw2', 'hw3']] = 1.
+        cat_late_dict = {'hw': {'penalty_per_day': .1, 'policy': 'linear',
+                                'cutoff_day': 2}}
+        df_grade = gradebook.average(cat_weight_dict={'hw': 1, 'quiz': 1},
+                                     cat_late_dict=cat_late_dict)
+        np.testing.assert_allclose(df_grade['mean_hw'],
+                                   1 - np.array([0, .1, .2, 1, 1]) / 6)
+
+        # hw1, late or not, is dropped
+        df_grade = gradebook.average(cat_weight_dict={'hw': 1, 'quiz': 1},
+                                     cat_drop_dict={'hw': 1},
+                                     cat_late_dict=cat_late_dict)
+        np.testing.assert_allclose(df_grade['mean_hw'], 1)
+
+    def test_late_ledger(self, gradebook):
+        gradebook.df_late_minutes['hw3'] = 60 * 24 + 61
+        df_ledger = gradebook.late_ledger(
+            cat='hw', penalty_per_day=.1, excuse_day=1,
+            waive_dict={'last4@nu.edu': ['hw1']})
+
+        # excuse day goes to hw3 (3 points), not hw1 (1 point)
+        df = df_ledger.set_index(['email', 'assignment'])
+        assert len(df) == 3 + 5
+        assert (df.xs('hw3', level='assignment')['excused'] == 1).all()
+        assert (df.xs('hw1', level='assignment')['excused'] == 0).all()
+        np.testing.assert_allclose(df.loc[('last3@nu.edu', 'hw1'),
+                                          ['late_day', 'penalty']], [3, .3])
+
     def test_get_late_penalty(self, gradebook):
         # remember: students use [0, 1, 2, 3, 4] late days on 'hw1'
         _, s_penalty = gradebook.get_late_penalty(cat='hw1',
@@ -172,10 +307,43 @@ class TestGradebook:
         gradebook.remove_thresh(min_complete_thresh=0.5)
         assert 'hw1' not in gradebook.ass_list
 
+    def test_remove_many(self, gradebook, capsys):
+        # hw1 is 20% complete, hw2 40%, quiz1 explicitly removed
+        gradebook.remove_many(['quiz'], min_complete_thresh=.3)
+
+        assert gradebook.ass_list == ['hw2', 'hw3']
+        assert list(gradebook.df_perc.columns) == ['hw2', 'hw3']
+        assert list(gradebook.df_lateday.columns) == ['hw2', 'hw3']
+        np.testing.assert_allclose([2, 3], gradebook.points)
+
+        # report covers assignments remaining after explicit removal
+        out = capsys.readouterr().out
+        assert 'removed: 20% complete hw1' in out
+        assert 'quiz1' not in out
+
     def test_get_late_penalty_negative_raises(self, gradebook):
         with pytest.raises(AttributeError):
             gradebook.get_late_penalty(cat='hw1', penalty_per_day=-0.1)
 
+    def test_copy(self, gradebook):
+        gradebook_copy = gradebook.copy()
+        gradebook_copy.waive({'last0@nu.edu': ['hw1']})
+        gradebook_copy.remove('quiz1')
+
+        assert gradebook.df_perc.loc['last0@nu.edu', 'hw1'] == 1
+        assert gradebook.ass_list == ['hw1', 'hw2', 'hw3', 'quiz1']
+        assert len(gradebook.points) == 4
+
+    def test_waive_idx(self, gradebook):
+        gradebook_exp = Gradebook(str(test_folder / 'scope.csv'))
+        gradebook_exp.waive({'last0@nu.edu': ['hw1'],
+                             'last1@nu.edu': ['hw1', 'hw2']})
+
+        gradebook.waive_idx(np.array([0, 1, 1]), np.array([0, 0, 1]))
+        pd.testing.assert_frame_equal(gradebook.df_perc, gradebook_exp.df_perc)
+        pd.testing.assert_frame_equal(gradebook.df_lateday,
+                                      gradebook_exp.df_lateday)
+
     def test_waive_nonexistent_warns(self, gradebook):
         waive_dict = {'last0@nu.edu': ['nonexistent_hw']}
         with pytest.warns(UserWarning, match='waive-fail'):
@@ -194,6 +362,24 @@ class TestGradebook:
         gradebook.prune_email(email_list, ignore_suffix=True)
         assert gradebook.df_perc.shape[0] == 1
 
+    def test_prune_email_mapping(self, gradebook):
+        email_list = ['lst0@nu.edu', 'last1@nu.edu']
+        with pytest.warns(UserWarning, match='lst0@nu.edu: last0@nu.edu'):
+            gradebook.copy().prune_email(email_list)
+
+        gradebook.prune_email(email_list, mapping={'LST0@nu.edu':
+                                                       'last0@nu.edu'})
+        assert sorted(gradebook.df_perc.index) == ['last0@nu.edu',
+                                                   'last1@nu.edu']
+
+    def test_email_candidate(self, gradebook):
+        df = gradebook.email_candidate(['lst0@nu.edu', 'last1@nu.edu',
+                                        'first3@other.edu'])
+        df = df.loc[df['rank'] == 0, :]
+        assert dict(zip(df['left'], df['right'])) == \
+               {'lst0@nu.edu': 'last0@nu.edu',
+                'first3@other.edu': 'last3@nu.edu'}
+
     def test_prune_email_no_ignore_suffix(self, gradebook):
         email_list = ['last0@nu.edu', 'last1@nu.edu']
         gradebook.prune_email(email_list, ignore_suffix=False)
@@ -321,3 +507,31 @@ email_list: null
         # 1500 min = 25h grace → student1 (24h late) is forgiven
         # so student1 has 0 unexcused late days
         assert df_full.loc['last1@nu.edu', 'late days remain (hw)'] == 0
+
+    def test_explain(self, gradebook):
+        """ explain matches average for every student """
+        from gradescope_mean.config import Config
+
+        config = Config(cat_weight_dict={'hw': 1, 'quiz': 1},
+                        cat_drop_dict={'hw': 1},
+                        cat_late_dict={'hw': {'penalty_per_day': .1,
+                                              'excuse_day': 1}},
+                        late_waive_dict={'last4@nu.edu': 'hw1'})
+        result = config.process(gradebook)
+        df_grade = result.df_grade
+
+        for email in df_grade.index:
+            d = gradebook.explain(email, config)
+            np.testing.assert_allclose(d['mean'], df_grade.loc[email, 'mean'])
+            assert d['letter'] == df_grade.loc[email, 'letter']
+            df_cat = d['category']
+            for cat in ('hw', 'quiz'):
+                np.testing.assert_allclose(df_cat.loc[cat, 'mean'],
+                                           df_grade.loc[email, f'mean_{cat}'])
+            np.testing.assert_allclose(
+                df_cat.loc['hw', 'late_days_remain'],
+                df_grade.loc[email, 'late days remain (hw)'])
+
+        # hw1 and hw2 are 0% for last1, the larger (hw2) is dropped
+        d = gradebook.explain('LAST1@other.edu', config)
+        assert d['category'].loc['hw', 'drop'] == ['hw2']
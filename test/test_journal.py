@@ -0,0 +1,85 @@
+import json
+import pathlib
+import shutil
+
+import numpy as np
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.journal import *
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def f_scope(tmp_path):
+    f = tmp_path / 'scope.csv'
+    shutil.copy(test_folder / 'scope.csv', f)
+    return f
+
+
+def _run(config, f_scope, f_journal):
+    _, result = config(f_scope, as_result=True)
+    return update_journal(result, config, f_scope, f_journal)
+
+
+def _read(f_journal):
+    with open(f_journal) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestJournal:
+    def test_journal(self, f_scope, tmp_path):
+        f_journal = get_f_journal(tmp_path / 'grade_full.csv')
+        assert f_journal.name == 'grade_full.journal.jsonl'
+
+        # baseline: every cell (4 assignments, mean & letter) of 5 students
+        config = Config()
+        assert _run(config, f_scope, f_journal) == 30
+        assert get_f_journal_snapshot(f_journal).exists()
+
+        # unchanged run isn't journaled
+        assert _run(config, f_scope, f_journal) == 0
+        assert len(_read(f_journal)) == 1
+
+        # only changed cells, caused by config
+        config = Config(waive_dict={'last1@nu.edu': 'hw2'})
+        assert _run(config, f_scope, f_journal) == 3
+        entry = _read(f_journal)[-1]
+        assert entry['run'] == 1
+        assert entry['cause'] == ['config']
+        assert entry['change'] == {'last1@nu.edu': {
+            'hw2': [0, None], 'mean': [.7, .875], 'letter': ['C-', 'B+']}}
+
+    def test_diff_state(self, f_scope):
+        """ students / columns only in one state differ from None """
+        _, result = Config()(f_scope, as_result=True)
+        state = get_state(result)
+        _, result = Config(remove_list=['quiz'],
+                           email_list=['last0@nu.edu', 'last1@nu.edu'])(
+            f_scope, as_result=True)
+        change = diff_state(state, get_state(result))
+
+        assert change['last4@nu.edu']['hw1'] == [0, None]
+        assert change['last0@nu.edu']['quiz1'] == [1, None]
+        assert 'hw1' not in change['last0@nu.edu']
+
+    def test_history(self, f_scope, tmp_path):
+        f_journal = tmp_path / 'grade_full.journal.jsonl'
+        _run(Config(), f_scope, f_journal)
+        _run(Config(waive_dict={'last1@nu.edu': 'hw2'}), f_scope, f_journal)
+        _run(Config(grade_thresh={.8: 'A', 0: 'F'}), f_scope, f_journal)
+
+        df = student_history(f_journal, 'LAST1@other.edu')
+        assert list(df.index) == [0, 1, 2]
+        assert df['letter'].tolist() == ['C-', 'B+', 'F']
+        np.testing.assert_allclose(df['mean'], [.7, .875, .7])
+        assert df.loc[2, 'changed'] == 'hw2, mean, letter'
+
+        # unchanged students only have the baseline
+        df = student_history(f_journal, 'last3@nu.edu')
+        assert list(df.index) == [0, 2]
+
+        with pytest.raises(KeyError, match='not found'):
+            student_history(f_journal, 'ghost@nu.edu')
@@ -0,0 +1,98 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from gradescope_mean.late_ledger import *
+from gradescope_mean.late_policy import get_late_deduct
+
+
+def _best(late_day, weight, excuse_day):
+    """ points saved by the best allocation, by brute force """
+    best = 0
+    for excused in itertools.product(*(range(int(d) + 1) for d in late_day)):
+        if sum(excused) <= excuse_day:
+            best = max(best, np.dot(excused, weight))
+    return best
+
+
+class TestLateLedger:
+    def test_allocate_optimal(self):
+        rng = np.random.default_rng(0)
+        late_day = rng.integers(0, 3, size=(20, 4)).astype(float)
+        weight = np.array([1., 3., 3., 2.])
+        excuse_day = rng.integers(-1, 5, size=20)
+        excused = allocate_excuse(late_day, weight, excuse_day)
+
+        assert (excused <= late_day).all()
+        assert (excused.sum(axis=1) <= np.maximum(excuse_day, 0)).all()
+        for idx in range(20):
+            assert np.isclose(excused[idx] @ weight,
+                              _best(late_day[idx], weight, excuse_day[idx]))
+
+        # tied weights: earlier assignment first
+        excused = allocate_excuse([[1, 2, 2, 1]], weight, [3])
+        np.testing.assert_allclose(excused, [[0, 2, 1, 0]])
+
+    def test_allocate_deduct(self):
+        """ excuse days go where a (non additive) policy saves the most """
+        # heavy assignment has nothing to lose, light one does
+        perc = np.array([[0, 1]])
+
+        def deduct(unexcused, row):
+            return get_late_deduct(perc[row], unexcused, .5)
+
+        excused = allocate_excuse([[1, 1]], [3, 1], [1], deduct=deduct)
+        np.testing.assert_allclose(excused, [[0, 1]])
+
+    def test_allocate_deduct_optimal(self):
+        rng = np.random.default_rng(0)
+        n_student = 30
+        late_day = rng.integers(0, 4, size=(n_student, 4)).astype(float)
+        late_day[rng.random(late_day.shape) < .1] = np.nan
+        perc = rng.choice([0, .3, .8, 1], size=late_day.shape)
+        weight = np.array([1., 3., 3., 2.])
+        excuse_day = rng.integers(-1, 6, size=n_student)
+        for kwargs in ({'policy': 'linear', 'cutoff_day': 1},
+                       {'policy': 'decay', 'max_penalty': .6},
+                       {'policy': 'linear', 'cutoff_day': 2,
+                        'max_penalty': np.array([1, .2, 1, .5])}):
+            def deduct(unexcused, row=slice(None)):
+                return get_late_deduct(perc[row], unexcused, .3, **kwargs)
+
+            excused = allocate_excuse(late_day, weight, excuse_day,
+                                      deduct=deduct)
+            late = np.nan_to_num(late_day)
+            assert (excused <= late).all()
+            assert (excused.sum(axis=1) <= np.maximum(excuse_day, 0)).all()
+            saved = weight * (deduct(late) - deduct(late - excused))
+
+            for idx in range(n_student):
+                def _deduct(unexcused):
+                    return deduct(unexcused[None, :], row=[idx])[0]
+
+                best = 0
+                for _excused in itertools.product(
+                        *(range(int(d) + 1) for d in late[idx])):
+                    if sum(_excused) <= excuse_day[idx]:
+                        best = max(best, weight @ (
+                            _deduct(late[idx]) -
+                            _deduct(late[idx] - np.array(_excused))))
+                assert np.isclose(saved[idx].sum(), best)
+
+    def test_waived(self):
+        """ waived (nan) late days are never excused """
+        excused = allocate_excuse([[np.nan, 1]], [5, 1], [2])
+        np.testing.assert_allclose(excused, [[0, 1]])
+
+    def test_ledger_frame(self):
+        df_late = pd.DataFrame([[0, 2], [np.nan, 1]], index=['a', 'b'],
+                               columns=['hw1', 'hw2'])
+        excused = np.array([[0, 1], [0, 0]])
+        df_ledger = ledger_frame(df_late, excused, penalty_per_day=.1,
+                                 cat='hw')
+
+        assert list(df_ledger.columns) == LEDGER_COL_LIST
+        assert df_ledger['email'].tolist() == ['a', 'b']
+        np.testing.assert_allclose(df_ledger['unexcused'], [1, 1])
+        np.testing.assert_allclose(df_ledger['penalty'], [.1, .1])
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from gradescope_mean.late_policy import *
+
+
+class TestLatePolicy:
+    perc = np.array([[1, .5, np.nan],
+                     [.8, 1, 1]])
+    late_day = np.array([[0, 1, 2],
+                         [3, 2, 1]])
+
+    def test_linear(self):
+        deduct = get_late_deduct(self.perc, self.late_day, .2)
+        np.testing.assert_allclose(deduct, [[0, .2, 0],
+                                            [.6, .4, .2]])
+
+    def test_decay(self):
+        deduct = get_late_deduct(self.perc, self.late_day, .5, policy='decay')
+        np.testing.assert_allclose(deduct, [[0, .25, 0],
+                                            [.7, .75, .5]])
+
+    def test_max_penalty(self):
+        deduct = get_late_deduct(self.perc, self.late_day, .2,
+                                 max_penalty=.3)
+        np.testing.assert_allclose(deduct, [[0, .2, 0],
+                                            [.3, .3, .2]])
+
+    def test_max_penalty_per_assignment(self):
+        deduct = get_late_deduct(self.perc, self.late_day, .2,
+                                 max_penalty=np.array([.3, np.inf, .1]))
+        np.testing.assert_allclose(deduct, [[0, .2, 0],
+                                            [.3, .4, .1]])
+
+    def test_cutoff_day(self):
+        deduct = get_late_deduct(self.perc, self.late_day, .1, cutoff_day=1,
+                                 max_penalty=.1)
+        np.testing.assert_allclose(deduct, [[0, .1, 0],
+                                            [.8, 1, .1]])
+
+    def test_never_below_zero(self):
+        deduct = get_late_deduct(self.perc, self.late_day, .5)
+        np.testing.assert_allclose(deduct, [[0, .5, 0],
+                                            [.8, 1, .5]])
+
+    def test_check_late_policy(self):
+        check_late_policy({'penalty_per_day': .1, 'policy': 'linear',
+                           'max_penalty': .5, 'cutoff_day': 3})
+        check_late_policy({'penalty_per_day': .1})
+
+        with pytest.raises(ValueError, match='between 0 and 1'):
+            check_late_policy({'penalty_per_day': 2, 'policy': 'decay'})
+        with pytest.raises(ValueError, match='max_penalty'):
+            check_late_policy({'penalty_per_day': .1, 'policy': 'linear',
+                               'max_penalty': 1.5})
+        check_late_policy({'penalty_per_day': .1, 'policy': 'linear',
+                           'max_penalty': {'hw1': .5}})
+        with pytest.raises(ValueError, match='max_penalty'):
+            check_late_policy({'penalty_per_day': .1, 'policy': 'linear',
+                               'max_penalty': {'hw1': 2}})
@@ -0,0 +1,83 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.gradebook import Gradebook
+from gradescope_mean.long_format import *
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def gradebook():
+    return Gradebook(str(test_folder / 'scope.csv'))
+
+
+class TestLongFormat:
+    def test_to_long(self, gradebook):
+        df_long = gradebook.to_long()
+        assert list(df_long.columns) == LONG_COL_LIST
+        assert df_long.shape[0] == 5 * 4
+
+        row = df_long.iloc[5]
+        assert (row['student'], row['assignment']) == ('last0@nu.edu', 'hw2')
+        assert row['late_minutes'] == 59
+        assert row['max_pts'] == 2
+
+    def test_from_long(self, gradebook):
+        gradebook.waive({'last0@nu.edu': ['hw1']})
+        _gradebook = Gradebook.from_long(gradebook.to_long(),
+                                         df_meta=gradebook.df_meta)
+
+        pd.testing.assert_frame_equal(gradebook.df_perc, _gradebook.df_perc)
+        pd.testing.assert_frame_equal(gradebook.df_meta, _gradebook.df_meta)
+        pd.testing.assert_frame_equal(gradebook.df_late_minutes,
+                                      _gradebook.df_late_minutes)
+        assert np.isnan(_gradebook.df_lateday.loc['last0@nu.edu', 'hw1'])
+        assert gradebook.ass_list == _gradebook.ass_list
+        np.testing.assert_allclose(gradebook.points, _gradebook.points)
+
+        pd.testing.assert_frame_equal(gradebook.average(),
+                                      _gradebook.average())
+
+    def test_from_long_missing_row(self, gradebook):
+        # no row for a student-assignment pair earns 0 (not waived)
+        df_long = gradebook.to_long().iloc[1:]
+        _gradebook = Gradebook.from_long(df_long)
+        assert _gradebook.df_perc.loc['last0@nu.edu', 'hw1'] == 0
+
+    def test_write_read(self, gradebook, tmp_path):
+        pytest.importorskip('pyarrow')
+        folder = tmp_path / 'long'
+        write_long(gradebook.to_long(), folder, df_meta=gradebook.df_meta)
+        df_long, df_meta = read_long(folder)
+
+        _gradebook = Gradebook.from_long(df_long, df_meta=df_meta)
+        pd.testing.assert_frame_equal(gradebook.df_perc, _gradebook.df_perc)
+        pd.testing.assert_frame_equal(gradebook.df_meta, _gradebook.df_meta)
+
+    def test_append(self, gradebook, tmp_path):
+        pytest.importorskip('pyarrow')
+        folder = tmp_path / 'long'
+        df_long = gradebook.to_long()
+        is_quiz = df_long['assignment'] == 'quiz1'
+        write_long(df_long[~is_quiz], folder)
+
+        # add quiz1, then regrade it: only its rows are written
+        write_long(df_long[is_quiz], folder, append=True)
+        df_quiz = df_long[is_quiz].copy()
+        df_quiz['score'] = 2
+        f_part = write_long(df_quiz, folder, append=True)
+        assert f_part.name == 'part-00002.parquet'
+
+        df_long_read, _ = read_long(folder)
+        assert df_long_read.shape[0] == df_long.shape[0]
+        is_quiz = df_long_read['assignment'] == 'quiz1'
+        assert (df_long_read.loc[is_quiz, 'score'] == 2).all()
+
+        # writing without append replaces every part
+        write_long(df_long, folder)
+        assert len(list(folder.glob('part-*.parquet'))) == 1
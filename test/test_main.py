@@ -1,6 +1,9 @@
+import json
 import pathlib
 import shutil
 
+import numpy as np
+import pandas as pd
 import pytest
 
 import gradescope_mean
@@ -50,6 +53,54 @@ class TestMainCLI:
         main(args)
         assert pathlib.Path(f_out).exists()
 
+    def test_memo(self, tmp_path):
+        """--memo stores stages, re-running gives the same output"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        memo_dir = tmp_path / 'memo'
+        args = parser.parse_args([
+            'grade', f_scope, '--config', f_config, '--memo', str(memo_dir),
+            '-q'])
+        main(args)
+        df_plain = pd.read_csv(tmp_path / 'grade_full.csv')
+        assert len(list(memo_dir.glob('*.pkl'))) == len(
+            gradescope_mean.pipeline.STAGE_LIST)
+
+        main(args)
+        df_memo = pd.read_csv(tmp_path / 'grade_full.csv')
+        pd.testing.assert_frame_equal(df_plain, df_memo)
+
+    def test_output_suffix(self, tmp_path):
+        """unknown -o suffixes are csv, a conflicting --format is rejected"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        main(parser.parse_args([
+            'grade', f_scope, '--config', f_config, '-o',
+            str(tmp_path / 'grades.txt'), '-q']))
+        assert pd.read_csv(tmp_path / 'grades.txt').shape[0] == 5
+
+        with pytest.raises(ValueError, match="doesn't match"):
+            main(parser.parse_args([
+                'grade', f_scope, '--config', f_config, '--format',
+                'parquet', '-o', str(tmp_path / 'x.csv'), '-q']))
+        assert not (tmp_path / 'x.csv').exists()
+
+    def test_format_columns(self, tmp_path):
+        """--format / --columns select output format and columns"""
+        pytest.importorskip('pyarrow')
+        f_scope, f_config = _copy_test_data(tmp_path)
+        args = parser.parse_args([
+            'grade', f_scope, '--config', f_config, '--format', 'parquet',
+            '--columns', 'meta,mean,letter', '-q'])
+        main(args)
+        df = gradescope_mean.read_grade(tmp_path / 'grade_full.parquet')
+        assert list(df.columns) == ['email', 'firstname', 'lastname', 'sid',
+                                    'section_name', 'mean', 'letter']
+
+        # downstream banner export reads parquet directly
+        args = parser.parse_args([
+            'banner', str(tmp_path / 'grade_full.parquet'), '202310', '-q'])
+        main(args)
+        assert len(list(tmp_path.glob('grade_full_banner_*.xlsx'))) == 1
+
     def test_per_student(self, tmp_path):
         """--per_student should create a per_student/ folder"""
         f_scope, f_config = _copy_test_data(tmp_path)
@@ -70,6 +121,24 @@ class TestMainCLI:
         main(args)
         assert (tmp_path / 'late.csv').exists()
 
+    def test_late_ledger(self, tmp_path):
+        """--late_ledger should list every late student-assignment pair"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        f_config = pathlib.Path(f_config)
+        text = f_config.read_text().replace(
+            'weight: null', 'weight:\n    hw: 1\n    quiz: 1', 1)
+        f_config.write_text(text.replace(
+            'late_penalty: null',
+            'late_penalty:\n    hw:\n      penalty_per_day: .1\n'
+            '      excuse_day: 1\n      per_assignment: true', 1))
+        main(parser.parse_args([
+            'grade', f_scope, '--late_ledger', 'ledger.csv', '-q']))
+
+        df_ledger = pd.read_csv(tmp_path / 'ledger.csv')
+        assert list(df_ledger.columns) == gradescope_mean.LEDGER_COL_LIST
+        assert len(df_ledger) == 4
+        assert df_ledger['excused'].sum() == 4
+
     def test_plot_default_name(self, tmp_path):
         """--plot without a filename should use hist.html"""
         f_scope, f_config = _copy_test_data(tmp_path)
@@ -87,6 +156,15 @@ class TestMainCLI:
         main(args)
         assert (tmp_path / 'my_hist.html').exists()
 
+    def test_plot_svg(self, tmp_path):
+        """--plot with a .svg filename should write a static svg"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        args = parser.parse_args([
+            'grade', f_scope, '--config', f_config, '--plot', 'hist.svg',
+            '-q'])
+        main(args)
+        assert (tmp_path / 'hist.svg').read_text().startswith('<svg')
+
     def test_resolve_config_existing(self, tmp_path):
         """Without --config, should pick up existing config.yaml"""
         f_scope, f_config = _copy_test_data(tmp_path)
@@ -113,3 +191,220 @@ class TestMainCLI:
         # should have the original config.yaml plus a new timestamped one
         configs = list(tmp_path.glob('config*.yaml'))
         assert len(configs) == 2
+
+    def test_timeline(self, tmp_path):
+        """timeline subcommand writes per-assignment submission stats"""
+        f_scope, _ = _copy_test_data(tmp_path)
+        args = parser.parse_args(['timeline', f_scope, '-q'])
+        main(args)
+        assert (tmp_path / 'timeline.csv').exists()
+
+    def test_canvas_many(self, tmp_path):
+        """canvas subcommand merges each of many canvas files"""
+        f_scope, _ = _copy_test_data(tmp_path)
+        main(parser.parse_args(['grade', f_scope, '-q']))
+
+        f_canvas_list = list()
+        for sec, sid in (('sec01', '0123456789S'), ('sec02', '0023456789S')):
+            f_canvas = tmp_path / f'canvas_{sec}.csv'
+            pd.DataFrame({'Student': ['Student, Test'], 'ID': [100],
+                          'SIS User ID': [sid], 'SIS Login ID': ['a@nu.edu'],
+                          'Section': [sec]}).to_csv(f_canvas, index=False)
+            f_canvas_list.append(str(f_canvas))
+
+        main(parser.parse_args(['canvas', str(tmp_path / 'grade_full.csv'),
+                                *f_canvas_list, '-q']))
+        for sec in ('sec01', 'sec02'):
+            assert len(list(tmp_path.glob(f'canvas_{sec}?*.csv'))) == 1
+        f_coverage, = tmp_path.glob('canvas_coverage*.csv')
+        assert len(pd.read_csv(f_coverage)) == 3
+
+    def test_canvas_mapping(self, tmp_path):
+        """canvas proposes matches of differing sids, reused via --mapping"""
+        f_scope, _ = _copy_test_data(tmp_path)
+        main(parser.parse_args(['grade', f_scope, '-q']))
+        f_grade = str(tmp_path / 'grade_full.csv')
+
+        f_canvas = tmp_path / 'canvas.csv'
+        pd.DataFrame({'Student': ['last0, first0'], 'ID': [100],
+                      'SIS User ID': ['0123456789X'],
+                      'SIS Login ID': ['last0@nu.edu'],
+                      'Section': ['sec01']}).to_csv(f_canvas, index=False)
+        main(parser.parse_args(['canvas', f_grade, str(f_canvas), '-q']))
+        f_mapping, = tmp_path.glob('canvas_mapping*.csv')
+        assert gradescope_mean.load_mapping(f_mapping) == \
+               {'0123456789X': '0123456789S'}
+
+        f_mapping.rename(tmp_path / 'mapping.csv')
+        main(parser.parse_args(['canvas', f_grade, str(f_canvas), '--mapping',
+                                str(tmp_path / 'mapping.csv'), '-q']))
+        assert not list(tmp_path.glob('canvas_mapping*.csv'))
+        f_canvas_out, = tmp_path.glob('canvas?*.csv')
+        assert pd.read_csv(f_canvas_out)['mean'].notna().all()
+
+    def test_diff(self, tmp_path, capsys):
+        """diff outputs only students whose letter changes"""
+        f_scope, _ = _copy_test_data(tmp_path)
+        f_config_list = list()
+        for name, weight in (('a.yaml', 60), ('b.yaml', 50)):
+            f_config = tmp_path / name
+            f_config.write_text(f'category:\n  weight:\n    hw: {weight}\n'
+                                f'    quiz: {100 - weight}\n')
+            f_config_list += ['--config', str(f_config)]
+
+        f_diff = tmp_path / 'diff.csv'
+        main(parser.parse_args(['diff', f_scope, *f_config_list, '-o',
+                                str(f_diff), '-q']))
+        assert 'b.yaml' in capsys.readouterr().out
+        df = pd.read_csv(f_diff, header=[0, 1], index_col=0)
+        assert len(df) == 5
+        assert (df[('a.yaml', 'letter')] != df[('b.yaml', 'letter')]).all()
+
+    def test_project(self, tmp_path):
+        """project writes letter probabilities per student"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        with open(f_config, 'w') as f:
+            f.write('category:\n  weight:\n    hw: 60\n    quiz: 40\n')
+        main(parser.parse_args(['project', f_scope, '--remaining', 'hw=2',
+                                '--ungraded', 'quiz1', '--n_sample', '100',
+                                '--seed', '0', '-q']))
+        df = pd.read_csv(tmp_path / 'project.csv', index_col='email')
+        assert len(df) == 5
+        np.testing.assert_allclose(
+            df.drop(columns=['mean', 'letter']).sum(axis=1), 1)
+
+        # exam has nothing graded yet, sampled from its prior
+        with open(f_config, 'a') as f:
+            f.write('    exam: 100\n')
+        main(parser.parse_args(['project', f_scope, '--remaining', 'exam=1',
+                                '--prior', 'exam=0', '--n_sample', '10',
+                                '-q']))
+        df_exam = pd.read_csv(tmp_path / 'project.csv', index_col='email')
+        assert (df_exam['mean'] < df['mean']).all()
+
+    def test_bind_error(self, tmp_path, capsys):
+        """contradictory config exits with its messages, no traceback"""
+        f_scope, _ = _copy_test_data(tmp_path)
+        f_config = tmp_path / 'bad.yaml'
+        f_config.write_text('category:\n  weight:\n    hw: 1\n'
+                            '  drop_low:\n    lab: 1\n')
+        for cmd in (['grade', f_scope], ['explain', f_scope, 'last0'],
+                    ['project', f_scope], ['diff', f_scope, '--config',
+                                           str(f_config)]):
+            with pytest.raises(SystemExit) as exc_info:
+                main(parser.parse_args([*cmd, '--config', str(f_config),
+                                        '-q']))
+            assert exc_info.value.code == 1
+            assert 'drop_low: category "lab" has no weight' in \
+                   capsys.readouterr().err
+
+    def test_report(self, tmp_path):
+        """report subcommand writes one row per section"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        main(parser.parse_args(['report', f_scope, '--by', 'sections',
+                                '-q']))
+        df = pd.read_csv(tmp_path / 'report.csv', index_col=0)
+        assert df['n_student'].tolist() == [5]
+
+        with pytest.raises(SystemExit):
+            main(parser.parse_args(['report', f_scope, '--by', 'crn', '-q']))
+
+    def test_stats(self, tmp_path):
+        """stats subcommand writes one row per assignment"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        main(parser.parse_args(['stats', f_scope, '-q']))
+        df = pd.read_csv(tmp_path / 'stats.csv', index_col='assignment')
+        assert list(df.index) == ['hw1', 'hw2', 'hw3', 'quiz1']
+        assert 'discrimination' in df.columns
+
+    def test_history(self, tmp_path, capsys, monkeypatch):
+        """grade journals changed cells, history replays one student"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        main(parser.parse_args(['grade', f_scope, '-q']))
+        f_config = pathlib.Path(f_config)
+        f_config.write_text(f_config.read_text().replace(
+            'waive: null', 'waive:\n  last1@nu.edu: hw2', 1))
+        main(parser.parse_args(['grade', f_scope, '-q']))
+        f_journal = tmp_path / 'grade_full.journal.jsonl'
+        assert len(f_journal.read_text().splitlines()) == 2
+
+        # journal is found from the csv, wherever history is run from
+        monkeypatch.chdir(test_folder)
+        capsys.readouterr()
+        main(parser.parse_args(['history', f_scope, 'last1@nu.edu',
+                                '--columns', 'mean,letter', '-q']))
+        out = capsys.readouterr().out
+        assert 'baseline' in out and 'config' in out
+
+        # --no-journal leaves the journal alone
+        main(parser.parse_args(['grade', f_scope, '--no-journal', '-q',
+                                '-o', str(tmp_path / 'other.csv')]))
+        assert not (tmp_path / 'other.journal.jsonl').exists()
+
+    def test_history_cause(self, tmp_path):
+        """a config change which changes no cell isn't blamed later"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        main(parser.parse_args(['grade', f_scope, '-q']))
+        f_config = pathlib.Path(f_config)
+        f_config.write_text(f_config.read_text().replace(
+            'exclude_complete_thresh: null', 'exclude_complete_thresh: 0', 1))
+        main(parser.parse_args(['grade', f_scope, '-q']))
+
+        df = pd.read_csv(f_scope)
+        df.loc[0, 'HW2'] = 2
+        df.to_csv(f_scope, index=False)
+        main(parser.parse_args(['grade', f_scope, '-q', '-o',
+                                str(tmp_path / 'grade_full.csv')]))
+
+        f_journal = tmp_path / 'grade_full.journal.jsonl'
+        entry_list = [json.loads(line)
+                      for line in f_journal.read_text().splitlines()]
+        assert [e['cause'] for e in entry_list] == [['baseline'], ['scope']]
+        assert main(parser.parse_args(
+            ['history', f_scope, 'last0', '-g',
+             str(tmp_path / 'grade_full.csv'), '-q'])) is None
+
+    def test_reconcile(self, tmp_path):
+        """reconcile writes email_mapping.csv, used by grade via config"""
+        f_scope, f_config = _copy_test_data(tmp_path)
+        with open(f_config, 'w') as f:
+            f.write('email_list:\n  - lst0@nu.edu\n  - last1@nu.edu\n')
+        main(parser.parse_args(['reconcile', f_scope, '-q']))
+        f_mapping = tmp_path / 'email_mapping.csv'
+        assert gradescope_mean.load_mapping(f_mapping) == \
+               {'lst0@nu.edu': 'last0@nu.edu'}
+
+        with open(f_config, 'a') as f:
+            f.write('\nemail_mapping: email_mapping.csv\n')
+        main(parser.parse_args(['grade', f_scope, '-q']))
+        df = pd.read_csv(tmp_path / 'grade_full.csv')
+        assert sorted(df['email']) == ['last0@nu.edu', 'last1@nu.edu']
+
+    def test_explain(self, tmp_path, capsys):
+        """explain prints one student's breakdown, snapshot reused after"""
+        f_scope, _ = _copy_test_data(tmp_path)
+        main(parser.parse_args(['grade', f_scope, '-q']))
+        assert not (tmp_path / '.scope.csv.snapshot').exists()
+        capsys.readouterr()
+
+        for _ in range(2):
+            main(parser.parse_args(['explain', f_scope, 'last0@nu.edu',
+                                    '-q']))
+            out = capsys.readouterr().out
+            assert 'last0@nu.edu (' in out
+            assert 'letter: B-' in out
+            assert (tmp_path / '.scope.csv.snapshot').exists()
+
+    def test_store(self, tmp_path):
+        """store subcommand imports grades and queries them"""
+        f_scope, _ = _copy_test_data(tmp_path)
+        f_db = str(tmp_path / 'grade.db')
+        main(parser.parse_args(['store', 'import', f_scope, '--db', f_db,
+                                '--course', 'cs2810', '--term', '2022',
+                                '-q']))
+
+        f_output = tmp_path / 'history.csv'
+        main(parser.parse_args(['store', 'query', '--db', f_db, '--email',
+                                'last0@nu.edu', '-o', str(f_output), '-q']))
+        df = pd.read_csv(f_output)
+        assert df['course'].tolist() == ['cs2810']
@@ -0,0 +1,91 @@
+import copy
+import pathlib
+
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.curve import check_curve
+from gradescope_mean.pipeline import *
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+f_scope = str(test_folder / 'scope.csv')
+
+
+@pytest.fixture
+def config():
+    return Config(cat_weight_dict={'hw': 60, 'quiz': 40},
+                  cat_drop_dict={'hw': 1},
+                  cat_late_dict={'hw': {'penalty_per_day': .1,
+                                        'excuse_day': 1}},
+                  sub_dict={'hw2': ['hw3']},
+                  waive_dict={'last1@nu.edu': 'hw1'},
+                  email_list=['last0@nu.edu', 'last1@nu.edu', 'last2@nu.edu'])
+
+
+class TestPipeline:
+    def test_run(self, config):
+        """ same as Config.__call__() """
+        gradebook_exp, df_grade_exp = config(f_scope)
+        gradebook, df_grade = config(f_scope, pipeline=Pipeline())
+        pd.testing.assert_frame_equal(df_grade, df_grade_exp)
+        pd.testing.assert_frame_equal(gradebook.df_perc,
+                                      gradebook_exp.df_perc)
+
+    def test_return_bound(self, config):
+        """ late ledger of the processed gradebook, with or without pipeline
+        """
+        gradebook_exp = gradescope_mean.Gradebook(f_scope)
+        df_ledger_exp = config.prepare(gradebook_exp).late_ledger(
+            gradebook_exp)
+        assert len(df_ledger_exp)
+
+        for pipeline in (None, Pipeline()):
+            gradebook, _, bound_config = config(
+                f_scope, pipeline=pipeline, return_bound=True)
+            pd.testing.assert_frame_equal(bound_config.late_ledger(gradebook),
+                                          df_ledger_exp)
+
+    def test_rerun(self, config):
+        pipeline = Pipeline()
+        config(f_scope, pipeline=pipeline)
+        config(f_scope, pipeline=pipeline)
+        assert set(pipeline.n_run.values()) == {1}
+
+        # only lettering
+        config = copy.deepcopy(config)
+        config.grade_thresh = {.9: 'A', 0: 'F'}
+        _, df_grade = config(f_scope, pipeline=pipeline)
+        assert set(df_grade['letter']) <= {'A', 'F'}
+        assert pipeline.n_run['average'] == 1
+        assert pipeline.n_run['letter'] == 2
+
+        # waive doesn't re-parse or re-prune
+        config.waive_dict = dict()
+        config(f_scope, pipeline=pipeline)
+        assert pipeline.n_run['prune'] == 1
+        assert pipeline.n_run['remove'] == 1
+        assert pipeline.n_run['waive'] == 2
+
+        # curve doesn't re-waive
+        config.curve_dict = {'quiz1': check_curve({'mean': .5})}
+        config(f_scope, pipeline=pipeline)
+        assert pipeline.n_run['waive'] == 2
+        assert pipeline.n_run['curve'] == 3
+
+    def test_immutable(self, config):
+        """ modifying output doesn't modify memoized stages """
+        pipeline = Pipeline()
+        gradebook, df_grade = config(f_scope, pipeline=pipeline)
+        gradebook.df_perc.iloc[:, :] = 0
+        _, df_grade2 = config(f_scope, pipeline=pipeline)
+        pd.testing.assert_frame_equal(df_grade, df_grade2)
+
+    def test_folder(self, config, tmp_path):
+        """ a new pipeline reuses stages pickled by another """
+        _, df_grade_exp = config(f_scope, pipeline=Pipeline(folder=tmp_path))
+        pipeline = Pipeline(folder=tmp_path)
+        _, df_grade = config(f_scope, pipeline=pipeline)
+        pd.testing.assert_frame_equal(df_grade, df_grade_exp)
+        assert set(pipeline.n_run.values()) == {0}
@@ -5,6 +5,7 @@ import pytest
 import gradescope_mean
 from gradescope_mean.config import Config
 from gradescope_mean.plot import plot_hist
+from gradescope_mean.plot_svg import hist_counts, plot_hist_svg
 
 test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
 
@@ -32,3 +33,47 @@ class TestPlot:
         gradebook, df_grade_full = config(f_scope=test_folder / 'scope.csv')
         fig = plot_hist(df_grade_full=df_grade_full, cat_weight_dict=None)
         assert fig is not None
+
+    def test_plot_hist_binned(self, grade_data):
+        gradebook, df_grade_full, cat_weight_dict = grade_data
+        fig = plot_hist(df_grade_full=df_grade_full,
+                        cat_weight_dict=cat_weight_dict,
+                        binned=True)
+        # one bar trace per feature, holding counts (not raw grades)
+        assert len(fig.data) == 3
+        assert sum(fig.data[0].x) == df_grade_full.shape[0]
+        assert '>1' in fig.layout.yaxis.ticktext
+
+    def test_hist_counts(self, grade_data):
+        gradebook, df_grade_full, cat_weight_dict = grade_data
+        bin_edge, count_dict, mean_dict = hist_counts(df_grade_full,
+                                                      ['mean_quiz'])
+        assert bin_edge[0] == .5 and bin_edge[-1] == 1
+        # all students earn 100% on quiz, top bin includes 1
+        assert count_dict['mean_quiz'][-2] == 5
+        assert count_dict['mean_quiz'][-1] == 0
+        assert mean_dict['mean_quiz'] == pytest.approx(1)
+
+    def test_hist_counts_out_of_range(self, grade_data):
+        """ grades outside the bins are counted in underflow / overflow """
+        gradebook, df_grade_full, cat_weight_dict = grade_data
+        df_grade_full['mean'] = [0, .3, .5, 1, 1.2]
+        bin_edge, count_dict, _ = hist_counts(df_grade_full, ['mean'])
+        count = count_dict['mean']
+        assert count.size == bin_edge.size + 1
+        assert count.sum() == 5
+        # underflow, first bin, last bin (includes 1), overflow
+        assert count[0] == 2
+        assert count[1] == 1
+        assert count[-2] == 1
+        assert count[-1] == 1
+
+        svg = plot_hist_svg(df_grade_full, cat_weight_dict=None)
+        assert '&lt;0.5' in svg and '&gt;1' in svg
+
+    def test_plot_hist_svg(self, grade_data):
+        gradebook, df_grade_full, cat_weight_dict = grade_data
+        svg = plot_hist_svg(df_grade_full=df_grade_full,
+                            cat_weight_dict=cat_weight_dict)
+        assert svg.startswith('<svg')
+        assert 'mean_hw' in svg
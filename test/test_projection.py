@@ -0,0 +1,107 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.gradebook import Gradebook
+from gradescope_mean.projection import *
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def config():
+    return Config(cat_weight_dict={'hw': 60, 'quiz': 40},
+                  cat_drop_dict={'hw': 1},
+                  cat_late_dict={'hw': {'penalty_per_day': .1,
+                                        'excuse_day': 1}})
+
+
+@pytest.fixture
+def gradebook():
+    return Gradebook(str(test_folder / 'scope.csv'))
+
+
+class TestProjection:
+    def test_nothing_remaining(self, gradebook, config):
+        """ without assignments to come, projection is the grade """
+        bound_config = config.prepare(gradebook)
+        df_grade = bound_config.average(gradebook.copy()).df_grade
+        df_project = project(gradebook, bound_config, n_sample=10)
+
+        np.testing.assert_allclose(df_project['mean'], df_grade['mean'])
+        assert (df_project['letter'] == df_grade['letter']).all()
+        assert (df_project.max(axis=1, numeric_only=True) == 1).all()
+
+    def test_nothing_remaining_policy(self, gradebook):
+        """ late deductions before dropping, as Gradebook.average() """
+        config = Config(cat_weight_dict={'hw': 60, 'quiz': 40},
+                        cat_drop_dict={'hw': 1},
+                        cat_late_dict={'hw': {'penalty_per_day': .5,
+                                              'policy': 'decay',
+                                              'cutoff_day': 2}})
+        gradebook.df_perc['hw1'] = 1.
+        bound_config = config.prepare(gradebook)
+        df_grade = bound_config.average(gradebook.copy()).df_grade
+        df_project = project(gradebook, bound_config, n_sample=10)
+
+        np.testing.assert_allclose(df_project['mean'], df_grade['mean'])
+
+    @pytest.mark.parametrize('source', SOURCE_LIST)
+    def test_remaining(self, gradebook, config, source):
+        bound_config = config.prepare(gradebook)
+        df_project = project(gradebook, bound_config,
+                             remaining={'hw': 2, 'quiz': [4]},
+                             ungraded=['hw3'], n_sample=500, source=source,
+                             seed=0)
+        df_prob = df_project.drop(columns=['mean', 'letter'])
+        np.testing.assert_allclose(df_prob.sum(axis=1), 1)
+        assert (df_prob.max(axis=1) < 1).any()
+
+        # chunks of one student give the same distribution
+        df_chunk = project(gradebook, bound_config,
+                           remaining={'hw': 2, 'quiz': [4]},
+                           ungraded=['hw3'], n_sample=500, source=source,
+                           seed=0, max_bytes=1)
+        np.testing.assert_allclose(df_chunk['mean'], df_project['mean'],
+                                   atol=.05)
+
+    def test_student_source(self, gradebook):
+        """ each student's own scores are sampled """
+        bound_config = Config().prepare(gradebook)
+        df_project = project(gradebook, bound_config, ungraded=['quiz1'],
+                             n_sample=50, seed=0)
+        # last0 has more full marks (hw1, hw3) than last1 (hw3)
+        assert df_project.loc['last0@nu.edu', 'mean'] < 1
+        assert df_project.loc['last1@nu.edu', 'mean'] < \
+               df_project.loc['last0@nu.edu', 'mean']
+
+    def test_bad_remaining(self, gradebook, config):
+        bound_config = config.prepare(gradebook)
+        with pytest.raises(ValueError):
+            project(gradebook, bound_config, remaining={'exam': 1})
+        with pytest.raises(ValueError):
+            project(gradebook, bound_config, prior={'exam': [.5]})
+
+    def test_empty_category(self, gradebook):
+        """ a weighted category with nothing graded samples its prior """
+        config = Config(cat_weight_dict={'hw': 40, 'quiz': 40, 'exam': 20})
+        with pytest.warns(UserWarning, match='exam'):
+            bound_config = config.prepare(gradebook)
+        df_grade = bound_config.average(gradebook.copy()).df_grade
+
+        df_project = project(gradebook, bound_config, remaining={'exam': 1},
+                             prior={'exam': [0]}, n_sample=10)
+        np.testing.assert_allclose(df_project['mean'],
+                                   df_grade['mean'] * .8)
+
+        # default: every graded percentage of the class
+        df_project = project(gradebook, bound_config, remaining={'exam': 1},
+                             n_sample=200, seed=0)
+        pool = gradebook.df_perc.to_numpy().ravel()
+        np.testing.assert_allclose(
+            df_project['mean'], df_grade['mean'] * .8 + np.nanmean(pool) * .2,
+            atol=.05)
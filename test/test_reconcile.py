@@ -0,0 +1,55 @@
+import pandas as pd
+
+from gradescope_mean.reconcile import *
+
+
+class TestReconcile:
+    def test_key(self):
+        assert email_key('John.Smith-2@uni.edu') == 'johnsmith2'
+        assert name_key('Smith, John') == name_key('john smith')
+
+    def test_index(self):
+        index = NgramIndex(['johnsmith', 'janedoe', 'jsmith'])
+        idx_list, _ = index.candidate('jsmith')
+        assert idx_list[0] == 2
+        assert 1 not in idx_list
+
+        # grams in too many keys aren't blocked on
+        index = NgramIndex(['aaa0', 'aaa1', 'aaa2'], max_posting=2)
+        idx_list, _ = index.candidate('aaa9')
+        assert idx_list == []
+
+    def test_reconcile(self):
+        df = reconcile(email_left=['jsmith@uni.edu', 'zzz@uni.edu'],
+                       email_right=['jane.doe@other.edu',
+                                    'john.smith@other.edu'])
+        assert df['left'].tolist() == ['jsmith@uni.edu']
+        assert df['right'].tolist() == ['john.smith@other.edu']
+        assert df['rank'].tolist() == [0]
+
+    def test_reconcile_name(self):
+        """ a new email still matches by name """
+        df = reconcile(email_left=['x123@uni.edu'],
+                       email_right=['a@uni.edu', 'b@uni.edu'],
+                       name_left=['Doe, Jane'],
+                       name_right=['john smith', 'jane doe'],
+                       id_left=['sid0'], id_right=['sid1', 'sid2'])
+        assert df.loc[0, 'left'] == 'sid0'
+        assert df.loc[0, 'right'] == 'sid2'
+        assert df.loc[0, 'score'] == 1
+
+    def test_match_best(self):
+        df_candidate = pd.DataFrame({'left': ['a', 'a', 'b'],
+                                     'right': ['x', 'y', 'x'],
+                                     'score': [.9, .5, .8],
+                                     'rank': [0, 1, 0]})
+        df_mapping = match_best(df_candidate)
+        assert dict(zip(df_mapping['left'], df_mapping['right'])) == \
+               {'a': 'x'}
+
+    def test_mapping_file(self, tmp_path):
+        f_mapping = tmp_path / 'mapping.csv'
+        df_mapping = pd.DataFrame({'left': ['0012S'], 'right': ['12S'],
+                                   'score': [.7]})
+        save_mapping(df_mapping, f_mapping)
+        assert load_mapping(f_mapping) == {'0012S': '12S'}
@@ -0,0 +1,63 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.report import *
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def gradebook_grade():
+    config = Config(cat_weight_dict={'hw': 1, 'quiz': 1},
+                    cat_late_dict={'hw': {'penalty_per_day': .1}},
+                    waive_dict={'last0@nu.edu': 'hw1'})
+    gradebook, result = config(test_folder / 'scope.csv', as_result=True)
+    gradebook.df_meta['section_name'] = ['sec02', 'sec01', 'sec02', 'sec01',
+                                         'sec02']
+    return gradebook, result.df_grade
+
+
+class TestReport:
+    def test_group_mean(self):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=(100, 3))
+        x[rng.uniform(size=x.shape) < .2] = np.nan
+        codes = rng.integers(0, 7, size=100)
+
+        mean, count = group_mean(codes, x, n_group=8)
+        df = pd.DataFrame(x).groupby(codes)
+        np.testing.assert_allclose(mean[:7], df.mean())
+        np.testing.assert_array_equal(count[:7], df.count())
+        assert np.isnan(mean[7]).all()
+
+    def test_get_meta_col(self, gradebook_grade):
+        gradebook, _ = gradebook_grade
+        assert get_meta_col(gradebook.df_meta, 'sections') == 'section_name'
+        assert get_meta_col(gradebook.df_meta, 'lastname') == 'lastname'
+        with pytest.raises(ValueError, match='no metadata column'):
+            get_meta_col(gradebook.df_meta, 'crn')
+
+    def test_report_by(self, gradebook_grade):
+        gradebook, df_grade = gradebook_grade
+        df_report = report_by(gradebook, df_grade)
+
+        assert list(df_report.index) == ['sec01', 'sec02']
+        np.testing.assert_array_equal(df_report['n_student'], [2, 3])
+        section = gradebook.df_meta['section_name']
+        pd.testing.assert_series_equal(
+            df_report['mean'], df_grade['mean'].groupby(section).mean(),
+            check_names=False)
+        assert (df_report.filter(regex='^n_').iloc[:, 1:].sum(axis=1) ==
+                df_report['n_student']).all()
+        assert 'late days remain (hw)' in df_report.columns
+
+        # waived hw1 of last0 (sec02) doesn't count against completion
+        np.testing.assert_allclose(df_report['complete (hw1)'], [0, 0])
+        np.testing.assert_allclose(df_report['complete (hw2)'], [.5, 1 / 3])
+        np.testing.assert_allclose(df_report.loc['sec02', 'complete'],
+                                   np.mean([2 / 3, 1 / 2, 3 / 4]))
@@ -0,0 +1,175 @@
+import json
+import pathlib
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.serve import CourseCache, make_server
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def f_scope(tmp_path):
+    f = tmp_path / 'scope.csv'
+    shutil.copy(test_folder / 'scope.csv', f)
+    return f
+
+
+@pytest.fixture
+def url():
+    server = make_server(port=0, max_course=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f'http://{host}:{port}'
+    server.shutdown()
+    server.server_close()
+
+
+def request(url, path, param=None, post=None):
+    """ returns (status, body), body is parsed if json """
+    if param is not None:
+        path = f'{path}?{urlencode(param)}'
+    data = None if post is None else json.dumps(post).encode()
+    try:
+        with urllib.request.urlopen(url + path, data=data) as response:
+            status, body = response.status, response.read()
+            content_type = response.headers['Content-Type']
+    except urllib.error.HTTPError as e:
+        status, body = e.code, e.read()
+        content_type = e.headers['Content-Type']
+    if content_type == 'application/json':
+        body = json.loads(body)
+    return status, body
+
+
+class TestServe:
+    def test_regrade(self, url, f_scope):
+        status, d = request(url, '/regrade', post={'scope': str(f_scope)})
+        assert status == 200
+        assert d['n_student'] == 5
+
+        _, df_grade_full = Config()(f_scope)
+        np.testing.assert_allclose(d['mean'], df_grade_full['mean'].mean())
+
+    def test_student_waive(self, url, f_scope):
+        param = {'scope': str(f_scope), 'email': 'last0@nu.edu'}
+        status, d = request(url, '/student', param=param)
+        assert status == 200
+        assert d['perc']['hw1'] == 1
+
+        status, d = request(url, '/waive',
+                            post={**param, 'assignment': 'HW 1'})
+        assert status == 200
+        assert d['perc']['hw1'] is None
+
+        # waiver is kept in memory
+        _, d = request(url, '/student', param=param)
+        assert d['perc']['hw1'] is None
+
+    def test_waive_error(self, url, f_scope):
+        status, d = request(url, '/waive', post={
+            'scope': str(f_scope), 'email': 'last0@nu.edu',
+            'assignment': 'hw'})
+        assert status == 400
+        assert len(d['error_list']) == 1
+
+    def test_download(self, url, f_scope, tmp_path):
+        status, body = request(url, '/download', param={
+            'scope': str(f_scope), 'columns': 'mean,letter'})
+        assert status == 200
+        f = tmp_path / 'grade_full.csv'
+        f.write_bytes(body)
+        df = pd.read_csv(f, index_col=0)
+        assert list(df.columns) == ['mean', 'letter']
+
+    def test_not_found(self, url):
+        status, _ = request(url, '/nope')
+        assert status == 404
+
+    def test_internal_error(self, url, f_scope, monkeypatch):
+        """ unexpected errors are a 500 json response """
+        def summary(self):
+            raise RuntimeError('boom')
+
+        monkeypatch.setattr('gradescope_mean.serve.Course.summary', summary)
+        status, d = request(url, '/regrade', post={'scope': str(f_scope)})
+        assert status == 500
+        assert d['error'] == 'RuntimeError: boom'
+
+
+class TestCourseCache:
+    def test_lru(self, f_scope, tmp_path):
+        f_scope1 = tmp_path / 'scope1.csv'
+        shutil.copy(f_scope, f_scope1)
+
+        cache = CourseCache(max_course=1)
+        course = cache.get(f_scope)
+        assert cache.get(f_scope) is course
+        cache.get(f_scope1)
+        assert list(cache.course_dict) == [(f_scope1.resolve(), None)]
+
+    def test_idle(self, f_scope, tmp_path):
+        """ courses unused for max_idle seconds are evicted """
+        f_scope1 = tmp_path / 'scope1.csv'
+        shutil.copy(f_scope, f_scope1)
+
+        cache = CourseCache(max_idle=60)
+        cache.get(f_scope)
+        course1 = cache.get(f_scope1)
+        cache.evict_idle()
+        assert len(cache.course_dict) == 2
+
+        cache.t_used_dict[f_scope.resolve(), None] -= 120
+        cache.evict_idle()
+        assert list(cache.course_dict) == [(f_scope1.resolve(), None)]
+        assert list(cache.t_used_dict) == [(f_scope1.resolve(), None)]
+        assert cache.get(f_scope1) is course1
+
+    def test_reload_waive(self, f_scope):
+        """ waivers whose assignment is gone after a reload are dropped """
+        course = CourseCache().get(f_scope)
+        with course.lock:
+            course.waive('last0@nu.edu', 'hw1')
+            course.waive('last0@nu.edu', 'hw2')
+            df = pd.read_csv(f_scope)
+            df = df.loc[:, [c for c in df.columns
+                            if not c.startswith('HW1')]]
+            f_scope.write_text(df.to_csv(index=False))
+            summary = course.summary()
+            assert summary['waive'] == {'last0@nu.edu': ['hw2']}
+            assert 'hw1' not in course.get_result().df_perc.columns
+
+    def test_reload(self, f_scope):
+        """ csv is reloaded when it changes on disk """
+        course = CourseCache().get(f_scope)
+        with course.lock:
+            course.regrade()
+            df = pd.read_csv(f_scope)
+            f_scope.write_text(df.iloc[:3].to_csv(index=False))
+            assert course.summary()['n_student'] == 3
+
+    def test_reload_mapping(self, f_scope):
+        """ course is reloaded when its email_mapping csv changes """
+        f_mapping = f_scope.with_name('email_mapping.csv')
+        f_mapping.write_text('left,right\nlst0@nu.edu,last0@nu.edu\n')
+        f_scope.with_name('config.yaml').write_text(
+            'email_list:\n  - lst0@nu.edu\n'
+            'email_mapping: email_mapping.csv\n')
+
+        course = CourseCache().get(f_scope)
+        with course.lock:
+            course.load()
+            assert list(course.gradebook.df_perc.index) == ['last0@nu.edu']
+            f_mapping.write_text('left,right\nlst0@nu.edu,last1@nu.edu\n')
+            course.load()
+            assert list(course.gradebook.df_perc.index) == ['last1@nu.edu']
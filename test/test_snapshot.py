@@ -0,0 +1,63 @@
+import pathlib
+import shutil
+
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.config import Config
+from gradescope_mean.gradebook import Gradebook
+from gradescope_mean.snapshot import get_f_snapshot, load_snapshot, \
+    save_snapshot
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def f_scope(tmp_path):
+    f = tmp_path / 'scope.csv'
+    shutil.copy(test_folder / 'scope.csv', f)
+    return f
+
+
+class TestSnapshot:
+    def test_round_trip(self, f_scope):
+        config = Config(remove_list=['quiz'])
+        assert load_snapshot(f_scope, config) is None
+
+        gradebook = Gradebook(str(f_scope))
+        config.prepare(gradebook)
+        save_snapshot(gradebook, config, f_scope)
+        assert get_f_snapshot(f_scope).exists()
+
+        gradebook_snap = load_snapshot(f_scope, config)
+        assert gradebook_snap.ass_list == ['hw1', 'hw2', 'hw3']
+        pd.testing.assert_frame_equal(gradebook_snap.df_perc,
+                                      gradebook.df_perc)
+
+    def test_invalid(self, f_scope):
+        """ snapshot is ignored once csv or config change """
+        config = Config()
+        gradebook = Gradebook(str(f_scope))
+        config.prepare(gradebook)
+        save_snapshot(gradebook, config, f_scope)
+
+        assert load_snapshot(f_scope, Config(remove_list=['quiz'])) is None
+
+        df = pd.read_csv(f_scope)
+        f_scope.write_text(df.iloc[:3].to_csv(index=False))
+        assert load_snapshot(f_scope, config) is None
+
+    def test_invalid_mapping(self, f_scope):
+        """ snapshot is ignored once the email_mapping csv changes """
+        f_mapping = f_scope.with_name('email_mapping.csv')
+        f_mapping.write_text('left,right\nlst0@nu.edu,last0@nu.edu\n')
+        config = Config(email_list=['lst0@nu.edu'],
+                        email_mapping=str(f_mapping))
+        gradebook = Gradebook(str(f_scope))
+        config.prepare(gradebook)
+        save_snapshot(gradebook, config, f_scope)
+        assert load_snapshot(f_scope, config) is not None
+
+        f_mapping.write_text('left,right\nlst0@nu.edu,last1@nu.edu\n')
+        assert load_snapshot(f_scope, config) is None
@@ -0,0 +1,70 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+import gradescope_mean
+from gradescope_mean.gradebook import Gradebook
+from gradescope_mean.store import GradeStore
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+CAT_WEIGHT_DICT = {'hw': .5, 'quiz': .5}
+
+
+@pytest.fixture
+def store(tmp_path):
+    gradebook = Gradebook(str(test_folder / 'scope.csv'))
+    df_grade = gradebook.average(cat_weight_dict=CAT_WEIGHT_DICT)
+
+    store = GradeStore(tmp_path / 'grade.db')
+    store.import_grades(gradebook, df_grade, course='cs2810', term='2022')
+    store.import_grades(gradebook, df_grade, course='cs2810', term='2023')
+    yield store, df_grade
+    store.close()
+
+
+class TestGradeStore:
+    def test_import(self, store):
+        store, df_grade = store
+        df = store.query('SELECT COUNT(*) AS n FROM score')
+        assert df['n'][0] == 2 * 5 * 4
+
+        df = store.query('SELECT COUNT(*) AS n FROM category_grade')
+        assert df['n'][0] == 2 * 5 * 2
+
+        # hw1 is 0, 1, 2, 3, 4 days late
+        df = store.query('SELECT late_day FROM late_day '
+                         'JOIN assignment USING (assignment_id) '
+                         'JOIN term USING (term_id) '
+                         "WHERE name = 'hw1' AND term = '2022' "
+                         'ORDER BY student_id')
+        assert df['late_day'].tolist() == [0, 1, 2, 3, 4]
+
+    def test_reimport(self, store, tmp_path):
+        """ re-importing a course / term replaces it """
+        store, df_grade = store
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        gradebook.remove('quiz1')
+        store.import_grades(gradebook, df_grade, course='cs2810', term='2023')
+
+        df = store.query('SELECT term, COUNT(*) AS n FROM assignment '
+                         'JOIN term USING (term_id) GROUP BY term '
+                         'ORDER BY term')
+        assert df['n'].tolist() == [4, 3]
+        df = store.query('SELECT COUNT(*) AS n FROM student')
+        assert df['n'][0] == 5
+
+    def test_student_history(self, store):
+        store, df_grade = store
+        df = store.student_history('LAST0@nu.edu')
+        assert df['term'].tolist() == ['2022', '2023']
+        np.testing.assert_allclose(df['mean'],
+                                   df_grade.loc['last0@nu.edu', 'mean'])
+        assert (df['letter'] == df_grade.loc['last0@nu.edu', 'letter']).all()
+
+    def test_section_mean(self, store):
+        store, df_grade = store
+        df = store.section_mean('cs2810')
+        assert df['n_student'].tolist() == [5, 5]
+        np.testing.assert_allclose(df['mean'], df_grade['mean'].mean())
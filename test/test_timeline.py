@@ -0,0 +1,63 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import gradescope_mean
+from gradescope_mean.gradebook import Gradebook
+from gradescope_mean.timeline import submission_timeline
+
+test_folder = pathlib.Path(gradescope_mean.__file__).parents[1] / 'test'
+
+
+@pytest.fixture
+def gradebook(tmp_path):
+    """ hw1 is due 2023-01-01 12:00 -0500, two of three students are late """
+    csv_content = (
+        'First Name,Last Name,SID,Email,section_name,'
+        'HW1,HW1 - Max Points,HW1 - Submission Time,'
+        'HW1 - Lateness (H:M:S)\n'
+        'Jane,Doe,1S,jane@uni.edu,sec1,'
+        '8,10,2023-01-01 11:00:00 -0500,00:00:00\n'
+        'John,Doe,2S,john@uni.edu,sec1,'
+        '8,10,2023-01-01 09:30:00 -0800,00:30:00\n'
+        'Jill,Doe,3S,jill@uni.edu,sec1,'
+        '8,10,2023-01-02 14:00:00 -0500,26:00:00\n'
+        'Jack,Doe,4S,jack@uni.edu,sec1,'
+        '0,10,,00:00:00\n'
+    )
+    f = tmp_path / 'scope.csv'
+    f.write_text(csv_content)
+    return Gradebook(str(f))
+
+
+class TestTimeline:
+    def test_submission_time(self, gradebook):
+        assert gradebook._df_submit is None
+        df_submit = gradebook.submission_time()
+
+        # offsets are applied: both are 17:30 UTC
+        t_exp = pd.Timestamp('2023-01-01 17:30:00', tz='UTC').timestamp()
+        assert df_submit.loc['john@uni.edu', 'hw1'] == t_exp
+        assert pd.isna(df_submit.loc['jack@uni.edu', 'hw1'])
+
+        # only students still in gradebook
+        gradebook.prune_email(['jane@uni.edu'])
+        assert list(gradebook.submission_time().index) == ['jane@uni.edu']
+
+    def test_submission_timeline(self, gradebook):
+        df_timeline = submission_timeline(gradebook, quantiles=(0, 1))
+        s = df_timeline.loc['hw1']
+        assert s['n_submit'] == 3
+        # 30 min lateness is within the default grace period
+        assert s['n_late'] == 1
+        assert s['deadline'] == pd.Timestamp('2023-01-01 17:00', tz='UTC')
+        assert s['submit_q1'] == pd.Timestamp('2023-01-02 19:00', tz='UTC')
+        np.testing.assert_allclose([-1, 26], [s['hours_q0'], s['hours_q1']])
+
+    def test_no_late(self):
+        gradebook = Gradebook(str(test_folder / 'scope.csv'))
+        df_timeline = submission_timeline(gradebook)
+        assert pd.isna(df_timeline.loc['quiz1', 'deadline'])
+        assert df_timeline.loc['quiz1', 'n_submit'] == 5